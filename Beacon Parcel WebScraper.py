@@ -2,7 +2,7 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 import undetected_chromedriver as uc
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
@@ -11,605 +11,2386 @@ import time
 import csv
 from datetime import datetime
 import os
+import argparse
+import queue
+import threading
+import sqlite3
+import functools
+import hashlib
+import importlib
+import json
+import logging
+import re
+import socket
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from beacon_parser import to_tree, is_captcha_page, is_no_results_page, is_results_page, parse_results_page, parse_property_page
+from beacon_metrics import Metrics, MetricsExporter, SamplingFilter
+from beacon_ratelimit import AdaptiveRateLimiter
+from beacon_profiles import DEFAULT_PROFILE, load_profile
+from beacon_store import ParcelDatabase
+from beacon_status import PARKED_STATUS, StatusStore, canonical_address, normalize_address_key
+from beacon_cache import PageCache
+from beacon_sinks import OUTPUT_HEADERS, OUTPUT_SINKS
+from beacon_inputs import read_address_chunks
+from beacon_queue import QUEUE_PORT, QueueServer, RemoteWorkQueue
+from beacon_retry import MAX_ATTEMPTS, RetryScheduler
 
-# Set up Chrome options
-chrome_options = Options()
-chrome_options.add_argument("--disable-popup-blocking")
-chrome_options.add_argument("--disable-notifications")
-
-# Initialize the Chrome driver with options
-driver = uc.Chrome(options=chrome_options)
-
-# Class codes for properties
-class_codes = {
-    "401": "4 - 19 family apartments",
-    "402": "20 - 39 family apartments",
-    "403": "40+ family apartments",
-    "530": "Three Family Dwelling Platted",
-    "520": "Two Family Dwelling Platted",
-    "510": "One Family Dwelling Platted",
-}
+# Site profile of the county being scraped. Workers of a multi-county run each set their own in `active_site`
+site_profile = DEFAULT_PROFILE
+active_site = threading.local()
+
+def current_profile():
+    """The site profile the calling thread is scraping."""
+    return getattr(active_site, "profile", None) or site_profile
+
+# Per-address and per-row progress is logged (leveled and sampled, see configure_logging) instead of printed
+log = logging.getLogger("beacon_scraper")
+
+# Stage timings and outcome counters for the run; main() exports them as a Prometheus text file and a JSON summary
+metrics = Metrics()
+
+# Every page navigation takes a token from its host's bucket first; main() sets the rates from --rate/--min-rate/--max-rate
+rate_limiter = AdaptiveRateLimiter(metrics=metrics)
+
+# undetected_chromedriver patches its chromedriver binary on startup, so sessions have to be created one at a time
+driver_creation_lock = threading.Lock()
+
+# Lean page loads: headless, "eager" page-load strategy, and none of the resources below. The scraper only reads
+# the HTML, so map tiles, images, fonts and analytics are dead weight. Patterns use CDP's * wildcard.
+DEFAULT_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*arcgisonline.com*", "*/MapServer/*", "*/tile/*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+]
+lean_mode = False
+blocked_urls = DEFAULT_BLOCKED_URLS
+
+def create_driver(headless=None):
+    """
+    Create a new Chrome session with the scraper's options. In lean mode it runs headless (unless an operator
+    has to see it, or `headless` says otherwise), returns from page loads at DOMContentLoaded and blocks `blocked_urls`.
+    """
+    # Set up Chrome options
+    chrome_options = Options()
+    chrome_options.add_argument("--disable-popup-blocking")
+    chrome_options.add_argument("--disable-notifications")
+    if lean_mode:
+        # Every page is read only after waiting for the elements it needs, so there is no need to wait for the load event
+        chrome_options.page_load_strategy = "eager"
+    if headless is None:
+        headless = lean_mode and not (solve_captchas and captcha_solver is prompt_operator)
+
+    # Initialize the Chrome driver with options
+    with driver_creation_lock:
+        driver = uc.Chrome(options=chrome_options, headless=headless)
+    if lean_mode and blocked_urls:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(blocked_urls)})
+        except Exception:
+            driver.quit()
+            raise
+    return driver
+
+# Folder the scraper writes its outputs to; set BEACON_OUTPUT_DIR on machines that do not have this one
+OUTPUT_DIR = os.environ.get("BEACON_OUTPUT_DIR", "C:/Users/gabri/OneDrive/Desktop/Final Dashboard/Dashboard/Steps to Clean Raw Data/Scraped Parcel Files")
+STATUS_DB_PATH = f"{OUTPUT_DIR}/PurdueStatus.sqlite3"
+PAGE_CACHE_DIR = f"{OUTPUT_DIR}/PageCache"
+
+status_store = None
+page_cache = None
+
+def search_cache_key(address):
+    """Cache key of an address's search page. It includes the county, since the same address can exist in several."""
+    return f"search:{current_profile().name}:{normalize_address_key(address)}"
+
+def cache_page(key, url, html, kind="property", address=None, parcel_id=None):
+    """Store a fetched page in the page cache, if one is configured."""
+    if page_cache is None:
+        return
+    try:
+        page_cache.put(key, html, url=url, kind=kind, address=address, parcel_id=parcel_id)
+    except Exception as e:
+        log.error("Error caching page %s: %s", key, e)
 
 # Step 1: Read the files and extract address columns
-file1 = pd.read_csv("Steps to Clean Raw Data/Scraped Parcel Files/PurdueOld.csv")
-file2 = pd.read_csv("Steps to Clean Raw Data/Scraped Parcel Files/Updated_Property_Data_with_Address_Components.csv")
-addresses = pd.concat([file1['Address'], file2['Address']]).drop_duplicates()
+def stream_addresses(store, restart=False, inputs=None):
+    """
+    Register the input addresses (the Address column of every file in `inputs`, if None the site profile's) in
+    the status store chunk by chunk, and lazily yield the ones left to scrape as each chunk lands. The store is the
+    de-duplication set, so memory stays flat however long the inputs are. Addresses finished on an earlier run are
+    skipped unless `restart` is set.
+    """
+    if inputs is None:
+        inputs = current_profile().inputs
+    if restart:
+        store.reset()
+
+    def addresses():
+        read = added = cursor = 0
+
+        def drain():
+            # Everything registered so far (the new chunk and any left over from earlier runs) past the cursor
+            nonlocal cursor
+            while True:
+                pending = store.pending_after(cursor)
+                if not pending:
+                    return
+                cursor = pending[-1][0]
+                for _, address in pending:
+                    yield address
+
+        for chunk in read_address_chunks(inputs):
+            read += len(chunk)
+            added += store.add_addresses(chunk)
+            yield from drain()
+        yield from drain()
+        print(f"Read {read} input addresses into the address log ({added} new).")
+
+    return addresses()
+
+# RentalIDs are shared by every worker, so hand them out under a lock
+rental_id_lock = threading.Lock()
+next_rental_id = 400000
+next_sales_id = 4000000
 
-address_log = pd.DataFrame({
-    "Address": addresses,
-    "Status": "Not Scraped"  # Default status for all addresses
-})
+def claim_rental_id(advance=True):
+    """Return the current RentalID, moving on to the next one if `advance` is set."""
+    global next_rental_id
+    with rental_id_lock:
+        rental_id = next_rental_id
+        if advance:
+            next_rental_id += 1
+        return rental_id
 
-to_scrape = address_log[address_log['Status'] == "Not Scraped"]['Address'].tolist()
-print(f"Addresses left to scrape: {len(to_scrape)}")
-print(f"Initialized address log with {len(address_log)} addresses.")
+def number_sales(rows):
+    """Give every sale row its own SalesID; the parser numbers each property's sales from 4000000, so they repeat."""
+    global next_sales_id
+    with rental_id_lock:
+        for row in rows:
+            if row.get("SalesID") is not None:
+                row["SalesID"] = next_sales_id
+                next_sales_id += 1
+    return rows
 
-def update_address_log(address, status, log_path="C:/Users/gabri/OneDrive/Desktop/Final Dashboard/Dashboard/Steps to Clean Raw Data/Scraped Parcel Files/PurdueStatusOutput.csv"):
+def number_rentals(rows):
     """
-    Update the scrape status for a specific address and save to CSV.
+    Give every property in `rows` a RentalID from this process, one per distinct Parcel ID / Property Link; rows
+    that came from another node were numbered there, from the same 400000 start. A row with no parcel (a
+    "No Results" row) takes the current RentalID without moving on, as claim_rental_id(advance=False) does.
+    """
+    global next_rental_id
+    assigned = {}
+    with rental_id_lock:
+        for row in rows:
+            if row.get("RentalID") is None:
+                continue
+            key = (row.get("Parcel ID"), row.get("Property Link"))
+            if key == (None, None):
+                row["RentalID"] = next_rental_id
+                continue
+            if key not in assigned:
+                assigned[key] = next_rental_id
+                next_rental_id += 1
+            row["RentalID"] = assigned[key]
+    return rows
+
+def seed_output_ids(path):
+    """Continue the RentalIDs and SalesIDs after the highest ones in an earlier flat output (CSV, or Parquet directory)."""
+    global next_rental_id, next_sales_id
+    if not os.path.exists(path) or (os.path.isfile(path) and os.path.getsize(path) == 0):
+        return
+    columns = ["RentalID", "SalesID"]
+    try:
+        if os.path.isdir(path):
+            previous = pd.read_parquet(path, columns=columns)
+        else:
+            previous = pd.read_csv(path, usecols=columns, dtype=str)
+    except Exception as e:
+        log.warning("Could not read the IDs already used in %s: %s", path, e)
+        return
+    highest = {column: pd.to_numeric(previous[column], errors="coerce").max() for column in columns}
+    with rental_id_lock:
+        if highest["RentalID"] == highest["RentalID"]:  # not NaN
+            next_rental_id = max(next_rental_id, int(highest["RentalID"]) + 1)
+        if highest["SalesID"] == highest["SalesID"]:
+            next_sales_id = max(next_sales_id, int(highest["SalesID"]) + 1)
+    print(f"Continuing from RentalID {next_rental_id} and SalesID {next_sales_id} after {path}.")
+
+def update_address_log(address, status, store=None):
+    """
+    Update the scrape status for a specific address in the status store (`store`, or the run's).
+    """
+    try:
+        (store or status_store).set_status(address, status)
+        log.debug("Updated log for address: %s with status: %s", address, status)
+    except Exception as e:
+        log.error("Error updating log for %s: %s", address, e)
+
+# Event-driven waits: every wait names the readiness signal it is waiting on and records how long it really took
+WAIT_TIMEOUTS = {
+    "search_page": 10,
+    "search_submitted": 10,
+    "search_outcome": 10,
+    "property_page": 10,
+    "column_menu": 5,
+    "checkbox_checked": 3,
+    "sales_grid": 3,
+}
+
+# Waits for a new page to arrive from the site; timing out on one of these slows the rate down
+NAVIGATION_WAITS = ("search_submitted", "search_outcome", "property_page")
+
+def current_url(driver):
+    """The driver's URL, or "" if the session cannot answer."""
+    try:
+        return driver.current_url or ""
+    except Exception:
+        return ""
+
+def wait_for(driver, name, condition, timeout=None):
+    """
+    Wait until `condition(driver)` returns something truthy and return it. Raises TimeoutException after the
+    per-condition timeout. The elapsed time is recorded under `name` either way.
     """
-    global address_log  # Access the global log
     try:
-        # Update the status in the DataFrame
-        address_log.loc[address_log['Address'] == address, 'Status'] = status
+        with metrics.span(name, "beacon_wait_seconds"):
+            return WebDriverWait(driver, timeout or WAIT_TIMEOUTS[name], poll_frequency=0.1).until(condition)
+    except TimeoutException:
+        metrics.count("beacon_wait_timeouts_total", stage=name)
+        if name in NAVIGATION_WAITS:
+            # A page that never arrived is the site telling us to slow down
+            rate_limiter.backoff(current_url(driver), "timeout")
+        raise
+
+def wait_summary():
+    """Count, p50, p95 and max milliseconds per wait condition, plus how often each one timed out."""
+    timeouts = metrics.counter_values("beacon_wait_timeouts_total", "stage")
+    summary = metrics.histogram_summary("beacon_wait_seconds", "stage")
+    for name, stats in summary.items():
+        stats["timeouts"] = timeouts.get(name, 0)
+    return summary
+
+def print_wait_summary():
+    for name, stats in sorted(wait_summary().items()):
+        print(f"Wait '{name}': {stats}")
+    for page, stats in sorted(page_bytes_summary().items()):
+        print(f"Page bytes '{page}': {stats}")
 
-        # Save the updated log to a CSV file
-        address_log.to_csv(log_path, index=False)
-        print(f"Updated log for address: {address} with status: {status}")
+# Bytes the browser transferred for the current document and every resource it loaded
+PAGE_BYTES_SCRIPT = """
+return performance.getEntriesByType("navigation").concat(performance.getEntriesByType("resource"))
+    .reduce((total, entry) => total + (entry.transferSize || 0), 0);
+"""
+
+def record_page_bytes(page, size):
+    """Count the bytes transferred for one page load of the given kind ("search" or "property")."""
+    metrics.count("beacon_page_bytes_total", size, page=page)
+    metrics.count("beacon_pages_measured_total", page=page)
+
+def record_browser_page_bytes(driver, page):
+    """Bytes of the page the driver is on, from the Resource Timing API (cross-origin resources may report 0)."""
+    try:
+        record_page_bytes(page, int(driver.execute_script(PAGE_BYTES_SCRIPT) or 0))
     except Exception as e:
-        print(f"Error updating log for {address}: {e}")
+        log.debug("Could not measure page bytes: %s", e)
+
+def page_bytes_summary():
+    """Pages measured and mean KB transferred per page, by page kind."""
+    pages = metrics.counter_values("beacon_pages_measured_total", "page")
+    sizes = metrics.counter_values("beacon_page_bytes_total", "page")
+    return {page: {"pages": count, "mean_kb": round(sizes.get(page, 0) / count / 1024, 1)} for page, count in pages.items() if count}
+
+def url_contains(fragment):
+    return lambda driver: fragment in (driver.current_url or "")
+
+def search_outcome(driver):
+    """Readiness signal for a submitted search: the property page, the results table, the no-results link or a CAPTCHA."""
+    if "PageTypeID=4" in (driver.current_url or ""):
+        return "direct_navigation"
+    if captcha_on_page(driver):
+        return "captcha"
+    selectors = current_profile().selectors.raw
+    if driver.find_elements(By.XPATH, selectors["result_rows"]) or driver.find_elements(By.XPATH, selectors["no_results_link"]):
+        return "search_results"
+    return False
+
+def attribute_equals(element, attribute, value):
+    return lambda driver: element.get_attribute(attribute) == value
+
+def grid_rerendered(grid, header_count):
+    """The sales grid was replaced or gained a column since `header_count` was taken."""
+    def condition(driver):
+        try:
+            return len(grid.find_elements(By.XPATH, './/thead//th')) != header_count
+        except StaleElementReferenceException:
+            return True
+    return condition
 
 # Step 2: Handle the pop up terms and conditions and make it automatically click the agree button
-def handle_popup(driver):
-    """Handle the Terms and Conditions popup if it appears."""
+def handle_popup(driver, timeout=10):
+    """Handle the Terms and Conditions popup if it appears within `timeout` seconds. Returns True if it was accepted."""
     try:
         # Wait for the popup to appear
-        agree_button = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, '//a[contains(@class, "btn-primary") and text()="Agree"]'))
+        agree_button = WebDriverWait(driver, timeout).until(
+            EC.presence_of_element_located((By.XPATH, current_profile().selectors.raw["agree_button"]))
         )
         agree_button.click()
         print("Popup accepted.")
+        return True
     except TimeoutException:
         print("No popup appeared. Continuing...")
     except Exception as e:
         print(f"Error handling popup: {e}")
+    return False
+
+class BrowserSessionLost(Exception):
+    """Raised when Chrome died under a scrape (crashed renderer, killed process or invalid session id)."""
+
+def browser_alive(driver):
+    """One cheap round trip to Chrome. False once the session is gone."""
+    try:
+        driver.current_window_handle
+        return True
+    except Exception:
+        return False
 
 # Step 3: Search Property function where we insert address into the search box and click search
+@metrics.timed("search_property")
 def search_property(driver, address):
+    selectors = current_profile().selectors.raw
     try:
         # Wait for the search box and clear it
-        search_box = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, '//input[@id="ctlBodyPane_ctl02_ctl01_txtAddress"]'))
+        search_box = wait_for(driver, "search_page",
+            EC.presence_of_element_located((By.ID, selectors["search_box_id"]))
         )
         search_box.clear()
         search_box.send_keys(address)
 
         # Wait for and click the search button
         search_button = WebDriverWait(driver, 5).until(
-            EC.element_to_be_clickable((By.XPATH, '//a[@id="ctlBodyPane_ctl02_ctl01_btnSearch"]'))
+            EC.element_to_be_clickable((By.ID, selectors["search_button_id"]))
         )
+        search_page = driver.find_element(By.TAG_NAME, "html")
+        rate_limiter.acquire(driver.current_url)
         search_button.click()
-        print(f"Searching for address: {address}")
+        log.info("Searching for address: %s", address)
+
+        # Wait for the search page to be replaced, then for the page we landed on to be ready
+        try:
+            wait_for(driver, "search_submitted", EC.staleness_of(search_page))
+            outcome = wait_for(driver, "search_outcome", search_outcome)
+        except TimeoutException:
+            outcome = None
 
-        # Wait briefly for the page to respond
-        time.sleep(3)
+        if outcome == "captcha":
+            return "captcha"
+        rate_limiter.success(driver.current_url)
 
         # Check for direct navigation
-        if driver.current_url and "PageTypeID=4" in driver.current_url:
-            print(f"Direct navigation to property page detected for: {address}")
+        if outcome == "direct_navigation" or (driver.current_url and "PageTypeID=4" in driver.current_url):
+            log.debug("Direct navigation to property page detected for: %s", address)
             return "direct_navigation"
 
         # Check for search results by verifying the presence of a results container
-        search_results = driver.find_elements(By.XPATH, '//div[@class="module-content"]')
+        search_results = outcome == "search_results" or driver.find_elements(By.XPATH, selectors["module_content"])
         if search_results:
-            print(f"Search results page detected for: {address}")
+            log.debug("Search results page detected for: %s", address)
             return "search_results"
 
         # If neither case, assume no results or an error
-        print(f"No results or unexpected page for: {address}")
+        log.debug("No results or unexpected page for: %s", address)
         return "no_results"
 
     except TimeoutException:
-        print(f"Timeout while searching for address: {address}")
-        return "error"
+        log.warning("Timeout while searching for address: %s", address)
+        rate_limiter.backoff(current_url(driver), "error")
+        return "timeout"
+    except StaleElementReferenceException:
+        log.warning("Search page re-rendered while searching for address: %s", address)
+        return "stale_element"
     except Exception as e:
-        print(f"Error in search_property for address '{address}': {e}")
+        if not browser_alive(driver):
+            raise BrowserSessionLost(str(e)) from e
+        log.warning("Error in search_property for address '%s': %s", address, e)
+        rate_limiter.backoff(current_url(driver), "error")
         return "error"
 
+@metrics.timed("reset_to_search_page")
 def reset_to_search_page(driver):
+    selectors = current_profile().selectors.raw
     try:
         search_button = WebDriverWait(driver, 5).until(
-            EC.element_to_be_clickable((By.XPATH, '//li[@id="search1"]/a'))
+            EC.element_to_be_clickable((By.XPATH, selectors["search_tab"]))
         )
+        rate_limiter.acquire(driver.current_url)
         driver.execute_script("arguments[0].click();", search_button)
-        print("Reset to search page successfully.")
-        time.sleep(1)
+        wait_for(driver, "search_page", EC.element_to_be_clickable((By.ID, selectors["search_box_id"])))
+        log.debug("Reset to search page successfully.")
     except Exception as e:
-        print(f"Error resetting to search page: {e}")
+        log.warning("Error resetting to search page: %s", e)
+        rate_limiter.acquire(current_url(driver))
         driver.refresh()
-        time.sleep(3)
-
-temp_data = pd.DataFrame(columns=[
-    "RentalID", "SalesID", "Address", "Beds", "Date", 
-    "Price", "SQFT", "Transfer Type", "Instrument", 
-    "Transfer To", "Property Classification", "Parcel ID", 
-    "Acres", "Zoning Class", "Year Built", "Year Improved/Renovated", 
-    "Grade", "Property Link", "Status"
-])
-
-def write_to_csv(entry, file_path='C:/Users/gabri/OneDrive/Desktop/Final Dashboard/Dashboard/Steps to Clean Raw Data/Scraped Parcel Files/PurduePropertyParcel9.csv'):
-    headers = [
-        "RentalID", "SalesID", "Address", "Beds", "Date", 
-        "Price", "SQFT", "Transfer Type", "Instrument", 
-        "Transfer To", "Property Classification", "Parcel ID", 
-        "Acres", "Zoning Class", "Year Built", "Year Improved/Renovated", 
-        "Grade", "Property Link", "Status"
-    ]
+        try:
+            wait_for(driver, "search_page", EC.element_to_be_clickable((By.ID, selectors["search_box_id"])))
+        except TimeoutException:
+            log.warning("Search page did not load after refresh.")
+
+temp_data = pd.DataFrame(columns=OUTPUT_HEADERS)
+
+def import_into_database(path, csv_path):
+    """Upsert a flat output CSV from earlier runs into the parcel database at `path`."""
+    database = ParcelDatabase(path)
     try:
-        with open(file_path, 'a', newline='') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=headers)
-            if csvfile.tell() == 0:  # Write the header only if the file is empty
-                writer.writeheader()
-            writer.writerow(entry)
-        print(f"Entry for {entry.get('Address', 'Unknown Address')} written to CSV.")
-    except Exception as e:
-        print(f"Error writing to CSV: {e}")
+        properties, sales = database.import_csv(csv_path)
+        print(f"Imported {csv_path}: {properties} property rows and {sales} sale rows, now {database.counts()}.")
+    finally:
+        database.close()
 
-def multiple_pages(driver, address):
-    main_tab = driver.current_window_handle  # Store the handle of the main tab
+def export_database(path, directory):
+    """Write the parcel database at `path` to Parquet files for the dashboard."""
+    database = ParcelDatabase(path)
     try:
-        # Step 1: Check if "No Results Found" is displayed
+        print(f"Exported {database.counts()} to {', '.join(database.export_parquet(directory))}")
+    except Exception as e:
+        print(f"Error exporting {path} to Parquet: {e}")
+    finally:
+        database.close()
+
+PARCEL_STATE_DB_PATH = f"{OUTPUT_DIR}/PurdueParcelState.sqlite3"
+CHANGELOG_PATH = f"{OUTPUT_DIR}/PurdueChangelog.csv"
+
+# Fields that identify a sale in the sales grid, and the subset that says two rows are the same transfer
+SALE_FIELDS = ["Date", "Transfer Type", "Instrument", "Transfer To", "Price"]
+SALE_KEY_FIELDS = ("Date", "Instrument")
+CHANGELOG_HEADERS = ["Detected At", "Parcel ID", "Address", "Change"] + SALE_FIELDS
+
+def sales_from_rows(rows):
+    """The sales (Date, Transfer Type, ...) in a property's output rows, without the minimal no-sale row."""
+    return [{field: row.get(field) for field in SALE_FIELDS} for row in rows if row.get("Date")]
+
+def sales_hash(sales):
+    """Order-independent fingerprint of a parcel's sales grid."""
+    canonical = sorted(json.dumps([sale.get(field) for field in SALE_FIELDS]) for sale in sales)
+    return hashlib.sha256("\n".join(canonical).encode("utf-8")).hexdigest()
+
+def latest_sale_date(sales):
+    dates = []
+    for sale in sales:
         try:
-            no_results = driver.find_element(By.XPATH, '//a[@id="ctlBodyPane_noDataList_lnkSearchPage"]')
-            print(f"No results found for address: {address}. Resetting search...")
-            no_result_entry = {
-                "RentalID": None,
-                "SalesID": None,
-                "Address": address,
-                "Beds": None,
-                "Date": None,
-                "Price": None,
-                "SQFT": None,
-                "Transfer Type": None,
-                "Instrument": None,
-                "Transfer To": None,
-                "Property Classification": None,
-                "Parcel ID": None,
-                "Acres": None,
-                "Zoning Class": None,
-                "Year Built": None,
-                "Year Improved/Renovated": None,
-                "Grade": None,
-                "Property Link": None,
-                "Status": "Address Not Correct"
-            }
-            no_results.click()  # Return to the search page
-            return [no_result_entry]  # Call centralized CSV-writing function
-        except NoSuchElementException:
-            pass# Results found, proceed
-
-        # Step 2: Process multiple parcel links or single property
-        parcel_links = driver.find_elements(By.XPATH, '//table[contains(@class, "")]/tbody/tr')
-        if not parcel_links:
-            print(f"No parcel links found for address: {address}")
-            return []
-        print(f"Found {len(parcel_links)} parcel links for address: {address}")
-
-        # Extract Property Addresses for Filtering
-        property_addresses = driver.find_elements(By.XPATH, './/table[contains(@class, "footable")]/tbody/tr/td[5]')  # Update XPath to match the address column
-        if not property_addresses:
-            print(f"No property addresses found in search results for address: {address}")
-            return
-
-        # Filter rows for exact address match
-        matching_rows = []
-        for idx, prop_address_element in enumerate(property_addresses, start=1):
-            prop_address_text = prop_address_element.text.strip()
-            if prop_address_text.lower() == address.lower():
-                matching_rows.append(idx)
-                print(f"Parcel {idx}: Address '{prop_address_text}' matches searched address '{address}'.")
-            else:
-                print(f"Parcel {idx}: Address '{prop_address_text}' does not match searched address '{address}'. Skipping...")
+            dates.append(datetime.strptime(sale["Date"], "%m/%d/%Y"))
+        except (TypeError, ValueError):
+            continue
+    return max(dates).strftime("%m/%d/%Y") if dates else None
 
-        if not matching_rows:
-            print(f"No exact matches found for address: {address}. Skipping...")
-            return
+def diff_sales(old_sales, new_sales):
+    """Changelog entries for sales that are new, changed or gone since the last scrape."""
+    old_by_key = {tuple(sale.get(field) for field in SALE_KEY_FIELDS): sale for sale in old_sales}
+    new_by_key = {tuple(sale.get(field) for field in SALE_KEY_FIELDS): sale for sale in new_sales}
+    changes = []
+    for key, sale in new_by_key.items():
+        if key not in old_by_key:
+            changes.append(dict(sale, Change="New Sale"))
+        elif sale != old_by_key[key]:
+            changes.append(dict(sale, Change="Changed Sale"))
+    for key, sale in old_by_key.items():
+        if key not in new_by_key:
+            changes.append(dict(sale, Change="Removed Sale"))
+    return changes
 
-        # Step 3: Extract Class codes for Matching Rows
-        valid_rows = []
-        class_elements = driver.find_elements(By.XPATH, './/td[@align="center"]')  # Update XPath to match the class code column
-        for idx in matching_rows:
-            try:
-                class_text = class_elements[idx - 1].text.strip()  # Use `idx - 1` because `matching_rows` is 1-indexed
-                print(f"Extracted text from parcel {idx}: {class_text}")
-
-                if class_text and class_text.split()[0] in class_codes:
-                    class_code = class_text.split()[0]
-                    valid_rows.append((idx, class_code))
-                    print(f"Parcel {idx} has a valid class: {class_codes[class_code]} ({class_code}).")
-                else:
-                    print(f"Parcel {idx}: Invalid or missing class code. Skipping...")
-            except Exception as e:
-                print(f"Error extracting class code for parcel {idx}: {e}")
+class ParcelStateStore:
+    """
+    What we saw for each Parcel ID on the last scrape: address, property link, latest sale date and the
+    sales grid with its hash. Incremental runs compare against it so only new or changed sales are written.
+    """
+    def __init__(self, path=PARCEL_STATE_DB_PATH):
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS parcel_state (
+                parcel_id TEXT PRIMARY KEY,
+                address TEXT,
+                property_link TEXT,
+                last_sale_date TEXT,
+                sales_hash TEXT NOT NULL,
+                sales_json TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        # Outcome of the last incremental check of the parcel ("Updated", "Unchanged", "Stale Link", "Error", ...)
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(parcel_state)")}
+        for column in ("check_status", "checked_at"):
+            if column not in columns:
+                self.connection.execute(f"ALTER TABLE parcel_state ADD COLUMN {column} TEXT")
+        self.connection.commit()
 
-        if not valid_rows:
-            print(f"No valid parcels found for address: {address}")
-            return
+    def get(self, parcel_id):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT address, property_link, last_sale_date, sales_hash, sales_json FROM parcel_state WHERE parcel_id = ?", (parcel_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"parcel_id": parcel_id, "address": row[0], "property_link": row[1], "last_sale_date": row[2], "sales_hash": row[3], "sales": json.loads(row[4])}
 
-        # Step 4: Expand Details for Valid Rows
-        for idx, class_code in valid_rows:
-            try:
-                arrow_buttons = driver.find_elements(By.XPATH, '//a[contains(@class, "footable-toggle")]')
-                if idx <= len(arrow_buttons):
-                    arrow_buttons[idx - 1].click()
-                    print(f"Parcel {idx}: Clicked arrow button to expand details.")
-                    time.sleep(2)
-                else:
-                    print(f"Parcel {idx}: Arrow button not found. Skipping...")
-                    continue
-            except Exception as e:
+    def parcel_ids(self):
+        """Every parcel with a known property link, in the order they were first seen."""
+        with self.lock:
+            return [row[0] for row in self.connection.execute("SELECT parcel_id FROM parcel_state WHERE property_link IS NOT NULL ORDER BY rowid")]
 
-                print(f"Parcel {idx}: Error clicking arrow button: {e}")
+    def save(self, parcel_id, address, property_link, sales):
+        with self.lock:
+            self.connection.execute(
+                """INSERT INTO parcel_state (parcel_id, address, property_link, last_sale_date, sales_hash, sales_json, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (parcel_id) DO UPDATE SET address = excluded.address, property_link = excluded.property_link,
+                       last_sale_date = excluded.last_sale_date, sales_hash = excluded.sales_hash,
+                       sales_json = excluded.sales_json, updated_at = excluded.updated_at""",
+                (parcel_id, address, property_link, latest_sale_date(sales), sales_hash(sales), json.dumps(sales), datetime.now().isoformat(timespec="seconds")),
+            )
+            self.connection.commit()
+
+    def set_check_status(self, parcel_id, status):
+        with self.lock:
+            self.connection.execute(
+                "UPDATE parcel_state SET check_status = ?, checked_at = ? WHERE parcel_id = ?",
+                (status, datetime.now().isoformat(timespec="seconds"), parcel_id),
+            )
+            self.connection.commit()
+
+    def check_status_counts(self):
+        with self.lock:
+            return dict(self.connection.execute(
+                "SELECT check_status, COUNT(*) FROM parcel_state WHERE check_status IS NOT NULL GROUP BY check_status"
+            ).fetchall())
+
+    def record_rows(self, rows):
+        """Save the state of every parcel in a batch of freshly scraped output rows."""
+        by_parcel = {}
+        for row in rows:
+            if row.get("Parcel ID"):
+                by_parcel.setdefault(row["Parcel ID"], []).append(row)
+        for parcel_id, parcel_rows in by_parcel.items():
+            self.save(parcel_id, parcel_rows[0].get("Address"), parcel_rows[0].get("Property Link"), sales_from_rows(parcel_rows))
+
+    def seed_from_output(self, path):
+        """Load parcels we have no state for yet from a previous output CSV."""
+        if not os.path.exists(path):
+            print(f"No previous output at {path} to seed parcel state from.")
+            return 0
+        previous = pd.read_csv(path, usecols=lambda column: column in OUTPUT_HEADERS, dtype=str).dropna(subset=["Parcel ID"])
+        previous = previous.astype(object).where(previous.notna(), None)
+        seeded = 0
+        for parcel_id, group in previous.groupby("Parcel ID", sort=False):
+            if self.get(parcel_id) is not None:
                 continue
+            rows = group.to_dict("records")
+            # Re-runs append, so the same sale can appear more than once in the output
+            sales = list({json.dumps(sale, sort_keys=True): sale for sale in sales_from_rows(rows)}.values())
+            self.save(parcel_id, rows[-1].get("Address"), rows[-1].get("Property Link"), sales)
+            seeded += 1
+        print(f"Seeded state for {seeded} parcels from {path}.")
+        return seeded
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+parcel_state = None
+changelog_path = CHANGELOG_PATH
+
+class ResolutionIndex:
+    """
+    Address -> (Parcel ID, property link) of every parcel an address resolved to on an earlier search, per county.
+    Filled from previous output files and from this run's results, so a known address can skip the search and
+    open its property pages directly.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.parcels = {}
+
+    def __len__(self):
+        return len(self.parcels)
 
-        # Step 5: Click on the Correct Property Link
-        for idx, class_code in valid_rows:
+    def lookup(self, address, county=None):
+        """[(parcel_id, property_link), ...] for the address, or [] if it has not been resolved."""
+        with self.lock:
+            return list(self.parcels.get((county or current_profile().name, canonical_address(address)), []))
+
+    def forget(self, address, county=None):
+        with self.lock:
+            self.parcels.pop((county or current_profile().name, canonical_address(address)), None)
+
+    def record_rows(self, rows, county=None, replace=True):
+        """
+        Index the parcels in a batch of output rows. An address's parcels are replaced by the ones in `rows`,
+        unless `replace` is off (seeding from a file that re-runs have appended to).
+        """
+        county = county or current_profile().name
+        by_address = {}
+        for row in rows:
+            if row.get("Address") and row.get("Parcel ID") and row.get("Property Link"):
+                # Keyed by Parcel ID so repeated sale rows (and re-scrapes) keep one link per parcel, the latest
+                by_address.setdefault((county, canonical_address(row["Address"])), {})[row["Parcel ID"]] = row["Property Link"]
+        with self.lock:
+            for key, links in by_address.items():
+                if not replace:
+                    links = dict(dict(self.parcels.get(key, [])), **links)
+                self.parcels[key] = list(links.items())
+        return len(by_address)
+
+    def seed_from_output(self, path, county=None):
+        """Index every address with a Parcel ID and property link in a previous output CSV."""
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            print(f"No previous output at {path} to resolve addresses from.")
+            return 0
+        previous = pd.read_csv(path, usecols=lambda column: column in ("Address", "Parcel ID", "Property Link"), dtype=str)
+        previous = previous.dropna(subset=["Address", "Parcel ID", "Property Link"])
+        seeded = self.record_rows(previous.to_dict("records"), county or current_profile().name, replace=False)
+        print(f"Resolved {seeded} addresses to their property pages from {path}.")
+        return seeded
+
+resolution_index = ResolutionIndex()
+
+# Street-level batch search (--street-batch): the addresses of one street are queued together, and the first of them
+# to be scraped runs one search for the whole street that the others are then matched against
+STREET_BATCH_WINDOW = 2000
+street_batch_window = STREET_BATCH_WINDOW
+
+def street_of(address):
+    """Street part of an address ("123 N Main St #4" -> "N MAIN ST"), or None if it does not start with a house number."""
+    tokens = canonical_address(address).split()
+    if "#" in tokens:
+        tokens = tokens[:tokens.index("#")]
+    if len(tokens) < 2 or not tokens[0][0].isdigit():
+        return None
+    street = tokens[1:]
+    # "123 1/2 Main St"
+    if "/" in street[0]:
+        street = street[1:]
+    return " ".join(street) or None
+
+class StreetIndex:
+    """
+    Results tables of street searches, per county. `expect` registers the queued addresses that share a street;
+    the first of them to ask runs the search, the others wait for it and are matched against the same table.
+    A street's table is dropped once every address registered for it has been released by its worker, whether
+    it used the table or was answered some other way (the page cache, the resolution index).
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.streets = {}
+
+    def expect(self, county, street, addresses):
+        with self.lock:
+            entry = self.streets.setdefault((county, street), {"pending": set(), "searched": None, "results": None})
+            entry["pending"].update(canonical_address(address) for address in addresses)
+
+    def release(self, address):
+        """The worker is done with `address`; drop its street's table if no other address is waiting on it."""
+        key = (current_profile().name, street_of(address))
+        with self.lock:
+            entry = self.streets.get(key)
+            if entry is None:
+                return
+            entry["pending"].discard(canonical_address(address))
+            if not entry["pending"]:
+                del self.streets[key]
+
+    def results_for(self, address, search):
+        """
+        Rows of the street's results table for `address`, running `search(street)` if it is the first address of
+        its street to ask. None when the street was not batched, its search found no table or the address is not
+        in it; the caller then searches for the address on its own.
+        """
+        street = street_of(address)
+        key = (current_profile().name, street)
+        with self.lock:
+            entry = self.streets.get(key)
+            if entry is None:
+                return None
+            searcher = entry["searched"] is None
+            if searcher:
+                entry["searched"] = threading.Event()
+        if searcher:
             try:
-                property_links = driver.find_elements(By.XPATH, '//a[contains(@class, "normal-font-label")]')
-                if idx <= len(property_links):
-                    property_links[idx - 1].click()
-                    print(f"Parcel {idx}: Opened property link.")
-                    time.sleep(2)
-                    
-                    property_link = driver.current_url
-                    print(f"Extracted property link: {property_link}")
-
-                    element_scrape(driver, address, property_link, rental_id_start=400000)
-                else:
-                    print(f"Parcel {idx}: Property link not found. Skipping...")
-                    continue
+                results = search(street)
+                if results is not None:
+                    by_address = {}
+                    for result in results:
+                        by_address.setdefault(canonical_address(result["address"]), []).append(result)
+                    entry["results"] = by_address
+                    log.info("Street search for %s found %s parcels.", street, len(results))
+            finally:
+                entry["searched"].set()
+        else:
+            entry["searched"].wait()
+        if entry["results"] is None:
+            return None
+        return entry["results"].get(canonical_address(address))
+
+street_index = None
+
+def group_by_street(addresses, county, index, window=STREET_BATCH_WINDOW):
+    """
+    Reorder a stream of addresses so that each street's addresses come together, `window` addresses at a time, and
+    register every street with two or more of them in `index` for one shared search.
+    """
+    def flush(buffer):
+        streets = {}
+        for address in buffer:
+            streets.setdefault(street_of(address), []).append(address)
+        for street, group in streets.items():
+            if street is not None and len(group) > 1:
+                index.expect(county, street, group)
+            yield from group
+
+    buffer = []
+    for address in addresses:
+        buffer.append(address)
+        if len(buffer) >= window:
+            yield from flush(buffer)
+            buffer = []
+    yield from flush(buffer)
+
+def append_changelog(changes):
+    """Append changelog entries to the changelog CSV."""
+    if not changes:
+        return
+    with open(changelog_path, 'a', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=CHANGELOG_HEADERS, extrasaction="ignore")
+        if csvfile.tell() == 0:
+            writer.writeheader()
+        writer.writerows(changes)
+
+def blank_row(address, status, rental_id=None):
+    """An output row with only the address, status and RentalID filled in."""
+    entry = dict.fromkeys(OUTPUT_HEADERS)
+    entry.update({"RentalID": rental_id, "Address": address, "Status": status})
+    return entry
+
+# Reads the whole results table in one round trip, with the profile's XPaths; the browser counterpart of
+# beacon_parser.parse_results_page. Returns JSON: whether the "no results" link is shown, and one entry per row.
+RESULTS_TABLE_SCRIPT = """
+const [noResultsXPath, rowsXPath, addressXPath, classXPath, linkXPath, fallbackXPath] = arguments;
+const snapshot = (xpath, context) => {
+    const found = document.evaluate(xpath, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    return Array.from({length: found.snapshotLength}, (_, i) => found.snapshotItem(i));
+};
+const text = node => (node.nodeType === Node.ATTRIBUTE_NODE ? node.value : node.textContent).replace(/\\s+/g, " ").trim();
+const rows = [];
+snapshot(rowsXPath, document).forEach((row, i) => {
+    const addressCells = snapshot(addressXPath, row);
+    if (!addressCells.length) {
+        return;
+    }
+    const classCells = snapshot(classXPath, row);
+    const classText = classCells.length ? text(classCells[0]) : "";
+    let links = snapshot(linkXPath, row);
+    if (!links.length) {
+        links = snapshot(fallbackXPath, row);
+    }
+    rows.push({
+        index: i + 1,
+        address: text(addressCells[0]),
+        class_code: classText ? classText.split(" ")[0] : null,
+        property_link: links.length ? new URL(text(links[0]), document.baseURI).href : null,
+    });
+});
+return JSON.stringify({no_results: snapshot(noResultsXPath, document).length > 0, rows: rows});
+"""
+
+def read_results_table(driver):
+    """The results table as `parse_results_page` would return it, read with one `execute_script` call."""
+    selectors = current_profile().selectors.raw
+    table = json.loads(driver.execute_script(
+        RESULTS_TABLE_SCRIPT, selectors["no_results_link"], selectors["result_rows"], selectors["row_address"],
+        selectors["row_class_cells"], selectors["row_property_links"], selectors["row_fallback_links"],
+    ))
+    return table["no_results"], table["rows"]
+
+@metrics.timed("multiple_pages")
+def multiple_pages(driver, address):
+    """
+    Scrape every parcel in the search results whose address matches `address` and whose class code we keep.
+    The table is read in one script call and filtered here; matching parcels are opened by their links.
+    """
+    try:
+        # Step 1: Read the results table
+        with metrics.span("multiple_pages.filter"):
+            no_results, results = read_results_table(driver)
+        if no_results:
+            log.debug("No results found for address: %s. Resetting search...", address)
+            rate_limiter.acquire(driver.current_url)
+            driver.find_element(By.XPATH, current_profile().selectors.raw["no_results_link"]).click()  # Return to the search page
+            return [blank_row(address, "Address Not Correct")]
+        if not results:
+            log.debug("No parcel links found for address: %s", address)
+            return []
+        log.debug("Found %s parcel links for address: %s", len(results), address)
+
+        # Step 2: Keep the rows for the same address with a class code we scrape
+        valid_rows = matching_results(results, address)
+        if not valid_rows:
+            log.debug("No valid parcels found for address: %s", address)
+            return []
+
+        # Step 3: Open each matching parcel by its link
+        rows = []
+        for result in valid_rows:
+            try:
+                with metrics.span("multiple_pages.open"):
+                    log.debug("Parcel %s: Opening property link %s", result["index"], result["property_link"])
+                    parcel_rows = fetch_property_selenium(driver, result["property_link"], address, claim_rental_id())
+                rows.extend(parcel_rows or [])
+            except (CaptchaRequired, BrowserSessionLost):
+                raise
             except Exception as e:
-                print(f"Parcel {idx}: Unable to click property link. Error: {e}")
-                continue
+                log.warning("Parcel %s: Unable to open property link. Error: %s", result["index"], e)
+        return rows
+    except (CaptchaRequired, BrowserSessionLost):
+        raise
     except Exception as e:
-        print(f"Error processing address '{address}': {e}")
+        log.error("Error processing address '%s': %s", address, e)
         return []
 
-def element_scrape(driver, address, property_link, rental_id_start = 400000):
-    try:
-        rental_id = rental_id_start  # Initialize RentalID
-        transactions = []  # List to store all transactions for the property
-        sales_id_start = 4000000
-
-# 1. scrape the elements that are the same
-        try:
-            property_classification = driver.find_element(By.XPATH, '//table[contains(@class, "tabular-data-two-column")]//tr[11]//span').text.strip()
-            parcel_id = driver.find_element(By.XPATH, '//table[contains(@class, "tabular-data-two-column")]//tr[1]//span').text.strip()
-            property_acres = driver.find_element(By.XPATH, '//table[contains(@class, "tabular-data-two-column")]//tr[10]//span').text.strip()
-            print(f"Property Classification: {property_classification}, Parcel ID: {parcel_id}, Acres: {property_acres}")
-        except Exception as e:
-            print(f"Error extracting general property details for {address}: {e}")
-            return
-# 2. Check for Transfers Section
-        try:
-            # Press Button to show all elements
-            transfers_column = driver.find_element(By.XPATH, '//section[@id="ctlBodyPane_ctl20_mSection"]//button[contains(@class, "dropdown-toggle")]')
-            driver.execute_script("arguments[0].click();", transfers_column)
-            print("Dropdown toggle clicked to display options.")
+def search_street_selenium(driver, street):
+    """
+    Search for a whole street and read every row of its results table, clicking through the result pages.
+    None when the search does not land on a results table.
+    """
+    reset_to_search_page(driver)
+    check_captcha(driver)
+    search_result = search_property(driver, street)
+    metrics.count("beacon_street_searches_total", engine="selenium", result=search_result)
+    if search_result == "captcha":
+        # Raises unless the solver clears it; the addresses are then searched one by one
+        check_captcha(driver)
+        return None
+    if search_result != "search_results":
+        return None
+    record_browser_page_bytes(driver, "search")
+    no_results, results = read_results_table(driver)
+    if no_results:
+        return None
 
-            WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, '//a[@role="menuitemcheckbox"]'))
-            )
-            print("Checkboxes are visible")
-            time.sleep(2)
+    pager = current_profile().selectors.raw["results_pager_links"]
+    visited = {"1"}
+    while True:
+        labels = [link.text.strip() for link in driver.find_elements(By.XPATH, pager)]
+        unvisited = sorted({label for label in labels if label.isdigit()} - visited, key=int)
+        if not unvisited:
+            return results
+        visited.add(unvisited[0])
+        link = driver.find_elements(By.XPATH, pager)[labels.index(unvisited[0])]
+        page = driver.find_element(By.TAG_NAME, "html")
+        rate_limiter.acquire(driver.current_url)
+        driver.execute_script("arguments[0].click();", link)
+        wait_for(driver, "search_submitted", EC.staleness_of(page))
+        wait_for(driver, "search_outcome", search_outcome)
+        check_captcha(driver)
+        record_browser_page_bytes(driver, "search")
+        results.extend(read_results_table(driver)[1])
 
-            checkboxes_to_toggle = [
-            '//a[@role="menuitemcheckbox" and contains(text(), "To")]',
-            '//a[@role="menuitemcheckbox" and contains(text(), "Sale Price")]'
-            ]
+# aria-checked of each sales-grid column checkbox (None where the page has no such checkbox), in one round trip
+COLUMN_STATES_SCRIPT = """
+return arguments[0].map(xpath => {
+    const node = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    return node ? node.getAttribute("aria-checked") : null;
+});
+"""
 
-            # Iterate over the checkbox items
-            for checkbox_xpath in checkboxes_to_toggle:
+@metrics.timed("element_scrape")
+def element_scrape(driver, address, property_link, rental_id_start = 400000):
+    """
+    Scrape the property page the driver is on. The column toggles still go through the browser; every field
+    is then read from a single `page_source` snapshot by `beacon_parser`.
+    """
+    profile = current_profile()
+    selectors = profile.selectors.raw
+    try:
+# 1. Show the "To" and "Sale Price" columns of the transfers section, unless the session already shows them
+        with metrics.span("element_scrape.column_toggles"):
+            column_states = driver.execute_script(COLUMN_STATES_SCRIPT, selectors["column_checkboxes"])
+            if column_states and all(state == "true" for state in column_states):
+                log.debug("Sales grid columns are already shown.")
+            else:
                 try:
-                    # Locate and open the dropdown menu
-                    transfers_column = driver.find_element(By.XPATH, '//section[@id="ctlBodyPane_ctl20_mSection"]//button[contains(@class, "dropdown-toggle")]')
+                    # Press Button to show all elements
+                    transfers_column = driver.find_element(By.XPATH, selectors["transfers_column_toggle"])
                     driver.execute_script("arguments[0].click();", transfers_column)
-                    print("Dropdown toggle reopened.")
+                    log.debug("Dropdown toggle clicked to display options.")
 
-                    # Locate the checkbox element
-                    checkbox = WebDriverWait(driver, 5).until(
-                        EC.presence_of_element_located((By.XPATH, checkbox_xpath))
+                    wait_for(driver, "column_menu",
+                        EC.visibility_of_element_located((By.XPATH, selectors["column_menu_item"]))
                     )
+                    log.debug("Checkboxes are visible")
 
-                    # Check the current state of the checkbox using aria-checked attribute
-                    aria_checked = checkbox.get_attribute("aria-checked")
-                    if aria_checked == "true":
-                        print(f"Checkbox '{checkbox_xpath}' is already checked. Skipping...")
-                    else:
-                        driver.execute_script("arguments[0].scrollIntoView({ behavior: 'smooth', block: 'center' });", checkbox)
-                        time.sleep(0.5)
-                        driver.execute_script("arguments[0].click();", checkbox)
-                        print(f"Checkbox '{checkbox_xpath}' clicked successfully.")
-                        time.sleep(1)
-                except Exception as e:
-                    print(f"Error interacting with checkbox '{checkbox_xpath}': {e}")
-
-            print("Specified checkboxes are now checked.")
-            # Scraping Date elements after clicking checkboxes
-            valid_rows = []
-            date_elements = driver.find_elements(By.XPATH, './/table[contains(@id, "ctlBodyPane_ctl20_ctl01_grdSales_grdFlat")]//tbody//tr//th')
-            
-            for idx, date_element in enumerate(date_elements, start=1):
-                try:
-                    date_text = date_element.text.strip()
-                    transaction_date = datetime.strptime(date_text, "%m/%d/%Y")
-                    cutoff_date = datetime.strptime("01/01/2000", "%m/%d/%Y")
-
-                    if transaction_date >= cutoff_date:
-                        valid_rows.append(idx)
-                        print(f"Valid Row {idx}: Date={date_text}")
-                    else:
-                        print(f"Invalid Date (Before 2000): {date_text} (Row {idx})")
-                except Exception as e:
-                    print(f"Error processing Row {idx}: {e}")
-            # Process the valid rows stored in `valid_rows`
-            transactions = []
-            for idx in valid_rows:
-                try:
-                    date_element = driver.find_element(
-                        By.XPATH, f'//table[contains(@id, "ctlBodyPane_ctl20_ctl01_grdSales_grdFlat")]//tbody//tr[{idx}]//th[1]'
-                    )
-                    date_text = date_element.text.strip()
-                    # Extract details for each valid row
-                    type_of_transfer = driver.find_element(
-                        By.XPATH, f'//table[contains(@id, "ctlBodyPane_ctl20_ctl01_grdSales_grdFlat")]//tbody//tr[{idx}]//td[2]'
-                    ).text.strip()
-                    instrument_transfer = driver.find_element(
-                        By.XPATH, f'//table[contains(@id, "ctlBodyPane_ctl20_ctl01_grdSales_grdFlat")]//tbody//tr[{idx}]//td[3]'
-                    ).text.strip()
-                    transfer_to = driver.find_element(
-                        By.XPATH, f'//table[contains(@id, "ctlBodyPane_ctl20_ctl01_grdSales_grdFlat")]//tbody//tr[{idx}]//td[5]'
-                    ).text.strip()
-                    sales_price = driver.find_element(
-                        By.XPATH, f'//table[contains(@id, "ctlBodyPane_ctl20_ctl01_grdSales_grdFlat")]//tbody//tr[{idx}]//td[6]'
-                    ).text.strip()
-                    # Element scrape above
-                    transaction = {
-                        "RentalID": rental_id,  # Stays the same for the property
-                        "SalesID": sales_id_start,  # Unique for each transaction
-                        "Address": address,
-                        "Beds": None,  # To be updated for residential properties
-                        "Date": date_text,
-                        "Price": sales_price,
-                        "SQFT": None,  # To be updated for residential properties
-                        "Transfer Type": type_of_transfer,
-                        "Instrument": instrument_transfer,
-                        "Transfer To": transfer_to,
-                        "Property Classification": property_classification,
-                        "Parcel ID": parcel_id,
-                        "Acres": property_acres,
-                        "Zoning Class": None,  # To be updated for residential properties
-                        "Year Built": None,  # To be updated for residential properties
-                        "Year Improved/Renovated": None,  # To be updated for residential properties
-                        "Grade": None,  # To be updated for residential properties
-                        "Property Link": property_link,
-                        "Status": None
-                    }
-                    transactions.append(transaction)
-                    print(f"Transaction for Row {idx}: {transaction}")
-                    sales_id_start += 1
+                    checkboxes_to_toggle = selectors["column_checkboxes"]
+
+                    # Iterate over the checkbox items
+                    for checkbox_xpath in checkboxes_to_toggle:
+                        try:
+                            # Locate and open the dropdown menu
+                            transfers_column = driver.find_element(By.XPATH, selectors["transfers_column_toggle"])
+                            driver.execute_script("arguments[0].click();", transfers_column)
+                            log.debug("Dropdown toggle reopened.")
+
+                            # Locate the checkbox element
+                            checkbox = wait_for(driver, "column_menu",
+                                EC.presence_of_element_located((By.XPATH, checkbox_xpath))
+                            )
+
+                            # Check the current state of the checkbox using aria-checked attribute
+                            aria_checked = checkbox.get_attribute("aria-checked")
+                            if aria_checked == "true":
+                                log.debug("Checkbox '%s' is already checked. Skipping...", checkbox_xpath)
+                            else:
+                                sales_grid = driver.find_element(By.XPATH, selectors["sales_grid"])
+                                header_count = len(sales_grid.find_elements(By.XPATH, './/thead//th'))
+                                driver.execute_script("arguments[0].scrollIntoView({ block: 'center' });", checkbox)
+                                driver.execute_script("arguments[0].click();", checkbox)
+                                log.debug("Checkbox '%s' clicked successfully.", checkbox_xpath)
+                                # Wait for the checkbox to flip and the grid to show the new column
+                                wait_for(driver, "checkbox_checked", attribute_equals(checkbox, "aria-checked", "true"))
+                                try:
+                                    wait_for(driver, "sales_grid", grid_rerendered(sales_grid, header_count))
+                                except TimeoutException:
+                                    log.debug("Sales grid did not re-render after '%s'.", checkbox_xpath)
+                        except Exception as e:
+                            log.warning("Error interacting with checkbox '%s': %s", checkbox_xpath, e)
+
+                    log.debug("Specified checkboxes are now checked.")
+                    # Beacon keeps the column choice for the session; save it so new sessions start with it
+                    if session_snapshot_path and not (session_snapshot or {}).get("columns_set"):
+                        column_states = driver.execute_script(COLUMN_STATES_SCRIPT, selectors["column_checkboxes"])
+                        if all(state == "true" for state in column_states):
+                            save_session_snapshot(driver, columns_set=True)
                 except Exception as e:
-                    print(f"Error extracting transaction details for Row {idx}: {e}")            
-            if not transactions:
-                minimal_transaction = {
-                    "RentalID": rental_id,
-                    "SalesID": None,
-                    "Address": address,
-                    "Beds": None,
-                    "Date": None,
-                    "Price": None,
-                    "SQFT": None,
-                    "Transfer Type": None,
-                    "Instrument": None,
-                    "Transfer To": None,
-                    "Property Classification": property_classification,
-                    "Parcel ID": parcel_id,
-                    "Acres": property_acres,
-                    "Zoning Class": None,
-                    "Year Built": None,
-                    "Year Improved/Renovated": None,
-                    "Grade": None,
-                    "Property Link": property_link,
-                    "Status": None
-                }
-                transactions.append(minimal_transaction)
-                print(f"No transactions for {address}. Minimal record added.")          
+                    log.debug("Transfers section not found for %s: %s", address, e)
+
+# 2. Take one snapshot of the page and extract every field offline
+        with metrics.span("element_scrape.snapshot"):
+            html = driver.page_source
+        record_browser_page_bytes(driver, "property")
+        with metrics.span("element_scrape.parse"):
+            transactions = parse_property_page(html, address, property_link, rental_id_start, profile.sales_cutoff, profile.selectors)
+        if transactions is not None:
+            rate_limiter.success(property_link)
+        if transactions:
+            log.debug("Parsed %s transactions for %s (Parcel ID: %s)", len(transactions), address, transactions[0]['Parcel ID'])
+        if transactions is not None:
+            cache_page(property_link, property_link, html, address=address, parcel_id=transactions[0]["Parcel ID"] if transactions else None)
+        return transactions
+
+    except Exception as overall_exception:
+        log.error("Unexpected error during scraping for %s: %s", address, overall_exception)
+        return []
+
+class CaptchaRequired(Exception):
+    """Raised when Beacon serves a CAPTCHA instead of the page asked for."""
+
+class SearchFailed(Exception):
+    """The search for an address timed out or errored. `kind` is its failure kind (see `beacon_retry`)."""
+    def __init__(self, address, kind):
+        super().__init__(f"search for '{address}' failed ({kind})")
+        self.kind = kind
+
+def classify_failure(error):
+    """Failure kind of an exception raised while scraping an address, for the retry scheduler."""
+    if isinstance(error, SearchFailed):
+        return error.kind
+    if isinstance(error, CaptchaRequired):
+        return "captcha"
+    if isinstance(error, (TimeoutException, requests.Timeout)):
+        return "timeout"
+    if isinstance(error, StaleElementReferenceException):
+        return "stale_element"
+    return "site_error"
+
+# CAPTCHAs are only handed to the solver when this is on (--captcha-solver, or the --solve-parked step); otherwise the address is parked
+solve_captchas = False
+captcha_solver_lock = threading.Lock()
+
+def captcha_on_page(driver):
+    """Immediate CAPTCHA check on the current page, with no waiting."""
+    return bool(driver.find_elements(By.XPATH, current_profile().selectors.raw["captcha"]))
+
+def prompt_operator(driver):
+    """Default CAPTCHA solver: ask whoever runs the scraper to solve it in the open browser."""
+    input("CAPTCHA detected. Solve it in the browser, then press Enter to continue...")
+    return True
+
+# Called with the driver showing a CAPTCHA; returns True once it is solved. Swapped for --captcha-solver
+captcha_solver = prompt_operator
+
+def solve_captcha(driver):
+    """Hand the CAPTCHA on the current page to the solver, one at a time. True if the page is clear afterwards."""
+    with captcha_solver_lock:
+        try:
+            solved = captcha_solver(driver)
         except Exception as e:
-            print(f"Transfers section not found for {address}: {e}")
+            log.warning("CAPTCHA solver failed: %s", e)
+            return False
+    if solved and not captcha_on_page(driver):
+        metrics.count("beacon_captchas_solved_total")
+        log.warning("CAPTCHA solved. Resuming...")
+        return True
+    return False
 
-# 2. Check if it is a residential property, if it is scrape more elements
+@metrics.timed("check_captcha")
+def check_captcha(driver):
+    """
+    Raise CaptchaRequired if the current page is a CAPTCHA, unless solving is on and the solver clears it.
+    Pages without a CAPTCHA cost one find_elements call.
+    """
+    if not captcha_on_page(driver):
+        return
+    metrics.count("beacon_captchas_total", engine="selenium")
+    rate_limiter.backoff(current_url(driver), "captcha")
+    if solve_captchas and solve_captcha(driver):
+        return
+    raise CaptchaRequired(driver.current_url)
+
+def load_captcha_solver(spec):
+    """Import a solver given as "package.module:function"."""
+    module_name, _, function_name = spec.partition(":")
+    if not function_name:
+        raise ValueError(f"Expected module:function, got {spec!r}")
+    return getattr(importlib.import_module(module_name), function_name)
+
+def matching_results(results, address):
+    """Rows of a parsed results table for the same canonical address as `address` whose class code we scrape."""
+    searched_address = canonical_address(address)
+    class_codes = current_profile().class_codes
+    return [
+        result for result in results
+        if canonical_address(result["address"]) == searched_address and result["class_code"] in class_codes and result["property_link"]
+    ]
+
+def readable_search_page(html, selectors):
+    """A results table or a no-results page: the search pages worth caching, as the cache can answer from them later."""
+    tree = to_tree(html)
+    return bool(selectors["result_rows"](tree)) or is_no_results_page(tree, selectors)
+
+def scrape_from_cache(address, ignore_ttl=False):
+    """
+    Rebuild the rows for an address from cached pages only. Returns None when the cache cannot answer
+    (a page is missing, expired or does not parse), so the caller goes to the network instead.
+    """
+    if page_cache is None:
+        return None
+    cached_search = page_cache.get(search_cache_key(address), ignore_ttl=ignore_ttl)
+    if cached_search is None:
+        return None
+    url, html = cached_search
+    profile = current_profile()
+
+    if url and "PageTypeID=4" in url:
+        return parse_property_page(html, address, url, claim_rental_id(), profile.sales_cutoff, profile.selectors)
+    tree = to_tree(html)
+    if is_no_results_page(tree, profile.selectors):
+        return [blank_row(address, "Address Not Correct")]
+    if not readable_search_page(tree, profile.selectors):
+        return None
+
+    rows = []
+    for result in matching_results(parse_results_page(tree, url, profile.selectors), address):
+        cached_property = page_cache.get(result["property_link"], ignore_ttl=ignore_ttl)
+        if cached_property is None:
+            return None
+        parcel_rows = parse_property_page(cached_property[1], address, cached_property[0], claim_rental_id(), profile.sales_cutoff, profile.selectors)
+        if parcel_rows is None:
+            return None
+        rows.extend(parcel_rows)
+    return rows
+
+def reparse_from_cache(sink):
+    """Rebuild the output from every cached search of the current county, with no network access."""
+    addresses = 0
+    prefix = f"search:{current_profile().name}:"
+    for key, address in page_cache.entries("search"):
+        if not key.startswith(prefix):
+            continue
+        rows = scrape_from_cache(address, ignore_ttl=True)
+        if rows is None:
+            log.warning("Cache is missing property pages for %s. Skipping...", address)
+            continue
+        sink.write(number_sales(rows))
+        addresses += 1
+    print(f"Rebuilt output for {addresses} addresses from the page cache.")
+
+def scrape_known_parcels(fetch_property, session, address):
+    """
+    Fast path for an address resolved before: open its property pages straight from the resolution index, one
+    page load per parcel, instead of searching. Returns None when the address is unknown or one of its links has
+    gone stale, and the caller searches instead.
+    """
+    parcels = resolution_index.lookup(address) if resolution_index is not None else []
+    if not parcels:
+        return None
+    rows = []
+    for parcel_id, property_link in parcels:
         try:
-            residential_property_xpath = (By.XPATH, '//section[@id="ctlBodyPane_ctl16_mSection"]')
-                
-            if residential_property_xpath:
-                # For residential property we just have to extract this. 
-                print(f"{address} is a residential property... Continue with residential scraping")
-                zoning_classification = driver.find_element(By.XPATH, '//div[contains(@id,"ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuildingDataLeftColumn_rptrDynamicColumns_ctl00_pnlSingleValue")]').text.strip()
-                year_built = driver.find_element(By.XPATH, '//div[contains(@id,"ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuildingDataLeftColumn_rptrDynamicColumns_ctl01_pnlSingleValue")]').text.strip()
-                effective_year_built = driver.find_element(By.XPATH, '//div[contains(@id,"ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuildingDataLeftColumn_rptrDynamicColumns_ctl02_pnlSingleValue")]').text.strip()
-                bedrooms = driver.find_element(By.XPATH, '//div[contains(@id,"ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuildingDataLeftColumn_rptrDynamicColumns_ctl05_pnlSingleValue")]').text.strip()
-                square_footage = driver.find_element(By.XPATH, '//div[contains(@id,"ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuildingDataRightColumn_rptrDynamicColumns_ctl06_pnlSingleValue")]').text.strip()
-                property_grade = driver.find_element(By.XPATH, '//div[contains(@id,"ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuildingDataRightColumn_rptrDynamicColumns_ctl11_pnlSingleValue")]').text.strip()
-
-                for transaction in transactions:
-                    transaction["Beds"] = bedrooms
-                    transaction["Zoning Class"] = zoning_classification
-                    transaction["Year Built"] = year_built
-                    transaction["Year Improved/Renovated"] = effective_year_built
-                    transaction["SQFT"] = square_footage
-                    transaction["Grade"] = property_grade   
-            else:
-                print(f"{address} is a multi-family property... Ignore residential elements")
+            parcel_rows = fetch_property(session, property_link, address, claim_rental_id())
+        except (CaptchaRequired, BrowserSessionLost):
+            raise
         except Exception as e:
-                print(f"Error figuring out if {address} is a residential or multi-family property")
-        return transactions  
+            log.debug("Opening %s for %s failed: %s", property_link, address, e)
+            parcel_rows = None
+        if parcel_rows is None or (parcel_rows and parcel_rows[0]["Parcel ID"] != parcel_id):
+            metrics.count("beacon_direct_fetch_total", result="stale")
+            log.info("Property link of parcel %s for %s is stale. Searching instead...", parcel_id, address)
+            resolution_index.forget(address)
+            return None
+        rows.extend(parcel_rows)
+    metrics.count("beacon_direct_fetch_total", result="hit")
+    log.debug("Opened %s known parcels of %s directly.", len(parcels), address)
+    return rows
 
-    except Exception as overall_exception:
-        print(f"Unexpected error during scraping for {address}: {overall_exception}")
-        return []
+def scrape_street_matches(search_street, fetch_property, session, address):
+    """
+    Batch path for an address queued with others on its street: open its parcels from the street's shared results
+    table, keeping the class codes we scrape. An address with a single parcel is opened whatever its class, as
+    the search for it alone would have landed on its property page. Returns None when the street search cannot
+    answer for the address, and the caller searches for it on its own.
+    """
+    if street_index is None:
+        return None
+    results = street_index.results_for(address, functools.partial(search_street, session))
+    if results is None:
+        return None
+    metrics.count("beacon_street_matches_total")
+    if len(results) == 1 and results[0]["property_link"]:
+        return fetch_property(session, results[0]["property_link"], address, claim_rental_id()) or []
+    rows = []
+    for result in matching_results(results, address):
+        log.debug("Parcel %s: Opening property link %s from the street search", result["index"], result["property_link"])
+        rows.extend(fetch_property(session, result["property_link"], address, claim_rental_id()) or [])
+    return rows
+
+def process_address(driver, address):
+    """
+    Search and scrape one address. Returns the rows to write and the status for the address log.
+    """
+    cached_rows = scrape_from_cache(address)
+    metrics.count("beacon_page_cache_total", result="miss" if cached_rows is None else "hit")
+    if cached_rows is not None:
+        log.info("Served %s from the page cache.", address)
+        return (cached_rows, "Scraped") if cached_rows else ([], "No Data")
+
+    # Known address: go straight to its property pages
+    known_rows = scrape_known_parcels(fetch_property_selenium, driver, address)
+    if known_rows is not None:
+        return (known_rows, "Scraped") if known_rows else ([], "No Data")
 
-def handle_captcha(driver):
+    # Batched address: match it against its street's results table
+    street_rows = scrape_street_matches(search_street_selenium, fetch_property_selenium, driver, address)
+    if street_rows is not None:
+        return (street_rows, "Scraped") if street_rows else ([], "No Data")
+
+    # Reset to the search page before processing the address
+    reset_to_search_page(driver)
+    check_captcha(driver)
+
+    # Perform property search
+    search_result = search_property(driver, address)
+    if search_result == "captcha":
+        # Raises (and the worker parks the address) unless the solver clears it
+        check_captcha(driver)
+        search_result = search_property(driver, address)
+        if search_result == "captcha":
+            raise CaptchaRequired(driver.current_url)
+    metrics.count("beacon_search_results_total", engine="selenium", result=search_result)
+    if search_result != "direct_navigation":
+        # Direct navigation lands on a property page, which element_scrape measures
+        record_browser_page_bytes(driver, "search")
+
+    # Initialize data to write as empty
+    data_to_write = []
+
+    if search_result == "direct_navigation":
+        # Directly scrape the property
+        log.debug("Direct navigation for address: %s", address)
+        data_to_write = element_scrape(driver, address, driver.current_url, claim_rental_id())
+        if data_to_write is not None:
+            cache_page(search_cache_key(address), driver.current_url, driver.page_source, kind="search", address=address)
+
+    elif search_result == "search_results":
+        # Process search results and scrape data
+        log.debug("Processing search results for address: %s", address)
+        html = driver.page_source
+        if readable_search_page(html, current_profile().selectors):
+            cache_page(search_cache_key(address), driver.current_url, html, kind="search", address=address)
+        data_to_write = multiple_pages(driver, address)
+
+    elif search_result == "no_results":
+        # Append no results entry if the property doesn't exist
+        log.debug("No results found for address: %s", address)
+        no_result_entry = {
+            "RentalID": claim_rental_id(advance=False),
+            "SalesID": None,
+            "Address": address,
+            "Beds": None,
+            "Date": None,
+            "Price": None,
+            "SQFT": None,
+            "Transfer Type": None,
+            "Instrument": None,
+            "Transfer To": None,
+            "Property Classification": None,
+            "Parcel ID": None,
+            "Acres": None,
+            "Zoning Class": None,
+            "Year Built": None,
+            "Year Improved/Renovated": None,
+            "Grade": None,
+            "Property Link": None,
+            "Status": "No Results"
+        }
+        data_to_write = [no_result_entry]
+    else:
+        # The search never got to a page we can read; the worker schedules a retry
+        raise SearchFailed(address, "site_error" if search_result == "error" else search_result)
+
+    if data_to_write:
+        return data_to_write, "Scraped"
+    log.debug("No data found to write for address: %s", address)
+    return [], "No Data"
+
+# Browserless engine: replay the Beacon WebForms postbacks with a pooled HTTP client
+HTTP_TIMEOUT = 30
+
+# Cookies and user agent from the last browser handshake, shared by every HTTP worker
+browser_handshake_lock = threading.Lock()
+browser_handshake = None
+
+def run_browser_handshake(start_url, force=False):
     """
-    Detect and handle CAPTCHA by pausing execution until the user solves it.
+    Open Chrome just long enough to accept the terms popup (and any CAPTCHA) and return its cookies and user agent.
+    The result is cached so HTTP workers only start a browser when the site asks for one.
     """
+    global browser_handshake
+    with browser_handshake_lock:
+        if browser_handshake is not None and not force:
+            return browser_handshake
+        # An operator may have to solve a CAPTCHA in this browser, so it is never headless
+        driver = create_driver(headless=False)
+        try:
+            rate_limiter.acquire(start_url)
+            driver.get(start_url)
+            handle_popup(driver)
+            # Nothing can be fetched without these cookies, so the handshake always waits for the solver
+            if captcha_on_page(driver) and not solve_captcha(driver):
+                raise CaptchaRequired(start_url)
+            browser_handshake = {
+                "cookies": driver.get_cookies(),
+                "user_agent": driver.execute_script("return navigator.userAgent;"),
+            }
+            print(f"Browser handshake complete with {len(browser_handshake['cookies'])} cookies.")
+        finally:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error during driver.quit(): {e}")
+        return browser_handshake
+
+# Cookies that tie a browser (or HTTP session) to its own server-side session; sharing them would mix up the workers' searches
+PER_SESSION_COOKIES = {"ASP.NET_SessionId"}
+
+def apply_browser_handshake(session, handshake):
+    """Copy the browser's cookies and user agent onto an HTTP session. The site gives it its own session id."""
+    session.headers["User-Agent"] = handshake["user_agent"]
+    for cookie in handshake["cookies"]:
+        if cookie["name"] in PER_SESSION_COOKIES:
+            continue
+        session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain") or "", path=cookie.get("path", "/"))
+
+def create_http_session(pool_size=4):
+    """Create a pooled HTTP session with retries on transient server errors."""
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["GET", "POST"])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def http_fetch(session, method, url, **kwargs):
+    """Issue a request and parse the response. Raises CaptchaRequired when the site serves a CAPTCHA."""
+    rate_limiter.acquire(url)
     try:
-        # Check for CAPTCHA presence by identifying the iframe or its container
-        captcha_present = WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.XPATH, '//div[@class="g-recaptcha"]'))
+        with metrics.span("http_fetch"):
+            response = session.request(method, url, timeout=HTTP_TIMEOUT, **kwargs)
+    except (requests.Timeout, requests.ConnectionError):
+        rate_limiter.backoff(url, "timeout")
+        raise
+    metrics.count("beacon_http_responses_total", method=method, status=response.status_code)
+    record_page_bytes("property" if "PageTypeID=4" in response.url else "search", int(response.headers.get("Content-Length") or len(response.content)))
+    if response.status_code >= 500 or response.status_code == 429:
+        rate_limiter.backoff(url, "error")
+    response.raise_for_status()
+    tree = to_tree(response.content, base_url=response.url)
+    if is_captcha_page(tree, current_profile().selectors):
+        metrics.count("beacon_captchas_total", engine="http")
+        rate_limiter.backoff(url, "captcha")
+        raise CaptchaRequired(url)
+    rate_limiter.success(url)
+    return response, tree
+
+def parse_search_form(tree, page_url):
+    """
+    Pull the postback target and form fields (__VIEWSTATE, __EVENTVALIDATION, ...) from the search page.
+    """
+    forms = tree.xpath('//form')
+    if not forms:
+        raise ValueError(f"No form found on search page {page_url}")
+    form = forms[0]
+    action = urljoin(page_url, form.get("action") or page_url)
+
+    fields = {}
+    for hidden_input in form.xpath('.//input[@type="hidden"][@name]'):
+        fields[hidden_input.get("name")] = hidden_input.get("value") or ""
+
+    selectors = current_profile().selectors.raw
+    search_box = form.xpath(f'.//input[@id="{selectors["search_box_id"]}"]')
+    if not search_box:
+        raise ValueError(f"Search box not found on search page {page_url}")
+    address_field = search_box[0].get("name")
+
+    # The search button is a LinkButton: href="javascript:__doPostBack('ctlBodyPane$ctl02$ctl01$btnSearch','')"
+    event_target = selectors["search_button_id"].replace("_", "$")
+    search_button = form.xpath(f'.//a[@id="{selectors["search_button_id"]}"]')
+    if search_button:
+        match = re.search(r"__doPostBack\('([^']*)'", search_button[0].get("href") or "")
+        if match:
+            event_target = match.group(1)
+
+    return {"action": action, "fields": fields, "address_field": address_field, "event_target": event_target}
+
+def start_http_session(start_url):
+    """Create an HTTP session that has already been through the terms popup."""
+    session = create_http_session()
+    apply_browser_handshake(session, run_browser_handshake(start_url))
+    session.beacon_start_url = start_url
+    session.beacon_search_form = None
+    return session
+
+@metrics.timed("http_search")
+def http_search(session, address):
+    """
+    Post the address search. Returns the search outcome (same names as `search_property`) plus the final response and tree.
+    """
+    if session.beacon_search_form is None:
+        response, tree = http_fetch(session, "GET", session.beacon_start_url)
+        session.beacon_search_form = parse_search_form(tree, response.url)
+    form = session.beacon_search_form
+
+    payload = dict(form["fields"])
+    payload["__EVENTTARGET"] = form["event_target"]
+    payload["__EVENTARGUMENT"] = ""
+    payload[form["address_field"]] = address
+    log.info("Searching for address: %s", address)
+    try:
+        response, tree = http_fetch(session, "POST", form["action"], data=payload)
+    except requests.HTTPError:
+        # Stale __VIEWSTATE/__EVENTVALIDATION; fetch a fresh search form next time
+        session.beacon_search_form = None
+        raise
+
+    if "PageTypeID=4" in response.url:
+        return "direct_navigation", response, tree
+    if is_results_page(tree, current_profile().selectors):
+        return "search_results", response, tree
+    return "no_results", response, tree
+
+def follow_results_pager(session, tree, page_url, link):
+    """Post the __doPostBack of a results-page pager link. Returns the response and tree, or None if it is not a postback."""
+    match = re.search(r"__doPostBack\('([^']*)',\s*'([^']*)'\)", link.get("href") or "")
+    forms = tree.xpath('//form')
+    if match is None or not forms:
+        return None
+    fields = {field.get("name"): field.get("value") or "" for field in forms[0].xpath('.//input[@name]')}
+    fields["__EVENTTARGET"], fields["__EVENTARGUMENT"] = match.groups()
+    return http_fetch(session, "POST", urljoin(page_url, forms[0].get("action") or page_url), data=fields)
+
+@metrics.timed("http_street_search")
+def search_street_http(session, street):
+    """
+    HTTP counterpart of `search_street_selenium`: every row of a street search's results table, across its pages,
+    or None when the search does not land on a results table.
+    """
+    search_result, response, tree = http_search(session, street)
+    metrics.count("beacon_street_searches_total", engine="http", result=search_result)
+    selectors = current_profile().selectors
+    if search_result != "search_results" or is_no_results_page(tree, selectors):
+        return None
+    results = parse_results_page(tree, response.url, selectors)
+
+    visited = {"1"}
+    while True:
+        links = {" ".join(link.text_content().split()): link for link in selectors["results_pager_links"](tree)}
+        unvisited = sorted({label for label in links if label.isdigit()} - visited, key=int)
+        if not unvisited:
+            return results
+        visited.add(unvisited[0])
+        followed = follow_results_pager(session, tree, response.url, links[unvisited[0]])
+        if followed is None:
+            return results
+        response, tree = followed
+        results.extend(parse_results_page(tree, response.url, selectors))
+
+def process_address_http(session, address):
+    """
+    HTTP counterpart of `process_address`: returns the rows to write and the status for the address log.
+    """
+    cached_rows = scrape_from_cache(address)
+    metrics.count("beacon_page_cache_total", result="miss" if cached_rows is None else "hit")
+    if cached_rows is not None:
+        log.info("Served %s from the page cache.", address)
+        return (cached_rows, "Scraped") if cached_rows else ([], "No Data")
+
+    # Known address: go straight to its property pages
+    known_rows = scrape_known_parcels(fetch_property_http, session, address)
+    if known_rows is not None:
+        return (known_rows, "Scraped") if known_rows else ([], "No Data")
+
+    # Batched address: match it against its street's results table
+    street_rows = scrape_street_matches(search_street_http, fetch_property_http, session, address)
+    if street_rows is not None:
+        return (street_rows, "Scraped") if street_rows else ([], "No Data")
+
+    try:
+        search_result, response, tree = http_search(session, address)
+    except CaptchaRequired:
+        if not solve_captchas:
+            raise
+        # Only a real browser can get past the CAPTCHA; refresh the shared cookies and try once more
+        log.warning("CAPTCHA served while searching for %s. Handing off to the browser...", address)
+        apply_browser_handshake(session, run_browser_handshake(session.beacon_start_url, force=True))
+        session.beacon_search_form = None
+        search_result, response, tree = http_search(session, address)
+    metrics.count("beacon_search_results_total", engine="http", result=search_result)
+    profile = current_profile()
+
+    if search_result == "direct_navigation":
+        log.debug("Direct navigation for address: %s", address)
+        with metrics.span("parse_property_page"):
+            data_to_write = parse_property_page(tree, address, response.url, claim_rental_id(), profile.sales_cutoff, profile.selectors)
+        if data_to_write is not None:
+            cache_page(search_cache_key(address), response.url, response.content, kind="search", address=address)
+            cache_page(response.url, response.url, response.content, address=address)
+
+    elif search_result == "search_results":
+        if readable_search_page(tree, profile.selectors):
+            cache_page(search_cache_key(address), response.url, response.content, kind="search", address=address)
+        if is_no_results_page(tree, profile.selectors):
+            log.debug("No results found for address: %s.", address)
+            return [blank_row(address, "Address Not Correct")], "Scraped"
+
+        data_to_write = []
+        with metrics.span("parse_results_page"):
+            results = matching_results(parse_results_page(tree, selectors=profile.selectors), address)
+        for result in results:
+            log.debug("Parcel %s: Opening property link %s", result['index'], result['property_link'])
+            property_response, property_tree = http_fetch(session, "GET", result["property_link"])
+            with metrics.span("parse_property_page"):
+                rows = parse_property_page(property_tree, address, property_response.url, claim_rental_id(), profile.sales_cutoff, profile.selectors)
+            if rows is not None:
+                cache_page(result["property_link"], property_response.url, property_response.content, address=address)
+            if rows:
+                data_to_write.extend(rows)
+
+    else:
+        log.debug("No results found for address: %s", address)
+        data_to_write = [blank_row(address, "No Results", claim_rental_id(advance=False))]
+
+    if data_to_write:
+        return data_to_write, "Scraped"
+    log.debug("No data found to write for address: %s", address)
+    return [], "No Data"
+
+def fetch_property_selenium(driver, property_link, address, rental_id):
+    """Open a known property page directly and scrape it."""
+    rate_limiter.acquire(property_link)
+    driver.get(property_link)
+    wait_for(driver, "property_page", EC.presence_of_element_located((By.XPATH, current_profile().selectors.raw["general_details"])))
+    return element_scrape(driver, address, property_link, rental_id)
+
+def fetch_property_http(session, property_link, address, rental_id):
+    """Fetch a known property page over HTTP and parse it."""
+    response, tree = http_fetch(session, "GET", property_link)
+    profile = current_profile()
+    rows = parse_property_page(tree, address, response.url, rental_id, profile.sales_cutoff, profile.selectors)
+    if rows is not None:
+        cache_page(property_link, response.url, response.content, address=address)
+    return rows
+
+def process_parcel(fetch_property, session, parcel_id):
+    """
+    Incremental scrape of one known parcel: go straight to its property link, compare the sales grid with the
+    last scrape and return only new or changed sales, plus the parcel's new state for the writer to save.
+    """
+    previous = parcel_state.get(parcel_id)
+    rows = fetch_property(session, previous["property_link"], previous["address"], claim_rental_id())
+    # [] is a parcel page with no transfers section: a valid parcel with no sales
+    if rows is None or (rows and rows[0]["Parcel ID"] != parcel_id):
+        log.warning("Property link for parcel %s no longer opens that parcel: %s", parcel_id, previous['property_link'])
+        return [], "Stale Link", None
+
+    sales = sales_from_rows(rows)
+    update = {"parcel_id": parcel_id, "address": previous["address"], "property_link": previous["property_link"], "sales": sales, "changes": []}
+    if sales_hash(sales) == previous["sales_hash"]:
+        log.debug("Parcel %s: no new sales since last scrape.", parcel_id)
+        return [], "Unchanged", update
+
+    update["changes"] = diff_sales(previous["sales"], sales)
+    changed_keys = {tuple(change.get(field) for field in SALE_KEY_FIELDS) for change in update["changes"] if change["Change"] != "Removed Sale"}
+    new_rows = [row for row in rows if tuple(row.get(field) for field in SALE_KEY_FIELDS) in changed_keys]
+    log.info("Parcel %s: %s changes, %s new or changed sales.", parcel_id, len(update['changes']), len(new_rows))
+    return new_rows, "Updated", update
+
+def acknowledge_result(address, status, rows, parcel_update, store=None):
+    """
+    Runs once a result's rows are on disk: record the status (in `store`, or the run's) and the parcel state.
+    Incremental results carry a `parcel_update` (just the Parcel ID when the check failed) and are recorded in the
+    parcel state only, never in the address status store.
+    """
+    metrics.count("beacon_addresses_total", status=status)
+    if parcel_update is not None:
+        if "sales" in parcel_update:
+            parcel_state.save(parcel_update["parcel_id"], parcel_update["address"], parcel_update["property_link"], parcel_update["sales"])
+            now = datetime.now().isoformat(timespec="seconds")
+            append_changelog([
+                dict(change, **{"Detected At": now, "Parcel ID": parcel_update["parcel_id"], "Address": parcel_update["address"]})
+                for change in parcel_update["changes"]
+            ])
+        parcel_state.set_check_status(parcel_update["parcel_id"], status)
+        return
+    update_address_log(address, status, store)
+    if parcel_state is not None:
+        parcel_state.record_rows(rows)
+
+# Sentinel a worker puts on the result queue once its session has shut down
+WORKER_DONE = object()
+
+# Seconds a worker pauses after a CAPTCHA before taking its next address
+CAPTCHA_COOLDOWN = 120
+captcha_cooldown = CAPTCHA_COOLDOWN
+
+# Chrome is restarted after this many addresses, or once it uses more than this much memory (0 turns either check off)
+BROWSER_RECYCLE_AFTER = 250
+BROWSER_MAX_RSS_MB = 2048
+# Memory is only measured every few addresses, since it walks every Chrome process
+RSS_CHECK_EVERY = 10
+# How often an address whose browser died under it goes back on the queue before it is marked "Error"
+MAX_REQUEUES = 2
+# Tries an address gets when its scrape fails, before it is marked "Failed After Retry"
+max_attempts = MAX_ATTEMPTS
+
+def status_after_retries(status, failures):
+    """
+    Final status of an address given how many earlier attempts failed (RetryScheduler.finish). `status` is None
+    when the last attempt failed too.
+    """
+    if status is None:
+        return "Failed After Retry" if failures > 1 else "Error"
+    if failures and status == "Scraped":
+        return "Scraped After Retry"
+    return status
+
+browser_recycle_after = BROWSER_RECYCLE_AFTER
+browser_max_rss_mb = BROWSER_MAX_RSS_MB
+requeue_lock = threading.Lock()
+requeue_counts = {}
+
+class SessionRestarted(Exception):
+    """The browser died while scraping an address and was restarted. The address should be scraped again."""
+
+def claim_requeue(address):
+    """True if `address` may go back on the queue once more after losing its browser."""
+    with requeue_lock:
+        requeue_counts[address] = requeue_counts.get(address, 0) + 1
+        return requeue_counts[address] <= MAX_REQUEUES
+
+# Cookies and local storage of a warmed-up browser (terms accepted, sales-grid columns shown). New and
+# recycled sessions load it before their first page so they skip the popup and the column setup.
+SESSION_SNAPSHOT_PATH = f"{OUTPUT_DIR}/browser_session.json"
+session_snapshot_path = SESSION_SNAPSHOT_PATH
+session_snapshot = None
+session_snapshot_lock = threading.Lock()
+session_warmup_lock = threading.Lock()
+
+def load_session_snapshot():
+    """The session snapshot, read from `session_snapshot_path` the first time. None until a session has warmed up."""
+    global session_snapshot
+    if session_snapshot_path is None:
+        return None
+    with session_snapshot_lock:
+        if session_snapshot is None and os.path.exists(session_snapshot_path):
+            try:
+                with open(session_snapshot_path) as snapshot_file:
+                    session_snapshot = json.load(snapshot_file)
+                log.info("Loaded browser session snapshot from %s.", session_snapshot_path)
+            except (OSError, ValueError) as e:
+                log.warning("Ignoring unreadable browser session snapshot %s: %s", session_snapshot_path, e)
+        return session_snapshot
+
+def save_session_snapshot(driver, columns_set=None):
+    """Snapshot the driver's cookies and local storage. `columns_set` records that the sales-grid columns are shown."""
+    global session_snapshot
+    if session_snapshot_path is None:
+        return
+    snapshot = {
+        "origin": driver.execute_script("return location.origin;"),
+        "cookies": [cookie for cookie in driver.get_cookies() if cookie["name"] not in PER_SESSION_COOKIES],
+        "local_storage": driver.execute_script("return Object.assign({}, window.localStorage);"),
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with session_snapshot_lock:
+        snapshot["columns_set"] = columns_set if columns_set is not None else bool((session_snapshot or {}).get("columns_set"))
+        session_snapshot = snapshot
+        try:
+            temp_path = f"{session_snapshot_path}.tmp"
+            with open(temp_path, "w") as snapshot_file:
+                json.dump(snapshot, snapshot_file, indent=2)
+            os.replace(temp_path, session_snapshot_path)
+        except OSError as e:
+            log.warning("Error saving browser session snapshot: %s", e)
+    log.info("Saved browser session snapshot (%s cookies, columns set: %s).", len(snapshot["cookies"]), snapshot["columns_set"])
+
+def restore_session_snapshot(driver, snapshot):
+    """Load a snapshot into a new driver through CDP, before it opens its first page."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    for cookie in snapshot["cookies"]:
+        params = {key: cookie[key] for key in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite") if key in cookie}
+        if "expiry" in cookie:
+            params["expires"] = cookie["expiry"]
+        driver.execute_cdp_cmd("Network.setCookie", params)
+    if snapshot.get("local_storage"):
+        # Runs before the site's own scripts on every page of the snapshot's origin; keys the session has changed since are left alone
+        script = (
+            f"if (location.origin === {json.dumps(snapshot['origin'])}) {{"
+            f" const items = {json.dumps(snapshot['local_storage'])};"
+            " for (const key in items) { if (localStorage.getItem(key) === null) localStorage.setItem(key, items[key]); } }"
         )
-        if captcha_present:
-            print("CAPTCHA detected. Please solve it manually.")
-            input("Press Enter after solving the CAPTCHA to continue...")
-            print("CAPTCHA solved. Resuming script...")
-    except TimeoutException:
-        # No CAPTCHA detected, continue as usual
-        print("No CAPTCHA detected. Continuing script...")
-    except Exception as e:
-        print(f"Error detecting CAPTCHA: {e}")
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": script})
 
-def retry_property_search(driver, address, retry_attempts=3):
+class BrowserSession:
     """
-    Retry the property search and scraping process if a CAPTCHA interrupts the flow.
+    Owns one worker's Chrome session. The browser is recycled after `recycle_after` addresses or once its
+    processes use more than `max_rss_mb`, and restarted when it dies mid-scrape.
     """
-    attempts = 0
-    while attempts < retry_attempts:
+    def __init__(self, start_url, recycle_after=BROWSER_RECYCLE_AFTER, max_rss_mb=BROWSER_MAX_RSS_MB):
+        self.start_url = start_url
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self.driver = None
+        self.addresses = 0
+        self.start()
+
+    def start(self):
+        """
+        Create a Chrome session on the search page with the terms popup accepted. Sessions start from the
+        session snapshot; the first one without a snapshot warms up while the others wait for it.
+        """
+        if load_session_snapshot() is None and session_snapshot_path is not None:
+            with session_warmup_lock:
+                self._start()
+        else:
+            self._start()
+
+    def _start(self):
+        snapshot = load_session_snapshot()
+        driver = create_driver()
         try:
-            # Handle CAPTCHA before retrying
-            handle_captcha(driver)
-
-            # Retry the search
-            search_result = search_property(driver, address)
-
-            if search_result == "direct_navigation":
-                print(f"Retry {attempts + 1}: Directly scraping property for address: {address}")
-                element_scrape(driver, address, driver.current_url)
-                return True  # Successfully scraped
-
-            elif search_result == "search_results":
-                print(f"Retry {attempts + 1}: Processing search results for address: {address}")
-                property_links = multiple_pages(driver, address)
-                if property_links:
-                    for property_link in property_links:
-                        try:
-                            driver.get(property_link)
-                            print(f"Retry {attempts + 1}: Scraping property at: {property_link}")
-                            element_scrape(driver, address, property_link)
-                        except Exception as e:
-                            print(f"Retry {attempts + 1}: Error processing property link '{property_link}' for address '{address}': {e}")
-                    return True  # Successfully scraped
-                else:
-                    print(f"Retry {attempts + 1}: No valid property links found for address: {address}.")
-                    return False  # No valid links
+            if snapshot is not None:
+                restore_session_snapshot(driver, snapshot)
 
-            elif search_result == "no_results":
-                print(f"Retry {attempts + 1}: No results found for address: {address}.")
-                return False  # No results
+            # Navigate to the main page
+            rate_limiter.acquire(self.start_url)
+            driver.get(self.start_url)
 
-        except Exception as e:
-            print(f"Retry {attempts + 1}: Error while retrying address '{address}': {e}")
-            attempts += 1
-
-    print(f"Exceeded maximum retries for address: {address}")
-    return False  # Failed after retries
-
-try:
-    # Navigate to the main page
-    driver.get('https://beacon.schneidercorp.com/Application.aspx?AppID=578&LayerID=8505&PageTypeID=2&PageID=4151')
-    
-    # Handle any popup that appears at the start
-    handle_popup(driver)
-    
-    # Initialize RentalID for unique identification
-    rental_id_start = 400000
-    sales_id_start = 4000000
-
-   # Main loop for processing addresses
-    for address in to_scrape:
+            # Handle any popup that appears at the start; with the snapshot's cookies it should not
+            if handle_popup(driver, timeout=1 if snapshot is not None else 10) or snapshot is None:
+                save_session_snapshot(driver)
+        except Exception:
+            driver.quit()
+            raise
+        self.driver = driver
+        self.addresses = 0
+
+    def quit(self):
+        driver, self.driver = self.driver, None
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception as e:
+                log.warning("Error during driver.quit(): %s", e)
+
+    def restart(self, reason):
+        metrics.count("beacon_browser_restarts_total", reason=reason)
+        log.warning("Restarting Chrome (%s) after %s addresses.", reason, self.addresses)
+        self.quit()
+        self.start()
+
+    def rss_mb(self):
+        """Resident memory of Chrome and all its child processes in MB, or None without psutil."""
         try:
-            # Reset to the search page before processing the address
-            reset_to_search_page(driver)
-            handle_captcha(driver)
-
-            # Perform property search
-            search_result = search_property(driver, address)
-
-            # Initialize data to write as empty
-            data_to_write = []
-
-            if search_result == "direct_navigation":
-                # Directly scrape the property
-                print(f"Direct navigation for address: {address}")
-                data_to_write = element_scrape(driver, address, driver.current_url, rental_id_start)
-                rental_id_start += 1  # Increment RentalID for each property
-
-            elif search_result == "search_results":
-                # Process search results and scrape data
-                print(f"Processing search results for address: {address}")
-                data_to_write = multiple_pages(driver, address)
-
-            elif search_result == "no_results":
-                # Append no results entry if the property doesn't exist
-                print(f"No results found for address: {address}")
-                no_result_entry = {
-                    "RentalID": rental_id_start,
-                    "SalesID": None,
-                    "Address": address,
-                    "Beds": None,
-                    "Date": None,
-                    "Price": None,
-                    "SQFT": None,
-                    "Transfer Type": None,
-                    "Instrument": None,
-                    "Transfer To": None,
-                    "Property Classification": None,
-                    "Parcel ID": None,
-                    "Acres": None,
-                    "Zoning Class": None,
-                    "Year Built": None,
-                    "Year Improved/Renovated": None,
-                    "Grade": None,
-                    "Property Link": None,
-                    "Status": "No Results"
-                }
-                data_to_write = [no_result_entry]
-            else:
-                # Handle unexpected search outcomes
-                print(f"Unexpected result for address '{address}'. Retrying...")
-                success = retry_property_search(driver, address)
-                if success:
-                    update_address_log(address, "Scraped After Retry")
-                else:
-                    update_address_log(address, "Failed After Retry")
-                continue  # Move to the next address
-
-            # Write data to CSV if available
-            if data_to_write:
-                for entry in data_to_write:
-                    if entry:
-                        write_to_csv(entry)
-                update_address_log(address, "Scraped")
-            else:
-                print(f"No data found to write for address: {address}")
-                update_address_log(address, "No Data")
+            import psutil
+        except ImportError:
+            return None
+        pid = getattr(self.driver, "browser_pid", None) or self.driver.service.process.pid
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / 1024 ** 2
+
+    def recycle_if_due(self):
+        if self.driver is None:
+            # The last restart failed; try again
+            self.start()
+        elif self.recycle_after and self.addresses >= self.recycle_after:
+            self.restart("recycle")
+        elif self.max_rss_mb and self.addresses and self.addresses % RSS_CHECK_EVERY == 0:
+            rss = self.rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                log.info("Chrome is using %.0f MB.", rss)
+                self.restart("memory")
 
+    def run(self, function, *args):
+        """
+        Call `function(driver, *args)` on a healthy browser. If the browser died underneath it, start a new one
+        and raise SessionRestarted so the caller can queue the work again instead of recording a failure.
+        """
+        self.recycle_if_due()
+        try:
+            result = function(self.driver, *args)
         except Exception as e:
-            # Log any errors for the specific address
-            print(f"Error processing address '{address}': {e}")
-            update_address_log(address, "Error")
+            if browser_alive(self.driver):
+                raise
+            error = e
+        else:
+            if browser_alive(self.driver):
+                self.addresses += 1
+                return result
+            error = None
+        self.restart("crash")
+        raise SessionRestarted(f"Browser session lost{f': {error}' if error else ''}")
+
+def start_browser_session(start_url):
+    """Create a managed Chrome session on the search page."""
+    return BrowserSession(start_url, browser_recycle_after, browser_max_rss_mb)
+
+# Each engine: how to open a session, scrape one address with it, open one known property page, and close it
+ENGINES = {
+    "selenium": {
+        "start": start_browser_session,
+        "process": lambda browser, address: browser.run(process_address, address),
+        "fetch_property": lambda browser, *args: browser.run(fetch_property_selenium, *args),
+        "close": lambda browser: browser.quit(),
+    },
+    "http": {
+        "start": start_http_session,
+        "process": process_address_http,
+        "fetch_property": fetch_property_http,
+        "close": lambda session: session.close(),
+    },
+}
+
+def scrape_worker(worker_id, engine, start_url, address_queue, result_queue, stop_event, incremental=False, profile=None, fed=None, retries=None):
+    """
+    Run one scraping session that pulls addresses (or Parcel IDs, when `incremental`) from the shared queue until it is
+    empty, `fed` (the feeder's done event, if the queue is still being filled) is set and no retry is waiting.
+    Failed addresses go to `retries`, the run's RetryScheduler, and are taken back ahead of fresh ones once due.
+    Results go back to the writer through `result_queue` so only one thread touches the output files.
+    `profile` is the county this worker scrapes, if it is not the run's site profile.
+    """
+    retries = retries or RetryScheduler(max_attempts, metrics=metrics)
+    active_site.profile = profile
+    start_session, close_session = ENGINES[engine]["start"], ENGINES[engine]["close"]
+    if incremental:
+        process = functools.partial(process_parcel, ENGINES[engine]["fetch_property"])
+    else:
+        process = ENGINES[engine]["process"]
+    session = None
+    try:
+        session = start_session(start_url)
+
+        while not stop_event.is_set():
+            address = retries.pop_due()
+            if address is None:
+                try:
+                    address = address_queue.get(timeout=0.1)
+                except queue.Empty:
+                    if (fed is None or fed.is_set()) and not retries.pending():
+                        break
+                    continue
+            parcel_update = None
+            try:
+                try:
+                    with metrics.span("address"):
+                        outcome = process(session, address)
+                finally:
+                    if street_index is not None:
+                        street_index.release(address)
+                data_to_write, status = outcome[0], outcome[1]
+                if incremental:
+                    parcel_update = outcome[2]
+                elif resolution_index is not None:
+                    resolution_index.record_rows(data_to_write)
+            except SessionRestarted as e:
+                if claim_requeue(address):
+                    # Someone (maybe this worker, on its new browser) scrapes it again
+                    log.warning("Worker %s: %s. Re-queued '%s'.", worker_id, e, address)
+                    address_queue.put(address)
+                    continue
+                log.error("Worker %s: Browser died on '%s' too many times: %s", worker_id, address, e)
+                retries.finish(address)
+                data_to_write, status = [], "Error"
+            except CaptchaRequired:
+                # Park the address and let this session cool down; the other workers keep going
+                metrics.count("beacon_parked_total")
+                log.warning("Worker %s: CAPTCHA on '%s'. Parked; cooling down for %ss.", worker_id, address, captcha_cooldown)
+                retries.finish(address)
+                result_queue.put((address, [], PARKED_STATUS, {"parcel_id": address} if incremental else None))
+                stop_event.wait(captcha_cooldown)
+                continue
+            except Exception as e:
+                metrics.count("beacon_worker_errors_total", error=type(e).__name__)
+                kind = classify_failure(e)
+                delay = retries.schedule(address, kind)
+                if delay is not None:
+                    # Move on to fresh work; the address comes back once its backoff is over
+                    log.warning("Worker %s: %s on '%s': %s. Retrying in %.0fs.", worker_id, kind, address, e, delay)
+                    continue
+                log.error("Worker %s: Error processing address '%s': %s", worker_id, address, e)
+                data_to_write, status = [], status_after_retries(None, retries.finish(address))
+            else:
+                status = status_after_retries(status, retries.finish(address))
+            if incremental and parcel_update is None:
+                # A stale link or a failed check: `address` is a Parcel ID, so it is recorded against the parcel
+                parcel_update = {"parcel_id": address}
+            result_queue.put((address, data_to_write, status, parcel_update))
+    except Exception as e:
+        log.error("Worker %s: Unable to start %s session: %s", worker_id, engine, e)
+    finally:
+        # Ensure the session is closed at the end
+        if session is not None:
+            try:
+                close_session(session)
+            except Exception as e:
+                log.error("Worker %s: Error closing %s session: %s", worker_id, engine, e)
+        result_queue.put(WORKER_DONE)
+
+def write_results(result_queue, worker_count, sink, store=None):
+    """
+    Single writer for the output and the status log (`store`, or the run's). Returns once every worker has finished.
+    Each address is marked in the status log only after its rows have been flushed by the sink.
+    """
+    finished_workers = 0
+    while finished_workers < worker_count:
+        item = result_queue.get()
+        if item is WORKER_DONE:
+            finished_workers += 1
             continue
-finally:
-    # Ensure the WebDriver quits at the end
+
+        address, data_to_write, status, parcel_update = item
+        rows = number_sales([entry for entry in data_to_write if entry])
+        sink.write(rows, functools.partial(acknowledge_result, address, status, rows, parcel_update, store))
+
+# Addresses the feeder keeps queued ahead of each worker
+QUEUE_AHEAD_PER_WORKER = 50
+
+def feed_queue(to_scrape, address_queue, stop_event, fed, ahead):
+    """
+    Move addresses from `to_scrape` (a list, or a lazy stream such as `stream_addresses`) onto the work queue,
+    keeping about `ahead` of them waiting, then set `fed`.
+    """
     try:
-        driver.quit()
+        for address in to_scrape:
+            while address_queue.qsize() >= ahead and not stop_event.is_set():
+                stop_event.wait(0.05)
+            if stop_event.is_set():
+                break
+            address_queue.put(address)
     except Exception as e:
-        print(f"Error during driver.quit(): {e}")
+        log.error("Error reading the addresses to scrape: %s", e)
+    finally:
+        fed.set()
+
+def run_workers(to_scrape, worker_count, sink, engine="selenium", start_url=None, incremental=False, profile=None, store=None, stop_event=None,
+                report=None, queue_ahead=None):
+    """
+    Shard `to_scrape` across `worker_count` sessions of the given engine. Workers start at once and the addresses
+    are fed to them as `to_scrape` yields them. `profile` and `store` default to the run's site profile and status
+    store; `stop_event` lets a caller on another thread stop the workers. `report(result_queue, worker_count)`
+    replaces writing the results to `sink`, and `queue_ahead` caps how many addresses wait in the work queue.
+    """
+    report = report or functools.partial(write_results, sink=sink, store=store)
+    start_url = start_url or (profile or site_profile).start_url
+    if street_index is not None and not incremental:
+        to_scrape = group_by_street(to_scrape, (profile or site_profile).name, street_index, street_batch_window)
+    address_queue = queue.Queue()
+    result_queue = queue.Queue()
+    stop_event = stop_event or threading.Event()
+    fed = threading.Event()
+    retries = RetryScheduler(max_attempts, metrics=metrics)
+    name = f"{profile.name}-worker" if profile else "scrape-worker"
+
+    feeder = threading.Thread(target=feed_queue, args=(to_scrape, address_queue, stop_event, fed, queue_ahead or worker_count * QUEUE_AHEAD_PER_WORKER), name=f"{name}-feeder", daemon=True)
+    feeder.start()
+    workers = [
+        threading.Thread(target=scrape_worker, args=(worker_id, engine, start_url, address_queue, result_queue, stop_event, incremental, profile, fed, retries), name=f"{name}-{worker_id}", daemon=True)
+        for worker_id in range(1, worker_count + 1)
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        report(result_queue, worker_count)
+    except KeyboardInterrupt:
+        # Let the workers finish their current address and quit their browsers
+        print("Interrupted. Waiting for workers to stop...")
+        stop_event.set()
+        report(result_queue, worker_count)
+    finally:
+        for worker in workers:
+            worker.join(timeout=30)
+
+def solve_parked(sink, engine="selenium", start_url=None):
+    """
+    Operator step: scrape every address parked on a CAPTCHA in one batch, on a single session that hands each
+    CAPTCHA to the solver (by default a prompt to solve it in the open browser) instead of parking it again.
+    """
+    global solve_captchas, captcha_cooldown
+    parked = status_store.pending_addresses([PARKED_STATUS])
+    if not parked:
+        print("No addresses are parked on a CAPTCHA.")
+        return
+    print(f"Clearing {len(parked)} addresses parked on a CAPTCHA...")
+    previous = solve_captchas, captcha_cooldown
+    solve_captchas, captcha_cooldown = True, 0
+    try:
+        run_workers(parked, 1, sink, engine, start_url)
+    finally:
+        solve_captchas, captcha_cooldown = previous
+
+# Distributed runs: a coordinator leases addresses out of its status store, and nodes (on this machine or others)
+# claim them in batches, heartbeat while they scrape and hand the rows back for the coordinator to write
+LEASE_SECONDS = 300
+LEASE_BATCH = 20
+LEASE_POLL_SECONDS = 5
+
+class LocalWorkQueue:
+    """
+    Work-queue backend on the coordinator's status store and output sink (see `beacon_queue` for the protocol).
+    Rows are written only for results whose lease is still held, so an address is never written twice.
+    """
+    def __init__(self, store, sink, lease_seconds=LEASE_SECONDS):
+        self.store = store
+        self.sink = sink
+        self.lease_seconds = lease_seconds
+        # Set once every input address has been registered; until then an empty claim does not mean the end
+        self.ingested = threading.Event()
+
+    def claim(self, owner, count):
+        leases = self.store.claim(owner, count, self.lease_seconds)
+        metrics.count("beacon_leases_total", len(leases), result="claimed")
+        return {"leases": leases, "done": not leases and self.finished()}
+
+    def finished(self):
+        """Every address has been registered, and none is left unclaimed or leased out."""
+        return self.ingested.is_set() and not self.store.claim_count() and not self.store.active_leases()
+
+    def heartbeat(self, owner, tokens):
+        return {"held": self.store.renew_leases(owner, tokens, self.lease_seconds)}
+
+    def complete(self, token, address, status, rows):
+        outcome = self.store.finish_lease(token) if token else None
+        if outcome != "finished":
+            # A retried call whose first attempt got through, or a lease that ran out and went to another node
+            metrics.count("beacon_leases_total", result=outcome or "rejected")
+            return {"accepted": outcome == "duplicate"}
+        metrics.count("beacon_leases_total", result="completed")
+        rows = number_sales(number_rentals([row for row in rows if row]))
+        self.sink.write(rows, functools.partial(acknowledge_result, address, status, rows, None, self.store))
+        return {"accepted": True}
+
+def claimed_addresses(work_queue, owner, batch, leases, stop_event):
+    """
+    Yield addresses claimed from `work_queue` in batches of `batch`, recording each lease token in `leases`.
+    Ends once the queue reports that everything is done; while the rest is leased to other nodes it keeps polling,
+    so the leases of a node that died are picked up when they run out.
+    """
+    while not stop_event.is_set():
+        reply = work_queue.claim(owner, batch)
+        for lease in reply["leases"]:
+            leases[lease["address"]] = lease["token"]
+            yield lease["address"]
+        if not reply["leases"]:
+            if reply["done"]:
+                return
+            stop_event.wait(LEASE_POLL_SECONDS)
+
+def heartbeat_leases(work_queue, owner, leases, lease_seconds, stopped):
+    """Renew this node's leases every third of a lease period until `stopped` is set."""
+    while not stopped.wait(lease_seconds / 3):
+        tokens = list(leases.values())
+        if not tokens:
+            continue
+        try:
+            held = set(work_queue.heartbeat(owner, tokens)["held"])
+        except Exception as e:
+            log.warning("Lease heartbeat failed: %s", e)
+            continue
+        if len(held) < len(tokens):
+            log.warning("%s of %s leases ran out; their results will be discarded.", len(tokens) - len(held), len(tokens))
+
+def report_results(result_queue, worker_count, work_queue, leases):
+    """Hand each result back to the work queue under its lease. Returns once every worker has finished."""
+    finished_workers = 0
+    while finished_workers < worker_count:
+        item = result_queue.get()
+        if item is WORKER_DONE:
+            finished_workers += 1
+            continue
+        address, data_to_write, status, _ = item
+        try:
+            reply = work_queue.complete(leases.pop(address, None), address, status, [entry for entry in data_to_write if entry])
+        except Exception as e:
+            # The lease runs out and the address goes to another node
+            log.error("Could not report the result for '%s': %s", address, e)
+            continue
+        if not reply["accepted"]:
+            log.warning("Lease on '%s' was lost before its result came back. Discarded.", address)
+
+def run_queue_node(work_queue, worker_count, engine="selenium", start_url=None, owner=None, lease_seconds=LEASE_SECONDS, batch=LEASE_BATCH):
+    """Scrape addresses claimed from `work_queue` (local or remote) with `worker_count` sessions until it is drained."""
+    owner = owner or f"{socket.gethostname()}-{os.getpid()}"
+    leases = {}
+    stop_event, stopped = threading.Event(), threading.Event()
+    heartbeat = threading.Thread(target=heartbeat_leases, args=(work_queue, owner, leases, lease_seconds, stopped), name="lease-heartbeat", daemon=True)
+    heartbeat.start()
+    print(f"Node {owner}: scraping with {worker_count} {engine} workers.")
+    try:
+        run_workers(
+            claimed_addresses(work_queue, owner, batch, leases, stop_event), worker_count, None, engine, start_url,
+            stop_event=stop_event, report=functools.partial(report_results, work_queue=work_queue, leases=leases), queue_ahead=batch,
+        )
+    finally:
+        stopped.set()
+        heartbeat.join()
+
+def serve_queue(store, sink, listen, worker_count, engine="selenium", start_url=None, restart=False, lease_seconds=LEASE_SECONDS, batch=LEASE_BATCH, secret=None):
+    """
+    Coordinator: register the input addresses, serve them to nodes on `listen` ("host:port") and scrape with
+    `worker_count` local workers as well. Returns once every address has been scraped and written.
+    """
+    store.clear_leases()
+    work_queue = LocalWorkQueue(store, sink, lease_seconds)
+
+    def ingest():
+        try:
+            for _ in stream_addresses(store, restart=restart):
+                pass
+        finally:
+            work_queue.ingested.set()
+    threading.Thread(target=ingest, name="queue-ingest", daemon=True).start()
+
+    host, _, port = listen.rpartition(":")
+    server = QueueServer(work_queue, host or "0.0.0.0", int(port or QUEUE_PORT), secret)
+    print(f"Serving the work queue on {server.url} (leases of {lease_seconds}s).")
+    try:
+        if worker_count:
+            run_queue_node(work_queue, worker_count, engine, start_url, lease_seconds=lease_seconds, batch=batch)
+        while not work_queue.finished():
+            time.sleep(LEASE_POLL_SECONDS)
+    finally:
+        server.shutdown()
+
+def county_paths(profile, output_format="csv"):
+    """Output and status-store paths of a county: the profile's own, or files named after it in OUTPUT_DIR."""
+    output = profile.output or f"{OUTPUT_DIR}/{profile.name}_parcels.{output_format}"
+    status_db = profile.status_db or f"{OUTPUT_DIR}/{profile.name}_status.sqlite3"
+    return output, status_db
+
+def run_counties(profiles, engine="selenium", default_workers=1, output_format="csv", restart=False):
+    """
+    Scrape several counties at once from one process. Each county has its own worker budget (the profile's
+    `workers`, else `default_workers`), status store and output file; they share the page cache, the metrics and
+    the per-host pacing, so counties on the same Beacon server do not outrun its limits together.
+    """
+    counties = []
+    try:
+        for profile in profiles:
+            output, status_db = county_paths(profile, output_format)
+            store = StatusStore(status_db)
+            if resolution_index is not None and output_format == "csv":
+                resolution_index.seed_from_output(output, profile.name)
+            if output_format != "sqlite":
+                seed_output_ids(output)
+            counties.append({"profile": profile, "store": store, "sink": OUTPUT_SINKS[output_format](output, metrics=metrics), "stop": threading.Event()})
+            if not profile.inputs:
+                print(f"{profile.name}: the profile lists no inputs; only addresses already in {status_db} are scraped.")
+            to_scrape = stream_addresses(store, restart=restart, inputs=profile.inputs)
+            workers = profile.workers or default_workers
+            print(f"{profile.name}: scraping with {workers} {engine} workers.")
+            counties[-1]["thread"] = threading.Thread(
+                target=run_workers, args=(to_scrape, workers, counties[-1]["sink"], engine),
+                kwargs={"profile": profile, "store": store, "stop_event": counties[-1]["stop"]}, name=f"{profile.name}-writer", daemon=True,
+            )
+        for county in counties:
+            county["thread"].start()
+        try:
+            for county in counties:
+                # Join in short steps so Ctrl+C reaches this thread
+                while county["thread"].is_alive():
+                    county["thread"].join(timeout=1)
+        except KeyboardInterrupt:
+            print("Interrupted. Waiting for workers to stop...")
+            for county in counties:
+                county["stop"].set()
+            for county in counties:
+                county["thread"].join()
+    finally:
+        for county in counties:
+            county["sink"].close()
+            profile, store = county["profile"], county["store"]
+            print(f"{profile.name} address status: {store.status_counts()}")
+            try:
+                store.export_csv(f"{OUTPUT_DIR}/{profile.name}_StatusOutput.csv")
+            except Exception as e:
+                print(f"Error exporting address log for {profile.name}: {e}")
+            store.close()
+
+def configure_logging(level="INFO", sample_every=1):
+    """
+    Log the scraper's progress to the console at `level`. Info and debug lines are sampled: only one in every
+    `sample_every` is printed per message, while warnings and errors always are.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(threadName)s] %(message)s"))
+    handler.addFilter(SamplingFilter(sample_every))
+    # Keep selenium's and urllib3's own debug output out of the console
+    logging.basicConfig(level=logging.WARNING, handlers=[handler])
+    log.setLevel(level)
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape property sales from the Beacon parcel site.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of sessions to scrape with in parallel")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="selenium", help="Drive Chrome, or replay the search postbacks over plain HTTP")
+    parser.add_argument("--profile", action="append", default=[], help="JSON or YAML site profile of a county to scrape; repeat to scrape several counties at once")
+    parser.add_argument("--start-url", help="Beacon search page to start from (default: the profile's)")
+    parser.add_argument("--status-db", help="SQLite file that tracks the scrape status of every address")
+    parser.add_argument("--output", help="Output file (or directory, for Parquet)")
+    parser.add_argument("--output-format", choices=sorted(OUTPUT_SINKS), default="csv", help="Format of the scraped rows; sqlite keeps typed properties and sales tables and upserts them")
+    parser.add_argument("--import-csv", help="With --output-format sqlite: first load (and deduplicate) a flat output CSV from earlier runs")
+    parser.add_argument("--export-parquet", help="With --output-format sqlite: write properties.parquet and sales.parquet to this directory at the end")
+    parser.add_argument("--cache-dir", default=PAGE_CACHE_DIR, help="Directory of the raw page cache")
+    parser.add_argument("--cache-ttl-days", type=float, default=30, help="How long a cached page is used instead of the network")
+    parser.add_argument("--cache-max-mb", type=int, default=2048, help="Size cap of the page cache; least recently used pages are evicted")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the page cache")
+    parser.add_argument("--reparse-from-cache", action="store_true", help="Rebuild the output from cached pages without touching the network")
+    parser.add_argument("--incremental", action="store_true", help="Revisit known parcels by property link and only write new or changed sales")
+    parser.add_argument("--parcel-state-db", default=PARCEL_STATE_DB_PATH, help="SQLite file with the last seen sales of every parcel")
+    parser.add_argument("--changelog", default=CHANGELOG_PATH, help="CSV that incremental runs append sale changes to")
+    parser.add_argument("--no-direct-fetch", action="store_true", help="Always search, even for addresses whose property links are in the previous output")
+    parser.add_argument("--street-batch", action="store_true", help="Search each street once for all its queued addresses and match them against its results pages")
+    parser.add_argument("--street-batch-window", type=int, default=STREET_BATCH_WINDOW, help="With --street-batch: how many queued addresses are grouped by street at a time")
+    parser.add_argument("--restart", action="store_true", help="Scrape every address again instead of resuming")
+    parser.add_argument("--browser-recycle-after", type=int, default=BROWSER_RECYCLE_AFTER, help="Restart Chrome after this many addresses (0 never)")
+    parser.add_argument("--session-snapshot", default=SESSION_SNAPSHOT_PATH, help="File with the warmed-up browser's cookies and local storage that new sessions start from")
+    parser.add_argument("--no-session-snapshot", action="store_true", help="Start every browser session from scratch")
+    parser.add_argument("--lean", action="store_true", help="Run Chrome headless with the eager page-load strategy and block --block-urls")
+    parser.add_argument("--block-urls", nargs="*", default=DEFAULT_BLOCKED_URLS, help="URL patterns (* wildcards) lean sessions do not load")
+    parser.add_argument("--browser-max-rss-mb", type=int, default=BROWSER_MAX_RSS_MB, help="Restart Chrome once it uses more memory than this (0 never; needs psutil)")
+    parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS, help="Tries an address gets when its scrape times out or errors; retries wait out a growing backoff while other addresses go ahead")
+    parser.add_argument("--captcha-cooldown", type=float, default=CAPTCHA_COOLDOWN, help="Seconds a session pauses after parking an address on a CAPTCHA")
+    parser.add_argument("--captcha-solver", help="module:function called with the driver to solve CAPTCHAs during the run instead of parking them")
+    parser.add_argument("--solve-parked", action="store_true", help="After the run, clear the addresses parked on a CAPTCHA in one operator-attended batch")
+    parser.add_argument("--rate", type=float, default=2.0, help="Starting page loads per second per host; adapts to CAPTCHAs, errors and timeouts")
+    parser.add_argument("--min-rate", type=float, default=0.2, help="Slowest the pacing backs off to (page loads per second)")
+    parser.add_argument("--max-rate", type=float, default=20.0, help="Fastest the pacing speeds up to (page loads per second)")
+    parser.add_argument("--serve-queue", metavar="[HOST:]PORT", help="Coordinate a distributed run: serve the addresses to --queue-url nodes on this port and write their results (--workers may be 0)")
+    parser.add_argument("--queue-url", help="Run as a node of the coordinator at this URL (http://host:port) instead of reading the inputs")
+    parser.add_argument("--queue-secret", default=os.environ.get("BEACON_QUEUE_SECRET"), help="Shared secret the coordinator and its nodes send with every call (default: $BEACON_QUEUE_SECRET)")
+    parser.add_argument("--lease-seconds", type=float, default=LEASE_SECONDS, help="How long a claimed address stays with a node that stops heartbeating")
+    parser.add_argument("--lease-batch", type=int, default=LEASE_BATCH, help="Addresses a node claims at a time")
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default="INFO", help="DEBUG shows every parcel, checkbox and flush")
+    parser.add_argument("--log-sample", type=int, default=10, help="Print one in N info/debug lines of each kind; warnings and errors are always printed")
+    parser.add_argument("--metrics-file", default=f"{OUTPUT_DIR}/scrape_metrics.prom", help="Prometheus text file with stage timings and counters, rewritten while scraping")
+    parser.add_argument("--metrics-interval", type=float, default=15, help="Seconds between rewrites of the metrics file")
+    parser.add_argument("--metrics-summary", default=f"{OUTPUT_DIR}/scrape_metrics.json", help="JSON summary of the run's metrics, written at exit")
+    args = parser.parse_args()
+    if args.workers < (0 if args.serve_queue else 1):
+        parser.error("--workers must be at least 1")
+    if args.max_attempts < 1:
+        parser.error("--max-attempts must be at least 1")
+    if args.serve_queue and args.queue_url:
+        parser.error("--serve-queue and --queue-url are the two ends of a distributed run; pick one")
+    if (args.serve_queue or args.queue_url) and (args.incremental or args.reparse_from_cache or args.solve_parked or len(args.profile) > 1):
+        parser.error("--serve-queue and --queue-url scrape one county's address list; drop --incremental, --reparse-from-cache, --solve-parked and extra profiles")
+    if (args.serve_queue or args.queue_url) and args.street_batch:
+        # The street groups would hold claimed addresses back, and the leases they keep alive never let the queue drain
+        parser.error("--street-batch cannot be used with --serve-queue or --queue-url")
+    try:
+        profiles = [load_profile(path) for path in args.profile]
+    except (OSError, ValueError) as e:
+        parser.error(f"Cannot load profile: {e}")
+    if len(profiles) > 1 and (args.incremental or args.reparse_from_cache or args.solve_parked):
+        parser.error("--incremental, --reparse-from-cache and --solve-parked work on one county at a time")
+    if (args.import_csv or args.export_parquet) and args.output_format != "sqlite":
+        parser.error("--import-csv and --export-parquet need --output-format sqlite")
+    if len(profiles) > 1 and (args.import_csv or args.export_parquet):
+        parser.error("--import-csv and --export-parquet work on one county at a time")
+    if len(profiles) > 1 and (args.start_url or args.output or args.status_db):
+        parser.error("with several profiles, set start_url, output and status_db in the profiles")
+    configure_logging(args.log_level, args.log_sample)
+
+    global status_store, page_cache, parcel_state, changelog_path, browser_recycle_after, browser_max_rss_mb
+    global captcha_cooldown, captcha_solver, solve_captchas, rate_limiter, site_profile, resolution_index, session_snapshot_path
+    global lean_mode, blocked_urls, max_attempts, street_index, street_batch_window
+    rate_limiter = AdaptiveRateLimiter(args.rate, args.min_rate, args.max_rate, metrics=metrics)
+    captcha_cooldown = args.captcha_cooldown
+    max_attempts = args.max_attempts
+    if args.captcha_solver:
+        captcha_solver, solve_captchas = load_captcha_solver(args.captcha_solver), True
+    changelog_path = args.changelog
+    browser_recycle_after, browser_max_rss_mb = args.browser_recycle_after, args.browser_max_rss_mb
+    session_snapshot_path = None if args.no_session_snapshot else args.session_snapshot
+    lean_mode, blocked_urls = args.lean, args.block_urls
+    if not args.no_cache:
+        page_cache = PageCache(args.cache_dir, ttl_days=args.cache_ttl_days, max_bytes=args.cache_max_mb * 1024 ** 2)
+    elif args.reparse_from_cache:
+        parser.error("--reparse-from-cache needs the page cache")
+    if args.no_direct_fetch:
+        resolution_index = None
+    if args.street_batch:
+        street_index, street_batch_window = StreetIndex(), args.street_batch_window
+
+    if args.queue_url:
+        # A node only scrapes; the coordinator keeps the status store and the output
+        if profiles:
+            site_profile = profiles[0]
+        exporter = MetricsExporter(metrics, args.metrics_file, args.metrics_interval)
+        try:
+            run_queue_node(RemoteWorkQueue(args.queue_url, args.queue_secret), args.workers, args.engine, args.start_url or site_profile.start_url,
+                           lease_seconds=args.lease_seconds, batch=args.lease_batch)
+        finally:
+            if page_cache is not None:
+                page_cache.close()
+            exporter.stop()
+            print_wait_summary()
+            print(f"Request pacing: {rate_limiter.state()}")
+        return
+
+    if len(profiles) > 1:
+        exporter = MetricsExporter(metrics, args.metrics_file, args.metrics_interval)
+        try:
+            run_counties(profiles, args.engine, args.workers, args.output_format, restart=args.restart)
+        finally:
+            if page_cache is not None:
+                page_cache.close()
+            exporter.stop()
+            try:
+                metrics.write_json(args.metrics_summary)
+                print(f"Saved metrics summary to {args.metrics_summary}")
+            except Exception as e:
+                print(f"Error writing metrics summary: {e}")
+            print_wait_summary()
+            print(f"Request pacing: {rate_limiter.state()}")
+        return
+
+    # One county: the profile's settings, unless the command line overrides them
+    if profiles:
+        site_profile = profiles[0]
+        args.output = args.output or county_paths(site_profile, args.output_format)[0]
+        args.status_db = args.status_db or county_paths(site_profile, args.output_format)[1]
+    args.start_url = args.start_url or site_profile.start_url
+    args.output = args.output or (f"{OUTPUT_DIR}/PurdueParcels.sqlite3" if args.output_format == "sqlite" else f"{OUTPUT_DIR}/PurduePropertyParcel9.csv")
+    args.status_db = args.status_db or STATUS_DB_PATH
+
+    if args.import_csv:
+        import_into_database(args.output, args.import_csv)
+    elif args.output_format != "sqlite":
+        # Number on from the IDs already in the output instead of starting over
+        seed_output_ids(args.output)
+
+    if args.reparse_from_cache:
+        sink = OUTPUT_SINKS[args.output_format](args.output, metrics=metrics)
+        try:
+            reparse_from_cache(sink)
+        finally:
+            sink.close()
+            page_cache.close()
+            if args.export_parquet:
+                export_database(args.output, args.export_parquet)
+        return
+
+    status_store = StatusStore(args.status_db)
+    parcel_state = ParcelStateStore(args.parcel_state_db)
+    if args.incremental and args.output_format == "csv":
+        parcel_state.seed_from_output(args.output)
+    elif resolution_index is not None and args.output_format == "csv":
+        resolution_index.seed_from_output(args.output)
+    sink = OUTPUT_SINKS[args.output_format](args.output, metrics=metrics)
+    exporter = MetricsExporter(metrics, args.metrics_file, args.metrics_interval)
+    try:
+        if args.serve_queue:
+            serve_queue(status_store, sink, args.serve_queue, args.workers, args.engine, args.start_url, restart=args.restart,
+                        lease_seconds=args.lease_seconds, batch=args.lease_batch, secret=args.queue_secret)
+        else:
+            if args.incremental:
+                to_scrape = parcel_state.parcel_ids()
+                print(f"Parcels to check for new sales: {len(to_scrape)}")
+            else:
+                to_scrape = stream_addresses(status_store, restart=args.restart)
+                if args.solve_parked:
+                    # Parked addresses wait for the operator batch below instead of being parked again
+                    parked = set(status_store.pending_addresses([PARKED_STATUS]))
+                    to_scrape = (address for address in to_scrape if address not in parked)
+            run_workers(to_scrape, args.workers, sink, args.engine, args.start_url, incremental=args.incremental)
+        if args.solve_parked and not args.incremental:
+            # Addresses parked during this run are only in the status store once their results are flushed
+            sink.sync()
+            solve_parked(sink, args.engine, args.start_url)
+    finally:
+        # Flush the buffered rows before the status log is read back
+        sink.close()
+        if args.export_parquet:
+            export_database(args.output, args.export_parquet)
+        if args.incremental:
+            print(f"Parcel checks: {parcel_state.check_status_counts()}")
+        parcel_state.close()
+        if page_cache is not None:
+            page_cache.close()
+        exporter.stop()
+        try:
+            metrics.write_json(args.metrics_summary)
+            print(f"Saved metrics summary to {args.metrics_summary}")
+        except Exception as e:
+            print(f"Error writing metrics summary: {e}")
+        print_wait_summary()
+        print(f"Request pacing: {rate_limiter.state()}")
+        print(f"Address status: {status_store.status_counts()}")
+        try:
+            status_store.export_csv(f"{OUTPUT_DIR}/PurdueStatusOutput.csv")
+        except Exception as e:
+            print(f"Error exporting address log: {e}")
+        status_store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+On-disk cache of the raw Beacon pages the scraper fetched.
+
+The scraper caches every search and property page it could read, so an address can be answered again without the
+network (`--reparse-from-cache`) and a re-run only fetches what has expired.
+"""
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+class PageCache:
+    """
+    On-disk cache of raw Beacon pages. Pages are stored gzip-compressed under the SHA-256 of their content,
+    and an SQLite index maps each key (property link or search address) to its page, with a per-entry
+    expiry time. Least recently used entries are evicted once the cache grows past `max_bytes`.
+    """
+    def __init__(self, directory, ttl_days=30, max_bytes=2 * 1024 ** 3):
+        self.directory = directory
+        self.ttl = ttl_days * 86400
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                url TEXT,
+                address TEXT,
+                parcel_id TEXT,
+                content_hash TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+            CREATE INDEX IF NOT EXISTS pages_parcel_id ON pages (parcel_id);
+            CREATE TABLE IF NOT EXISTS blobs (
+                content_hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+        """)
+        self.connection.commit()
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.directory, "blobs", content_hash[:2], f"{content_hash}.html.gz")
+
+    def put(self, key, html, url=None, kind="property", address=None, parcel_id=None, ttl=None):
+        """Store a page under `key`. Identical pages share one blob on disk."""
+        if isinstance(html, str):
+            html = html.encode("utf-8")
+        content_hash = hashlib.sha256(html).hexdigest()
+        blob_path = self._blob_path(content_hash)
+        now = time.time()
+        with self.lock:
+            if not os.path.exists(blob_path):
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                with open(blob_path + ".tmp", "wb") as blob:
+                    blob.write(gzip.compress(html, compresslevel=6))
+                os.replace(blob_path + ".tmp", blob_path)
+            self.connection.execute("INSERT OR IGNORE INTO blobs (content_hash, size) VALUES (?, ?)", (content_hash, os.path.getsize(blob_path)))
+            old = self.connection.execute("SELECT content_hash FROM pages WHERE key = ?", (key,)).fetchone()
+            self.connection.execute(
+                """INSERT OR REPLACE INTO pages (key, kind, url, address, parcel_id, content_hash, fetched_at, expires_at, last_access)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (key, kind, url, address, parcel_id, content_hash, now, now + (self.ttl if ttl is None else ttl), now),
+            )
+            if old and old[0] != content_hash:
+                self._drop_blob_if_unused(old[0])
+            self._evict()
+            self.connection.commit()
+
+    def get(self, key, ignore_ttl=False):
+        """Return (url, html) for a cached page, or None if it is missing or expired."""
+        with self.lock:
+            row = self.connection.execute("SELECT url, content_hash, expires_at FROM pages WHERE key = ?", (key,)).fetchone()
+            if row is None or (not ignore_ttl and row[2] < time.time()):
+                return None
+            try:
+                with open(self._blob_path(row[1]), "rb") as blob:
+                    html = gzip.decompress(blob.read())
+            except OSError:
+                self.connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self.connection.commit()
+                return None
+            self.connection.execute("UPDATE pages SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.connection.commit()
+        return row[0], html
+
+    def entries(self, kind):
+        """(key, address) of every cached page of one kind, oldest first."""
+        with self.lock:
+            return self.connection.execute("SELECT key, address FROM pages WHERE kind = ? ORDER BY fetched_at", (kind,)).fetchall()
+
+    def _drop_blob_if_unused(self, content_hash):
+        if self.connection.execute("SELECT 1 FROM pages WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone():
+            return
+        self.connection.execute("DELETE FROM blobs WHERE content_hash = ?", (content_hash,))
+        try:
+            os.remove(self._blob_path(content_hash))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under its size cap."""
+        total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, content_hash in self.connection.execute("SELECT key, content_hash FROM pages ORDER BY last_access").fetchall():
+            self.connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+            self._drop_blob_if_unused(content_hash)
+            total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            if total <= self.max_bytes * 0.9:
+                break
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
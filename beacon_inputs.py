@@ -0,0 +1,49 @@
+"""
+Streaming reader for the address input files.
+
+Only the address column is read, one chunk at a time, from any mix of CSV files and Parquet files (or directories
+of them). A multi-million-row address list never has to fit in memory, and the first chunk is ready to be queued
+as soon as it has been read instead of after every file has been loaded.
+"""
+import csv
+import os
+
+INPUT_CHUNK_SIZE = 10000
+
+
+def read_address_chunks(paths, column="Address", chunk_size=INPUT_CHUNK_SIZE):
+    """Yield lists of up to `chunk_size` non-blank addresses, file by file, in file order."""
+    for path in paths:
+        if os.path.isdir(path) or path.lower().endswith(".parquet"):
+            yield from _parquet_chunks(path, column, chunk_size)
+        else:
+            yield from _csv_chunks(path, column, chunk_size)
+
+
+def _csv_chunks(path, column, chunk_size):
+    with open(path, newline="", encoding="utf-8-sig") as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header is None:
+            return
+        if column not in header:
+            raise ValueError(f"{path} has no {column!r} column")
+        index = header.index(column)
+        chunk = []
+        for row in reader:
+            address = row[index].strip() if index < len(row) else ""
+            if address:
+                chunk.append(address)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+
+def _parquet_chunks(path, column, chunk_size):
+    import pyarrow.dataset as ds  # pyarrow is only needed for Parquet inputs
+    for batch in ds.dataset(path, format="parquet").to_batches(columns=[column], batch_size=chunk_size):
+        chunk = [str(address).strip() for address in batch.column(0).to_pylist() if address is not None and str(address).strip()]
+        if chunk:
+            yield chunk
@@ -0,0 +1,232 @@
+"""
+Lightweight timing spans, counters and histograms for the scrape pipeline.
+
+Everything is kept in memory behind one lock. `MetricsExporter` rewrites a Prometheus text file every few seconds
+(node_exporter's textfile collector can pick it up), and `Metrics.write_json` saves a summary with per-stage
+p50/p95 at the end of a run. `SamplingFilter` thins out the per-row log lines so console I/O stays off the hot path.
+"""
+import bisect
+import collections
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Recent samples kept per histogram series for the p50/p95 in the JSON summary
+SAMPLE_LIMIT = 10000
+
+
+def _series_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count for one label set, plus a window of recent samples."""
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+        self.samples = collections.deque(maxlen=SAMPLE_LIMIT)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+        self.samples.append(value)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "total_s": round(self.sum, 3),
+            "mean_ms": round(self.sum / self.count * 1000, 2) if self.count else None,
+            "p50_ms": round(_percentile(ordered, 0.50) * 1000, 2) if ordered else None,
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 2) if ordered else None,
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and latency histograms, keyed by metric name and label set."""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.started = time.time()
+
+    def count(self, name, value=1, **labels):
+        """Add `value` to the counter `name` for this label set."""
+        key = _series_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """Set the gauge `name` for this label set to `value`."""
+        with self.lock:
+            self.gauges.setdefault(name, {})[_series_key(labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        """Record one duration in the histogram `name` for this label set."""
+        key = _series_key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram(self.buckets)
+            series[key].observe(seconds)
+
+    @contextlib.contextmanager
+    def span(self, stage, name="beacon_stage_seconds"):
+        """Time the enclosed block as `stage`. The duration is recorded even if the block raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, stage=stage)
+
+    def timed(self, stage):
+        """Decorator form of `span` for functions that are a stage on their own."""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def counter_values(self, name, label):
+        """Counter `name` as a dict of `label` value -> count."""
+        with self.lock:
+            return {dict(key).get(label): value for key, value in self.counters.get(name, {}).items()}
+
+    def histogram_summary(self, name, label):
+        """Histogram `name` as a dict of `label` value -> count, mean, p50, p95 and max."""
+        with self.lock:
+            return {dict(key).get(label): histogram.summary() for key, histogram in sorted(self.histograms.get(name, {}).items())}
+
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self.gauges.items()):
+                lines.append(f"# TYPE {name} gauge")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets + ("+Inf",), histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Counters, gauges and per-series histogram summaries as plain dicts, for the JSON summary."""
+        with self.lock:
+            counters = {
+                name: {_format_labels(key) or "total": value for key, value in sorted(series.items())}
+                for name, series in sorted(self.counters.items())
+            }
+            gauges = {
+                name: {_format_labels(key) or "value": value for key, value in sorted(series.items())}
+                for name, series in sorted(self.gauges.items())
+            }
+            histograms = {
+                name: {_format_labels(key) or "all": histogram.summary() for key, histogram in sorted(series.items())}
+                for name, series in sorted(self.histograms.items())
+            }
+        return {
+            "started_at": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "elapsed_s": round(time.time() - self.started, 3),
+            "counters": counters,
+            "gauges": gauges,
+            "histograms": histograms,
+        }
+
+    def write_prometheus(self, path):
+        """Replace `path` atomically so a collector never reads a half-written file."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as metrics_file:
+            metrics_file.write(self.prometheus_text())
+        os.replace(temp_path, path)
+
+    def write_json(self, path):
+        with open(path, "w") as summary_file:
+            json.dump(self.summary(), summary_file, indent=2)
+
+
+class MetricsExporter:
+    """Rewrites the Prometheus text file every `interval` seconds on a background thread, and once more on `stop`."""
+    def __init__(self, metrics, path, interval=15.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self._export()
+
+    def _export(self):
+        try:
+            self.metrics.write_prometheus(self.path)
+        except Exception as e:
+            logging.getLogger(__name__).warning("Error writing metrics to %s: %s", self.path, e)
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        self._export()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Lets through one in every `every` records below WARNING, counted per message template, so a per-row line
+    logged thousands of times costs almost nothing. Warnings and errors always pass.
+    """
+    def __init__(self, every=1):
+        super().__init__()
+        self.every = max(1, every)
+        self.seen = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.every == 1:
+            return True
+        with self.lock:
+            seen = self.seen.get(record.msg, 0)
+            self.seen[record.msg] = seen + 1
+        return seen % self.every == 0
@@ -0,0 +1,251 @@
+"""
+Offline parser for Beacon pages.
+
+Takes one HTML snapshot of a search results page or a PageTypeID=4 property page and extracts everything the
+scraper needs with precompiled XPath, so no browser round trips are spent per field. Both the Selenium engine
+(`driver.page_source`) and the HTTP engine (response bodies) go through here.
+"""
+import logging
+from datetime import datetime
+from urllib.parse import urljoin
+
+import lxml.html
+from lxml import etree
+
+log = logging.getLogger("beacon_scraper.parser")
+
+# Sales before this date are not written out
+SALES_CUTOFF = datetime(2000, 1, 1)
+
+# Default selectors, for the AppID=578 (Tippecanoe County) layout. Site profiles override any of them.
+# ELEMENT_ID_KEYS are element ids; everything else is an XPath.
+DEFAULT_SELECTORS = {
+    # Search page
+    "agree_button": '//a[contains(@class, "btn-primary") and text()="Agree"]',
+    "search_box_id": "ctlBodyPane_ctl02_ctl01_txtAddress",
+    "search_button_id": "ctlBodyPane_ctl02_ctl01_btnSearch",
+    "search_tab": '//li[@id="search1"]/a',
+    "captcha": '//div[@class="g-recaptcha"]',
+
+    # Search results page
+    "result_rows": '//table[contains(@class, "footable")]/tbody/tr',
+    "row_address": './td[5]',
+    "row_class_cells": './td[@align="center"]',
+    "row_property_links": './/a[contains(@class, "normal-font-label")]/@href',
+    "row_fallback_links": './/a[contains(@href, "PageTypeID=4")]/@href',
+    "no_results_link": '//a[@id="ctlBodyPane_noDataList_lnkSearchPage"]',
+    "results_pager_links": '//div[contains(@class, "pager")]//a',
+    "module_content": '//div[@class="module-content"]',
+
+    # Property page: general details
+    "general_details": '//table[contains(@class, "tabular-data-two-column")]',
+    "property_classification": '//table[contains(@class, "tabular-data-two-column")]//tr[11]//span',
+    "parcel_id": '//table[contains(@class, "tabular-data-two-column")]//tr[1]//span',
+    "property_acres": '//table[contains(@class, "tabular-data-two-column")]//tr[10]//span',
+
+    # Property page: sales grid, and the column menu that shows its hidden columns
+    "transfers_section": '//section[@id="ctlBodyPane_ctl20_mSection"]',
+    "transfers_column_toggle": '//section[@id="ctlBodyPane_ctl20_mSection"]//button[contains(@class, "dropdown-toggle")]',
+    "column_menu_item": '//a[@role="menuitemcheckbox"]',
+    "column_checkboxes": [
+        '//a[@role="menuitemcheckbox" and contains(text(), "To")]',
+        '//a[@role="menuitemcheckbox" and contains(text(), "Sale Price")]',
+    ],
+    "sales_grid": '//table[contains(@id, "ctlBodyPane_ctl20_ctl01_grdSales_grdFlat")]',
+    "sales_rows": '//table[contains(@id, "ctlBodyPane_ctl20_ctl01_grdSales_grdFlat")]//tbody//tr',
+    "sales_row_date": './/th',
+    "sales_row_cells": './/td',
+    # Position of each sale field among a sales row's <td> cells
+    "sale_columns": {"Price": 5, "Transfer Type": 1, "Instrument": 2, "Transfer To": 4},
+
+    # Property page: residential building block, filled in all-or-nothing
+    "residential": {
+        "Zoning Class": '//div[contains(@id,"ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuildingDataLeftColumn_rptrDynamicColumns_ctl00_pnlSingleValue")]',
+        "Year Built": '//div[contains(@id,"ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuildingDataLeftColumn_rptrDynamicColumns_ctl01_pnlSingleValue")]',
+        "Year Improved/Renovated": '//div[contains(@id,"ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuildingDataLeftColumn_rptrDynamicColumns_ctl02_pnlSingleValue")]',
+        "Beds": '//div[contains(@id,"ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuildingDataLeftColumn_rptrDynamicColumns_ctl05_pnlSingleValue")]',
+        "SQFT": '//div[contains(@id,"ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuildingDataRightColumn_rptrDynamicColumns_ctl06_pnlSingleValue")]',
+        "Grade": '//div[contains(@id,"ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuildingDataRightColumn_rptrDynamicColumns_ctl11_pnlSingleValue")]',
+    },
+}
+
+
+# Selectors that are element ids rather than XPaths
+ELEMENT_ID_KEYS = {"search_box_id", "search_button_id"}
+
+
+def _compile(name, value):
+    """XPath strings (alone, in a list or in a dict) compiled for lxml; ids and column numbers are kept as they are."""
+    if isinstance(value, dict):
+        return {key: _compile(name, item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_compile(name, item) for item in value]
+    if isinstance(value, str) and name not in ELEMENT_ID_KEYS:
+        try:
+            return etree.XPath(value)
+        except etree.XPathSyntaxError as e:
+            raise ValueError(f"Selector {name!r} is not a valid XPath: {value!r} ({e})") from e
+    return value
+
+
+class PageSelectors:
+    """
+    One site's selectors, compiled once. `raw` keeps the strings (the browser takes those); indexing returns the
+    compiled XPath. Overrides replace defaults key by key, and the residential block and sale columns field by field.
+    """
+    def __init__(self, overrides=None):
+        raw = {key: (dict(value) if isinstance(value, dict) else value) for key, value in DEFAULT_SELECTORS.items()}
+        for key, value in (overrides or {}).items():
+            if key not in raw:
+                raise ValueError(f"Unknown selector {key!r}")
+            if isinstance(raw[key], dict):
+                raw[key].update(value)
+            else:
+                raw[key] = value
+        self.raw = raw
+        self.compiled = {key: _compile(key, value) for key, value in raw.items()}
+
+    def __getitem__(self, name):
+        return self.compiled[name]
+
+
+# Selectors used when a caller does not pass a site's own
+DEFAULT_PAGE_SELECTORS = PageSelectors()
+
+
+def to_tree(html, base_url=None):
+    """Parse HTML (str or bytes) into an lxml tree. Trees are passed through unchanged."""
+    if isinstance(html, (str, bytes)):
+        return lxml.html.fromstring(html, base_url=base_url)
+    return html
+
+
+def _text(element):
+    """Visible text of an lxml element with whitespace collapsed, like WebElement.text."""
+    return " ".join(element.text_content().split())
+
+
+def _first_text(tree, xpath):
+    """Text of the first element matching the compiled `xpath`, or None if there is no match."""
+    elements = xpath(tree)
+    return _text(elements[0]) if elements else None
+
+
+def is_captcha_page(html, selectors=DEFAULT_PAGE_SELECTORS):
+    return bool(selectors["captcha"](to_tree(html)))
+
+
+def is_no_results_page(html, selectors=DEFAULT_PAGE_SELECTORS):
+    return bool(selectors["no_results_link"](to_tree(html)))
+
+
+def is_results_page(html, selectors=DEFAULT_PAGE_SELECTORS):
+    tree = to_tree(html)
+    return bool(selectors["result_rows"](tree) or selectors["module_content"](tree))
+
+
+def parse_results_page(html, base_url=None, selectors=DEFAULT_PAGE_SELECTORS):
+    """
+    Read the rows of the search results `footable`. Returns dicts with the row index, address, class code and property link.
+    """
+    tree = to_tree(html, base_url)
+    base_url = base_url or tree.base_url
+    results = []
+    for idx, row in enumerate(selectors["result_rows"](tree), start=1):
+        address_cells = selectors["row_address"](row)
+        if not address_cells:
+            continue
+        class_cells = selectors["row_class_cells"](row)
+        class_text = _text(class_cells[0]) if class_cells else ""
+        links = selectors["row_property_links"](row) or selectors["row_fallback_links"](row)
+        results.append({
+            "index": idx,
+            "address": _text(address_cells[0]),
+            "class_code": class_text.split()[0] if class_text else None,
+            "property_link": urljoin(base_url or "", links[0]) if links else None,
+        })
+    return results
+
+
+def extract_property(html, cutoff_date=SALES_CUTOFF, selectors=DEFAULT_PAGE_SELECTORS):
+    """
+    Pull the property attributes and the sales rows on or after `cutoff_date` from a property page.
+    Returns None when the general details are missing. `sales` is None when the page has no transfers section.
+    """
+    tree = to_tree(html)
+    attributes = {
+        "Property Classification": _first_text(tree, selectors["property_classification"]),
+        "Parcel ID": _first_text(tree, selectors["parcel_id"]),
+        "Acres": _first_text(tree, selectors["property_acres"]),
+    }
+    if any(value is None for value in attributes.values()):
+        return None
+
+    residential = {field: _first_text(tree, xpath) for field, xpath in selectors["residential"].items()}
+    if all(value is not None for value in residential.values()):
+        attributes.update(residential)
+
+    if not selectors["transfers_section"](tree):
+        return {"attributes": attributes, "sales": None}
+
+    columns = selectors["sale_columns"]
+    sales = []
+    for row in selectors["sales_rows"](tree):
+        date_cells = selectors["sales_row_date"](row)
+        if not date_cells:
+            continue
+        date_text = _text(date_cells[0])
+        try:
+            if datetime.strptime(date_text, "%m/%d/%Y") < cutoff_date:
+                continue
+        except ValueError:
+            continue
+        cells = selectors["sales_row_cells"](row)
+        if len(cells) <= max(columns.values()):
+            continue
+        sale = {"Date": date_text}
+        sale.update({field: _text(cells[column]) for field, column in columns.items()})
+        sales.append(sale)
+    return {"attributes": attributes, "sales": sales}
+
+
+def parse_property_page(html, address, property_link, rental_id=400000, cutoff_date=SALES_CUTOFF, selectors=DEFAULT_PAGE_SELECTORS):
+    """
+    Build the same transaction rows `element_scrape` returns from one snapshot of a PageTypeID=4 property page.
+    Returns None when the general property details are missing and [] when there is no transfers section.
+    """
+    extracted = extract_property(html, cutoff_date, selectors)
+    if extracted is None:
+        log.warning("Error extracting general property details for %s", address)
+        return None
+    if extracted["sales"] is None:
+        log.debug("Transfers section not found for %s", address)
+        return []
+
+    attributes = extracted["attributes"]
+    # One row per sale, or a single minimal row when no sale passes the cutoff
+    sales = extracted["sales"] or [dict.fromkeys(["Date", "Price", "Transfer Type", "Instrument", "Transfer To"])]
+    transactions = []
+    for sales_id, sale in enumerate(sales, start=4000000):
+        transactions.append({
+            "RentalID": rental_id,
+            "SalesID": sales_id if extracted["sales"] else None,
+            "Address": address,
+            "Beds": attributes.get("Beds"),
+            "Date": sale["Date"],
+            "Price": sale["Price"],
+            "SQFT": attributes.get("SQFT"),
+            "Transfer Type": sale["Transfer Type"],
+            "Instrument": sale["Instrument"],
+            "Transfer To": sale["Transfer To"],
+            "Property Classification": attributes["Property Classification"],
+            "Parcel ID": attributes["Parcel ID"],
+            "Acres": attributes["Acres"],
+            "Zoning Class": attributes.get("Zoning Class"),
+            "Year Built": attributes.get("Year Built"),
+            "Year Improved/Renovated": attributes.get("Year Improved/Renovated"),
+            "Grade": attributes.get("Grade"),
+            "Property Link": property_link,
+            "Status": None
+        })
+    return transactions
@@ -0,0 +1,92 @@
+"""
+Site profiles: everything that differs from one Beacon county to the next.
+
+A profile is a JSON or YAML file with the county's search URL, the selectors that differ from the AppID=578 layout
+(see `beacon_parser.DEFAULT_SELECTORS`), the class codes to scrape, the sales cutoff date, the address files to read
+and, optionally, the output files and how many workers the county may use. Selectors are compiled when the profile
+is loaded, so a typo fails at startup instead of on the first property page.
+
+    {
+        "name": "whitley",
+        "start_url": "https://beacon.schneidercorp.com/Application.aspx?AppID=1234&LayerID=...&PageTypeID=2&PageID=...",
+        "class_codes": {"510": "One Family Dwelling Platted"},
+        "sales_cutoff": "2010-01-01",
+        "selectors": {"property_classification": "//table[contains(@class, \"tabular-data-two-column\")]//tr[9]//span"},
+        "inputs": ["whitley_addresses.csv"],
+        "workers": 2
+    }
+"""
+import json
+import os
+from datetime import datetime
+
+from beacon_parser import SALES_CUTOFF, PageSelectors
+
+# Property classes the scraper keeps by default
+DEFAULT_CLASS_CODES = {
+    "401": "4 - 19 family apartments",
+    "402": "20 - 39 family apartments",
+    "403": "40+ family apartments",
+    "530": "Three Family Dwelling Platted",
+    "520": "Two Family Dwelling Platted",
+    "510": "One Family Dwelling Platted",
+}
+
+PROFILE_FIELDS = {"name", "start_url", "class_codes", "sales_cutoff", "selectors", "inputs", "output", "status_db", "workers"}
+
+
+class SiteProfile:
+    """One county's Beacon site: where to search, how to read its pages and which parcels to keep."""
+    def __init__(self, name, start_url, class_codes=None, sales_cutoff=SALES_CUTOFF, selectors=None, inputs=(), output=None, status_db=None, workers=None):
+        self.name = name
+        self.start_url = start_url
+        self.class_codes = dict(class_codes if class_codes is not None else DEFAULT_CLASS_CODES)
+        if isinstance(sales_cutoff, str):
+            sales_cutoff = datetime.strptime(sales_cutoff, "%Y-%m-%d")
+        self.sales_cutoff = sales_cutoff
+        self.selectors = PageSelectors(selectors)
+        self.inputs = list(inputs)
+        self.output = output
+        self.status_db = status_db
+        self.workers = workers
+
+    def __repr__(self):
+        return f"SiteProfile({self.name!r}, {self.start_url!r})"
+
+
+# The county the scraper was written for (Tippecanoe, AppID=578)
+DEFAULT_PROFILE = SiteProfile(
+    name="tippecanoe",
+    start_url='https://beacon.schneidercorp.com/Application.aspx?AppID=578&LayerID=8505&PageTypeID=2&PageID=4151',
+    inputs=[
+        "Steps to Clean Raw Data/Scraped Parcel Files/PurdueOld.csv",
+        "Steps to Clean Raw Data/Scraped Parcel Files/Updated_Property_Data_with_Address_Components.csv",
+    ],
+)
+
+
+def load_profile(path):
+    """Read a profile from a .json, .yaml or .yml file. Relative input and output paths are taken from the file's folder."""
+    with open(path) as profile_file:
+        if path.endswith((".yaml", ".yml")):
+            import yaml  # PyYAML is only needed for YAML profiles
+            data = yaml.safe_load(profile_file)
+        else:
+            data = json.load(profile_file)
+
+    unknown = set(data) - PROFILE_FIELDS
+    if unknown:
+        raise ValueError(f"{path}: unknown profile fields {sorted(unknown)}")
+    for field in ("name", "start_url"):
+        if not data.get(field):
+            raise ValueError(f"{path}: profile needs a {field!r}")
+
+    folder = os.path.dirname(os.path.abspath(path))
+    resolve = lambda value: os.path.join(folder, value) if value else value
+    data["inputs"] = [resolve(input_path) for input_path in data.get("inputs", [])]
+    for field in ("output", "status_db"):
+        data[field] = resolve(data.get(field))
+    try:
+        return SiteProfile(**data)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from e
@@ -0,0 +1,118 @@
+"""
+Network transport for the lease-based work queue, so scraper nodes on several machines can share one address list.
+
+The coordinator owns the queue (the scraper's `LocalWorkQueue`, on its SQLite status store) and serves it with
+`QueueServer`. Nodes on other machines talk to it through `RemoteWorkQueue`, which has the same three calls:
+
+    claim(owner, count)                       -> {"leases": [{"address": ..., "token": ...}], "done": bool}
+    heartbeat(owner, tokens)                  -> {"held": [tokens still held]}
+    complete(token, address, status, rows)    -> {"accepted": bool}
+
+A lease runs out unless its node heartbeats, and the address goes back to the queue. A result is only accepted
+from the node that still holds the lease, so a node that was presumed dead cannot write the same address twice.
+Any object with these methods can stand in for the backend (tests/test_queue.py serves one on 127.0.0.1 port 0).
+"""
+import hmac
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+log = logging.getLogger("beacon_scraper.queue")
+
+QUEUE_PORT = 8765
+
+# Request path -> backend method and the JSON fields passed to it
+QUEUE_CALLS = {
+    "/claim": ("claim", ("owner", "count")),
+    "/heartbeat": ("heartbeat", ("owner", "tokens")),
+    "/complete": ("complete", ("token", "address", "status", "rows")),
+}
+
+
+class QueueHandler(BaseHTTPRequestHandler):
+    backend = None
+    secret = None
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.secret and not hmac.compare_digest(self.headers.get("X-Queue-Secret", ""), self.secret):
+            return self._send(403, {"error": "bad queue secret"})
+        if self.path not in QUEUE_CALLS:
+            return self._send(404, {"error": f"unknown call {self.path}"})
+        method, fields = QUEUE_CALLS[self.path]
+        try:
+            request = json.loads(body or b"{}")
+            reply = getattr(self.backend, method)(*(request.get(field) for field in fields))
+        except Exception as e:
+            log.error("Queue call %s failed: %s", self.path, e)
+            return self._send(500, {"error": str(e)})
+        self._send(200, reply)
+
+
+class QueueServer:
+    """Serves a work-queue backend as JSON over HTTP from a background thread. Port 0 picks a free port."""
+    def __init__(self, backend, host="0.0.0.0", port=QUEUE_PORT, secret=None):
+        handler = type("BoundQueueHandler", (QueueHandler,), {"backend": backend, "secret": secret})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="queue-server", daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{'127.0.0.1' if host == '0.0.0.0' else host}:{port}"
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class RemoteWorkQueue:
+    """Client for a `QueueServer`. Calls are retried a few times across brief network errors."""
+    def __init__(self, url, secret=None, timeout=30, attempts=3):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.attempts = attempts
+        self.session = requests.Session()
+        if secret:
+            self.session.headers["X-Queue-Secret"] = secret
+
+    def _call(self, path, **request):
+        for attempt in range(1, self.attempts + 1):
+            try:
+                response = self.session.post(f"{self.url}{path}", data=json.dumps(request, default=str), timeout=self.timeout,
+                                             headers={"Content-Type": "application/json"})
+                response.raise_for_status()
+                return response.json()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.attempts:
+                    raise
+                log.warning("Queue server unreachable (%s). Retrying...", e)
+                time.sleep(attempt)
+
+    def claim(self, owner, count):
+        return self._call("/claim", owner=owner, count=count)
+
+    def heartbeat(self, owner, tokens):
+        return self._call("/heartbeat", owner=owner, tokens=tokens)
+
+    def complete(self, token, address, status, rows):
+        return self._call("/complete", token=token, address=address, status=status, rows=rows)
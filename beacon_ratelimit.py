@@ -0,0 +1,105 @@
+"""
+Adaptive request pacing for the scraper.
+
+Every page navigation (a `driver.get`, the search click, a property-link click or an HTTP request) first takes a
+token from its host's bucket. The bucket's refill rate follows AIMD: every clean page raises it by a fixed step,
+and every CAPTCHA, error or navigation timeout cuts it by a factor. Workers on the same host share one bucket, so
+the limit applies to the whole run rather than to each session.
+"""
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+log = logging.getLogger("beacon_scraper.ratelimit")
+
+
+def host_of(url):
+    """Host part of `url`; anything that is not a URL is used as the host name as is."""
+    return urlsplit(url).netloc or url or ""
+
+
+class AdaptiveRateLimiter:
+    """
+    Per-host token buckets with an additive-increase/multiplicative-decrease refill rate (requests per second).
+    `metrics`, if given, gets the current rate of every host as a gauge and the backoffs as a counter.
+    """
+    def __init__(self, rate=2.0, min_rate=0.2, max_rate=20.0, increase=0.05, decrease=0.5, metrics=None):
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def _bucket(self, host, now):
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = {
+                "rate": self.initial_rate, "tokens": 1.0, "updated": now,
+                "clean": 0, "backoffs": 0, "last_backoff": None, "last_reason": None,
+            }
+        else:
+            # Refill, holding at most one second's worth of tokens so a quiet spell does not turn into a burst
+            capacity = max(1.0, bucket["rate"])
+            bucket["tokens"] = min(capacity, bucket["tokens"] + (now - bucket["updated"]) * bucket["rate"])
+            bucket["updated"] = now
+        return bucket
+
+    def acquire(self, url):
+        """Block until the host of `url` may be sent another request. Returns the seconds spent waiting."""
+        host = host_of(url)
+        with self.lock:
+            bucket = self._bucket(host, time.monotonic())
+            # Take the token now, even if that leaves the bucket in debt, so waiting threads queue up in order
+            bucket["tokens"] -= 1
+            wait = -bucket["tokens"] / bucket["rate"] if bucket["tokens"] < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def success(self, url):
+        """A page came back clean: raise the host's rate by one step."""
+        host = host_of(url)
+        with self.lock:
+            bucket = self._bucket(host, time.monotonic())
+            bucket["clean"] += 1
+            bucket["rate"] = min(self.max_rate, bucket["rate"] + self.increase)
+            rate = bucket["rate"]
+        self._report(host, rate)
+
+    def backoff(self, url, reason):
+        """The host served a CAPTCHA, an error or a timeout: cut its rate and drop any saved-up tokens."""
+        host = host_of(url)
+        with self.lock:
+            bucket = self._bucket(host, time.monotonic())
+            bucket["rate"] = max(self.min_rate, bucket["rate"] * self.decrease)
+            bucket["tokens"] = min(bucket["tokens"], 0.0)
+            bucket["backoffs"] += 1
+            bucket["last_backoff"] = time.time()
+            bucket["last_reason"] = reason
+            rate = bucket["rate"]
+        log.info("Backing off %s to %.2f requests/s (%s).", host, rate, reason)
+        if self.metrics is not None:
+            self.metrics.count("beacon_rate_backoffs_total", host=host, reason=reason)
+        self._report(host, rate)
+
+    def _report(self, host, rate):
+        if self.metrics is not None:
+            self.metrics.set_gauge("beacon_rate_limit_rps", round(rate, 4), host=host)
+
+    def state(self):
+        """Current rate, clean-page count and backoff history per host."""
+        with self.lock:
+            return {
+                host: {
+                    "rate": round(bucket["rate"], 3),
+                    "clean_pages": bucket["clean"],
+                    "backoffs": bucket["backoffs"],
+                    "last_backoff_reason": bucket["last_reason"],
+                    "seconds_since_backoff": round(time.time() - bucket["last_backoff"], 1) if bucket["last_backoff"] else None,
+                }
+                for host, bucket in sorted(self.buckets.items())
+            }
@@ -0,0 +1,90 @@
+"""
+Deferred retries for addresses whose scrape failed.
+
+A failed address is not retried on the spot. The worker records why it failed and the scheduler puts the address
+on a delay queue, due after an exponential backoff with jitter. In the meantime the worker moves on to fresh
+addresses and takes the retry back once it is due. Each kind of failure has its own base delay. Some failures are
+never retried, and no address gets more than `max_attempts` tries, so a page that always fails ends up with a
+final status.
+
+    failure kind      retried   why it happens
+    timeout           yes       the page or the search did not finish loading in time
+    stale_element     yes       the page re-rendered under the scraper
+    site_error        yes       server errors, dropped connections, pages we could not read
+    captcha           no        parked for the operator (--solve-parked) instead
+    no_results        no        a real answer from the site, written as such
+"""
+import heapq
+import itertools
+import random
+import threading
+import time
+
+# Failure kind -> base delay in seconds before the first retry (None: never retried)
+RETRY_DELAYS = {
+    "timeout": 10.0,
+    "stale_element": 2.0,
+    "site_error": 30.0,
+    "captcha": None,
+    "no_results": None,
+}
+MAX_ATTEMPTS = 4
+MAX_RETRY_DELAY = 300.0
+
+
+class RetryScheduler:
+    """
+    Delay queue of addresses waiting for another attempt, shared by the workers of one run.
+    `metrics`, if given, counts every failure by kind and by what happened to it.
+    """
+    def __init__(self, max_attempts=MAX_ATTEMPTS, delays=None, max_delay=MAX_RETRY_DELAY, metrics=None, rng=None):
+        self.max_attempts = max_attempts
+        self.delays = dict(RETRY_DELAYS if delays is None else delays)
+        self.max_delay = max_delay
+        self.metrics = metrics
+        self.rng = rng or random.Random()
+        self.lock = threading.Lock()
+        self.heap = []
+        self.order = itertools.count()
+        self.failures = {}
+
+    def delay_for(self, kind, failures):
+        """Backoff before the retry after the `failures`th failure: doubling from the kind's base, with jitter."""
+        delay = min(self.max_delay, self.delays[kind] * 2 ** (failures - 1))
+        # Equal jitter: never less than half the backoff, so retries of one street do not line up
+        return delay / 2 + self.rng.uniform(0, delay / 2)
+
+    def schedule(self, address, kind):
+        """
+        Record a failure of `address`. Returns the delay in seconds if it was queued for another attempt, or None
+        if it is not retried (a final kind, or out of attempts); its failures are kept for `finish` either way.
+        """
+        with self.lock:
+            failures = self.failures[address] = self.failures.get(address, 0) + 1
+            if self.delays.get(kind, self.delays["site_error"]) is None:
+                result, delay = "final", None
+            elif failures >= self.max_attempts:
+                result, delay = "exhausted", None
+            else:
+                result, delay = "scheduled", self.delay_for(kind if kind in self.delays else "site_error", failures)
+                heapq.heappush(self.heap, (time.monotonic() + delay, next(self.order), address))
+        if self.metrics is not None:
+            self.metrics.count("beacon_retries_total", kind=kind, result=result)
+        return delay
+
+    def pop_due(self):
+        """The next address whose retry is due, or None."""
+        with self.lock:
+            if self.heap and self.heap[0][0] <= time.monotonic():
+                return heapq.heappop(self.heap)[2]
+        return None
+
+    def pending(self):
+        """Retries queued and not yet taken, due or not."""
+        with self.lock:
+            return len(self.heap)
+
+    def finish(self, address):
+        """Forget `address` once it has a final result. Returns how many of its attempts failed before."""
+        with self.lock:
+            return self.failures.pop(address, 0)
@@ -0,0 +1,175 @@
+"""
+Where scraped rows go: the flat CSV the dashboard reads, Parquet part files, or the typed parcel database.
+
+Every sink buffers rows and writes them in batches on its own thread. The scraper passes a callback with each
+result that records the address's status, and the sink calls it only once the rows are on disk, so a crash never
+leaves an address marked scraped without its rows.
+"""
+import contextlib
+import csv
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from beacon_store import ParcelDatabase
+
+log = logging.getLogger("beacon_scraper.sinks")
+
+OUTPUT_HEADERS = [
+    "RentalID", "SalesID", "Address", "Beds", "Date",
+    "Price", "SQFT", "Transfer Type", "Instrument",
+    "Transfer To", "Property Classification", "Parcel ID",
+    "Acres", "Zoning Class", "Year Built", "Year Improved/Renovated",
+    "Grade", "Property Link", "Status"
+]
+
+
+class OutputSink:
+    """
+    Buffers output rows and writes them in batches on a background thread, so scraping never waits on disk.
+    Callbacks passed to `write` run only after the rows queued with them have been flushed to disk.
+    `metrics`, if given, times every flush and counts the rows written and the flushes that failed.
+    """
+    def __init__(self, path, batch_size=200, flush_interval=5.0, metrics=None):
+        self.path = path
+        self.metrics = metrics
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=f"{type(self).__name__}-writer", daemon=True)
+        self.thread.start()
+
+    def write(self, rows, on_flushed=None):
+        """Queue rows for writing. `on_flushed` is called once they are safely on disk."""
+        self.pending.put((rows, on_flushed))
+
+    def sync(self, timeout=60):
+        """Wait until everything written so far has been flushed and acknowledged. False if that did not happen in time."""
+        flushed = threading.Event()
+        self.write([], flushed.set)
+        return flushed.wait(timeout)
+
+    def close(self):
+        """Flush everything still buffered and stop the writer thread."""
+        self.pending.put(None)
+        self.thread.join()
+
+    def write_batch(self, rows):
+        raise NotImplementedError
+
+    def close_file(self):
+        pass
+
+    def _run(self):
+        rows, callbacks = [], []
+        last_flush = time.monotonic()
+        closing = False
+        while not closing:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                item = self.pending.get(timeout=timeout)
+                if item is None:
+                    closing = True
+                else:
+                    rows.extend(item[0])
+                    if item[1] is not None:
+                        callbacks.append(item[1])
+            except queue.Empty:
+                pass
+
+            if closing or len(rows) >= self.batch_size or time.monotonic() - last_flush >= self.flush_interval:
+                self._flush(rows, callbacks)
+                rows, callbacks = [], []
+                last_flush = time.monotonic()
+        try:
+            self.close_file()
+        except Exception as e:
+            log.error("Error closing %s: %s", self.path, e)
+
+    def _flush(self, rows, callbacks):
+        try:
+            if rows:
+                with self.metrics.span("sink_flush") if self.metrics is not None else contextlib.nullcontext():
+                    self.write_batch(rows)
+                if self.metrics is not None:
+                    self.metrics.count("beacon_rows_written_total", len(rows))
+                log.debug("Flushed %s rows to %s.", len(rows), self.path)
+        except Exception as e:
+            # Leave the statuses unacknowledged so these addresses are scraped again on the next run
+            if self.metrics is not None:
+                self.metrics.count("beacon_flush_errors_total")
+            log.error("Error writing %s rows to %s: %s", len(rows), self.path, e)
+            return
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                log.error("Error in flush callback: %s", e)
+
+
+class CsvSink(OutputSink):
+    """Appends rows to one CSV file that stays open for the whole run."""
+    def __init__(self, path, **kwargs):
+        self.csvfile = open(path, 'a', newline='')
+        self.writer = csv.DictWriter(self.csvfile, fieldnames=OUTPUT_HEADERS)
+        if self.csvfile.tell() == 0:  # Write the header only if the file is empty
+            self.writer.writeheader()
+        super().__init__(path, **kwargs)
+
+    def write_batch(self, rows):
+        self.writer.writerows(rows)
+        self.csvfile.flush()
+        os.fsync(self.csvfile.fileno())
+
+    def close_file(self):
+        self.csvfile.close()
+
+
+class ParquetSink(OutputSink):
+    """
+    Writes each batch as its own part file in the `path` directory, so every flushed batch is a complete Parquet file.
+    """
+    def __init__(self, path, **kwargs):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa, self.pq = pa, pq
+        self.schema = pa.schema([(column, pa.string()) for column in OUTPUT_HEADERS])
+        os.makedirs(path, exist_ok=True)
+        self.run_prefix = datetime.now().strftime("%Y%m%d-%H%M%S")
+        self.part_number = 0
+        super().__init__(path, **kwargs)
+
+    def write_batch(self, rows):
+        columns = {column: [None if row.get(column) is None else str(row.get(column)) for row in rows] for column in OUTPUT_HEADERS}
+        table = self.pa.Table.from_pydict(columns, schema=self.schema)
+        self.part_number += 1
+        part_path = os.path.join(self.path, f"part-{self.run_prefix}-{self.part_number:05d}.parquet")
+        # Write under a temporary name so readers never see a half-written part
+        self.pq.write_table(table, part_path + ".tmp")
+        os.replace(part_path + ".tmp", part_path)
+
+
+class SqliteSink(OutputSink):
+    """
+    Upserts rows into a normalized, typed properties/sales database (see `beacon_store`), so re-runs update
+    parcels instead of appending duplicates.
+    """
+    def __init__(self, path, **kwargs):
+        self.database = ParcelDatabase(path)
+        super().__init__(path, **kwargs)
+
+    def write_batch(self, rows):
+        self.database.upsert_rows(rows)
+
+    def close_file(self):
+        self.database.close()
+
+
+OUTPUT_SINKS = {
+    "csv": CsvSink,
+    "parquet": ParquetSink,
+    "sqlite": SqliteSink,
+}
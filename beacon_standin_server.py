@@ -0,0 +1,425 @@
+"""
+Local stand-in for the Beacon parcel site, for measuring the scraper without touching the county's servers.
+
+Serves the pages the scraper reads, with the same ids and classes as the real site: the terms popup, the
+ASP.NET search form (with __VIEWSTATE/__EVENTVALIDATION postbacks), search results `footable` rows with class
+codes, "no results" pages and PageTypeID=4 property pages with the `ctl20` sales grid and `ctl16` building
+section. Parcels come from a seeded synthetic data set, and latency and CAPTCHAs can be injected.
+
+    python beacon_standin_server.py --port 8578 --addresses 1000 --latency-ms 150 --captcha-rate 0.01
+"""
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+APP_PATH = "/Application.aspx"
+SEARCH_QUERY = {"AppID": "578", "LayerID": "8505", "PageTypeID": "2", "PageID": "4151"}
+PROPERTY_QUERY = {"AppID": "578", "LayerID": "8505", "PageTypeID": "4", "PageID": "4153"}
+VIEWSTATE = "dDwtMTc5NzQ0NjU4Mjs7Pj4standin"
+EVENTVALIDATION = "L2Jlc3Rfc3RhbmRpbl92YWxpZGF0aW9u"
+TERMS_COOKIE = "beacon_terms"
+
+STREETS = [
+    "Main", "State", "Northwestern", "Salisbury", "Grant", "Chauncey", "Stadium", "Wood", "Lindberg",
+    "Sylvia", "Kent", "Robinson", "Vine", "Harrison", "Fowler", "Russell", "Sheetz", "Waldron", "Pierce", "Oak",
+]
+SUFFIXES = ["St", "Ave", "Dr", "Ct", "Rd", "Ln"]
+DIRECTIONS = ["", "", "N ", "S ", "W ", "E "]
+# Class codes the scraper keeps, plus ones it filters out
+SCRAPED_CLASSES = {
+    "401": "4 - 19 family apartments", "402": "20 - 39 family apartments", "403": "40+ family apartments",
+    "510": "One Family Dwelling Platted", "520": "Two Family Dwelling Platted", "530": "Three Family Dwelling Platted",
+}
+OTHER_CLASSES = {"100": "Vacant Land", "429": "Other Retail Structures", "500": "Vacant Platted Lot"}
+RESIDENTIAL_CLASSES = {"510", "520", "530"}
+
+
+def generate_dataset(address_count, seed=578):
+    """
+    Deterministic synthetic county: `address_count` addresses, each with one or more parcels.
+    Returns (addresses, missing addresses, parcels) where parcels maps Parcel ID to its attributes and sales.
+    """
+    rng = random.Random(seed)
+    addresses, parcels = [], {}
+    used = set()
+    while len(addresses) < address_count:
+        address = f"{rng.randint(100, 9999)} {rng.choice(DIRECTIONS)}{rng.choice(STREETS)} {rng.choice(SUFFIXES)}"
+        if address in used:
+            continue
+        used.add(address)
+        addresses.append(address)
+        # Most addresses resolve straight to one parcel; some have several (condos, split lots)
+        parcel_count = 1 if rng.random() < 0.8 else rng.randint(2, 4)
+        for _ in range(parcel_count):
+            parcel_id = f"79-07-{rng.randint(10, 99):02d}-{rng.randint(100, 999)}-{len(parcels):06d}.000-{rng.randint(1, 30):03d}"
+            if rng.random() < 0.85:
+                class_code = rng.choice(list(SCRAPED_CLASSES))
+                class_name = SCRAPED_CLASSES[class_code]
+            else:
+                class_code = rng.choice(list(OTHER_CLASSES))
+                class_name = OTHER_CLASSES[class_code]
+            sales = []
+            for _ in range(rng.randint(0, 12)):
+                sales.append({
+                    "date": f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{rng.randint(1985, 2024)}",
+                    "type": rng.choice(["WD", "QC", "SW", "TD"]),
+                    "instrument": f"{rng.randint(1990, 2024)}{rng.randint(1, 99999):05d}",
+                    "to": rng.choice(["SMITH JOHN", "PURDUE RESEARCH FOUNDATION", "BOILER RENTALS LLC", "DOE JANE", "TIPPECANOE HOLDINGS"]),
+                    "price": f"${rng.randint(0, 900) * 1000:,}",
+                })
+            sales.sort(key=lambda sale: (sale["date"][6:], sale["date"][:2], sale["date"][3:5]), reverse=True)
+            parcels[parcel_id] = {
+                "parcel_id": parcel_id,
+                "address": address,
+                "class_code": class_code,
+                "class_name": class_name,
+                "acres": f"{rng.uniform(0.05, 2.5):.3f}",
+                "owner": rng.choice(["SMITH JOHN", "BOILER RENTALS LLC", "DOE JANE"]),
+                "zoning": rng.choice(["R1", "R2", "R3", "R3U"]),
+                "year_built": str(rng.randint(1900, 2020)),
+                "effective_year": str(rng.randint(1950, 2022)),
+                "beds": str(rng.randint(1, 6)),
+                "sqft": str(rng.randint(600, 4500)),
+                "grade": rng.choice(["C", "C+1", "B", "D+2"]),
+                "sales": sales,
+            }
+    # Addresses the site does not know about, so "no results" pages show up too
+    missing = [f"{rng.randint(10000, 19999)} {rng.choice(STREETS)} {rng.choice(SUFFIXES)}" for _ in range(max(1, address_count // 20))]
+    return addresses, missing, parcels
+
+
+def _search_url():
+    return f"{APP_PATH}?{urlencode(SEARCH_QUERY)}"
+
+
+def _property_url(parcel_id):
+    return f"{APP_PATH}?{urlencode(dict(PROPERTY_QUERY, KeyValue=parcel_id))}"
+
+
+def _page(title, body, show_terms=False):
+    terms = ""
+    if show_terms:
+        terms = """
+<div class="modal" id="appTermsModal" style="display:block">
+  <div class="modal-body"><p>By using this site you agree to the terms and conditions.</p></div>
+  <div class="modal-footer">
+    <a class="btn btn-primary button-1" onclick="document.cookie='beacon_terms=accepted; path=/'; document.getElementById('appTermsModal').style.display='none'; return false;" href="#">Agree</a>
+  </div>
+</div>"""
+    return f"""<!DOCTYPE html>
+<html><head><title>{html.escape(title)} - Beacon stand-in</title>
+<script>
+function __doPostBack(eventTarget, eventArgument) {{
+  var form = document.forms[0];
+  form.__EVENTTARGET.value = eventTarget;
+  form.__EVENTARGUMENT.value = eventArgument;
+  form.submit();
+}}
+</script></head>
+<body>{terms}
+<ul class="nav"><li id="search1"><a href="{_search_url()}">Search</a></li></ul>
+{body}
+</body></html>"""
+
+
+def render_search_page(show_terms):
+    body = f"""
+<form method="post" action=".{_search_url()}" id="Form1">
+  <input type="hidden" name="__EVENTTARGET" id="__EVENTTARGET" value="" />
+  <input type="hidden" name="__EVENTARGUMENT" id="__EVENTARGUMENT" value="" />
+  <input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{VIEWSTATE}" />
+  <input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="{EVENTVALIDATION}" />
+  <div class="search-panel">
+    <label for="ctlBodyPane_ctl02_ctl01_txtAddress">Address</label>
+    <input name="ctlBodyPane$ctl02$ctl01$txtAddress" type="text" id="ctlBodyPane_ctl02_ctl01_txtAddress" />
+    <a id="ctlBodyPane_ctl02_ctl01_btnSearch" class="btn btn-primary" href="javascript:__doPostBack('ctlBodyPane$ctl02$ctl01$btnSearch','')">Search</a>
+  </div>
+</form>"""
+    return _page("Search", body, show_terms)
+
+
+def render_results_page(query, parcels, page=1, page_size=50):
+    """Results `footable` for `query`, `page_size` rows per page with a pager for the rest."""
+    start = (page - 1) * page_size
+    rows = []
+    for parcel in parcels[start:start + page_size]:
+        rows.append(f"""
+    <tr>
+      <td><a class="footable-toggle" href="javascript:void(0)" onclick="this.closest('tr').classList.toggle('footable-detail-show')"></a></td>
+      <td><a class="normal-font-label" href="{html.escape(_property_url(parcel['parcel_id']))}">{html.escape(parcel['parcel_id'])}</a></td>
+      <td>{html.escape(parcel['owner'])}</td>
+      <td>{html.escape(parcel['acres'])}</td>
+      <td>{html.escape(parcel['address'])}</td>
+      <td align="center">{parcel['class_code']} {html.escape(parcel['class_name'])}</td>
+    </tr>""")
+    pages = (len(parcels) + page_size - 1) // page_size
+    pager = ""
+    if pages > 1:
+        links = " ".join(
+            f'<a class="results-page" href="javascript:__doPostBack(\'ctlBodyPane$ctl00$pager\',\'Page${number}\')">{number}</a>'
+            for number in range(1, pages + 1)
+        )
+        pager = f'<div class="pager" data-page="{page}" data-pages="{pages}">{links}</div>'
+    body = f"""
+<form method="post" action=".{_search_url()}" id="Form1">
+  <input type="hidden" name="__EVENTTARGET" id="__EVENTTARGET" value="" />
+  <input type="hidden" name="__EVENTARGUMENT" id="__EVENTARGUMENT" value="" />
+  <input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{VIEWSTATE}" />
+  <input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="{EVENTVALIDATION}" />
+  <input type="hidden" name="ctlBodyPane$ctl02$ctl01$txtAddress" value="{html.escape(query)}" />
+</form>
+<div class="module-content">
+  <table class="footable table" id="ctlBodyPane_ctl00_ctl01_gvwParcelResults">
+    <thead><tr><th></th><th>Parcel ID</th><th>Owner</th><th>Acres</th><th>Property Address</th><th>Class</th></tr></thead>
+    <tbody>{''.join(rows)}
+    </tbody>
+  </table>
+  {pager}
+</div>"""
+    return _page("Results", body)
+
+
+def render_no_results_page():
+    body = f"""
+<div class="module-content">
+  <p>No results match your search criteria.</p>
+  <a id="ctlBodyPane_noDataList_lnkSearchPage" href="{_search_url()}">Return to Search</a>
+</div>"""
+    return _page("No Results", body)
+
+
+def render_captcha_page():
+    body = """
+<div class="module-content">
+  <p>Please verify you are not a robot.</p>
+  <div class="g-recaptcha" data-sitekey="standin"></div>
+</div>"""
+    return _page("Verify", body)
+
+
+def render_property_page(parcel):
+    general = [
+        ("Parcel ID", parcel["parcel_id"]), ("Tax ID", parcel["parcel_id"].replace("-", "")), ("Section/Plat", "07"),
+        ("Routing Number", "R1"), ("Property Address", parcel["address"]), ("Neighborhood", "Campus"),
+        ("Legal Description", "LOT 1 STANDIN ADDITION"), ("Deeded Acreage", parcel["acres"]), ("Tax District", "WEST LAFAYETTE"),
+        ("Acres", parcel["acres"]), ("Class", f"{parcel['class_code']} {parcel['class_name']}"),
+    ]
+    general_rows = "".join(
+        f"<tr><th>{html.escape(label)}</th><td><span>{html.escape(value)}</span></td></tr>" for label, value in general
+    )
+    # "To" (td[5]) and "Sale Price" (td[6]) are hidden until their column checkboxes are ticked
+    sales_rows = "".join(f"""
+        <tr><th>{sale['date']}</th><td>No</td><td>{sale['type']}</td><td>{sale['instrument']}</td><td>2024/{index:04d}</td>
+          <td class="col-to hidden">{html.escape(sale['to'])}</td><td class="col-price hidden">{sale['price']}</td></tr>"""
+        for index, sale in enumerate(parcel["sales"], start=1))
+    building = ""
+    if parcel["class_code"] in RESIDENTIAL_CLASSES:
+        prefix = "ctlBodyPane_ctl16_ctl01_lstBuildings_ctl00_dynamicBuilding"
+        left = [("ctl00", "Zoning", parcel["zoning"]), ("ctl01", "Year Built", parcel["year_built"]), ("ctl02", "Effective Year", parcel["effective_year"]),
+                ("ctl03", "Stories", "2"), ("ctl04", "Rooms", "7"), ("ctl05", "Bedrooms", parcel["beds"])]
+        right_values = {"ctl06": ("Square Feet", parcel["sqft"]), "ctl11": ("Grade", parcel["grade"])}
+        right = [(f"ctl{number:02d}", *right_values.get(f"ctl{number:02d}", (f"Field {number}", "-"))) for number in range(12)]
+        columns = ""
+        for side, fields in (("Left", left), ("Right", right)):
+            for control, label, value in fields:
+                columns += f'<div><span>{label}</span><div id="{prefix}Data{side}Column_rptrDynamicColumns_{control}_pnlSingleValue">{html.escape(value)}</div></div>'
+        building = f'<section id="ctlBodyPane_ctl16_mSection"><div class="module-header">Residential Dwellings</div>{columns}</section>'
+    body = f"""
+<section id="ctlBodyPane_ctl00_mSection">
+  <table class="tabular-data-two-column"><tbody>{general_rows}</tbody></table>
+</section>
+<section id="ctlBodyPane_ctl20_mSection">
+  <div class="module-header">Transfer History
+    <div class="dropdown">
+      <button class="btn dropdown-toggle" type="button" onclick="document.getElementById('salesColumns').style.display='block'">Columns</button>
+      <ul class="dropdown-menu" id="salesColumns" style="display:none">
+        <li><a role="menuitemcheckbox" aria-checked="false" href="#" onclick="return toggleSalesColumn(this, 'col-to')">To</a></li>
+        <li><a role="menuitemcheckbox" aria-checked="false" href="#" onclick="return toggleSalesColumn(this, 'col-price')">Sale Price</a></li>
+      </ul>
+    </div>
+  </div>
+  <div id="salesGrid">
+  <table id="ctlBodyPane_ctl20_ctl01_grdSales_grdFlat" class="tabular-data">
+    <thead><tr><th>Date</th><th>Multi Parcel</th><th>Type</th><th>Instrument</th><th>Book/Page</th></tr></thead>
+    <tbody>{sales_rows}
+    </tbody>
+  </table>
+  </div>
+</section>
+{building}
+<script>
+// Beacon re-renders the grid when a column is shown, so replace the table rather than restyling it
+function toggleSalesColumn(link, columnClass) {{
+  var checked = link.getAttribute('aria-checked') !== 'true';
+  link.setAttribute('aria-checked', checked ? 'true' : 'false');
+  var grid = document.getElementById('ctlBodyPane_ctl20_ctl01_grdSales_grdFlat');
+  var copy = grid.cloneNode(true);
+  copy.querySelectorAll('td.' + columnClass).forEach(function (cell) {{ cell.classList.toggle('hidden', !checked); }});
+  var header = copy.querySelector('thead tr');
+  var label = columnClass === 'col-to' ? 'To' : 'Sale Price';
+  var existing = Array.prototype.filter.call(header.children, function (cell) {{ return cell.textContent === label; }});
+  if (checked && !existing.length) {{ var th = document.createElement('th'); th.textContent = label; header.appendChild(th); }}
+  if (!checked) {{ existing.forEach(function (cell) {{ cell.remove(); }}); }}
+  grid.parentNode.replaceChild(copy, grid);
+  return false;
+}}
+</script>"""
+    return _page(parcel["address"], body)
+
+
+def _canonical(text):
+    return " ".join(text.upper().replace(".", " ").replace(",", " ").split())
+
+
+class StandinSite:
+    """The synthetic county plus the knobs for latency and CAPTCHA injection."""
+    def __init__(self, address_count=1000, seed=578, latency_ms=0, jitter_ms=0, captcha_rate=0.0, results_page_size=50):
+        self.addresses, self.missing_addresses, self.parcels = generate_dataset(address_count, seed)
+        self.by_address = {}
+        for parcel in self.parcels.values():
+            self.by_address.setdefault(_canonical(parcel["address"]), []).append(parcel)
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.captcha_rate = captcha_rate
+        self.results_page_size = results_page_size
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.request_count = 0
+
+    def delay(self):
+        with self.rng_lock:
+            self.request_count += 1
+            jitter = self.rng.uniform(0, self.jitter) if self.jitter else 0
+            captcha = self.captcha_rate and self.rng.random() < self.captcha_rate
+        if self.latency or jitter:
+            time.sleep(self.latency + jitter)
+        return captcha
+
+    def search(self, query):
+        """
+        Parcels matching a search. A query starting with a house number matches that address; a street-only
+        query ("Main St") returns every parcel on the street, like Beacon's partial address search.
+        """
+        query = _canonical(query)
+        if not query:
+            return []
+        if query.split()[0].isdigit():
+            return list(self.by_address.get(query, []))
+        return [parcel for key, parcels in self.by_address.items() if key.endswith(" " + query) for parcel in parcels]
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    site = None
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this, delayed ACKs add ~40 ms to every page
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _terms_accepted(self):
+        return f"{TERMS_COOKIE}=accepted" in (self.headers.get("Cookie") or "")
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == "/standin/addresses":
+            addresses = self.site.addresses + self.site.missing_addresses
+            return self._send(200, json.dumps(addresses), "application/json")
+        if url.path == "/standin/stats":
+            return self._send(200, json.dumps({"requests": self.site.request_count}), "application/json")
+        if url.path != APP_PATH:
+            return self._send(404, _page("Not Found", "<p>Not found</p>"))
+
+        if self.site.delay():
+            return self._send(200, render_captcha_page())
+        if query.get("PageTypeID") == "4":
+            parcel = self.site.parcels.get(query.get("KeyValue", ""))
+            if parcel is None:
+                return self._send(404, _page("Not Found", "<p>Parcel not found</p>"))
+            return self._send(200, render_property_page(parcel))
+        return self._send(200, render_search_page(show_terms=not self._terms_accepted()))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        form = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True).items()}
+        # ASP.NET rejects postbacks that do not carry the page's state forward
+        if form.get("__VIEWSTATE") != VIEWSTATE or form.get("__EVENTVALIDATION") != EVENTVALIDATION:
+            return self._send(500, _page("Error", "<p>Invalid postback or callback argument.</p>"))
+        if self.site.delay():
+            return self._send(200, render_captcha_page())
+
+        event_target = form.get("__EVENTTARGET", "")
+        query = form.get("ctlBodyPane$ctl02$ctl01$txtAddress", "")
+        if event_target == "ctlBodyPane$ctl00$pager":
+            page = int(form.get("__EVENTARGUMENT", "Page$1").split("$")[-1])
+            return self._send(200, render_results_page(query, self.site.search(query), page, self.site.results_page_size))
+        if event_target != "ctlBodyPane$ctl02$ctl01$btnSearch":
+            return self._send(200, render_search_page(show_terms=False))
+
+        parcels = self.site.search(query)
+        if not parcels:
+            return self._send(200, render_no_results_page())
+        if len(parcels) == 1:
+            # A single match goes straight to the property page
+            return self._send(302, "", headers={"Location": _property_url(parcels[0]["parcel_id"])})
+        return self._send(200, render_results_page(query, parcels, 1, self.site.results_page_size))
+
+
+def make_server(site, host="127.0.0.1", port=0):
+    """HTTP server for `site`. Port 0 picks a free port; read it back from `server.server_address`."""
+    handler = type("BoundStandinHandler", (StandinHandler,), {"site": site})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(site, host="127.0.0.1", port=0):
+    """Serve `site` from a background thread. Returns (server, start URL)."""
+    server = make_server(site, host, port)
+    threading.Thread(target=server.serve_forever, name="beacon-standin", daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}{_search_url()}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Beacon parcel site.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8578)
+    parser.add_argument("--addresses", type=int, default=1000, help="Number of synthetic addresses")
+    parser.add_argument("--seed", type=int, default=578)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Fixed delay added to every page")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra delay, up to this many milliseconds")
+    parser.add_argument("--captcha-rate", type=float, default=0.0, help="Fraction of pages replaced by a CAPTCHA")
+    parser.add_argument("--results-page-size", type=int, default=50, help="Rows per page of search results")
+    args = parser.parse_args()
+
+    site = StandinSite(args.addresses, args.seed, args.latency_ms, args.jitter_ms, args.captcha_rate, args.results_page_size)
+    server = make_server(site, args.host, args.port)
+    host, port = server.server_address[:2]
+    print(f"Beacon stand-in with {len(site.addresses)} addresses and {len(site.parcels)} parcels at http://{host}:{port}{_search_url()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Scrape status of every input address, kept in SQLite so a run can resume where the last one stopped.
+
+Each address has one row, keyed by its canonical form (`canonical_address`), so spellings of the same address
+collapse into one. The row holds the address's last status and, when nodes share the run through the work queue
+(`beacon_queue`), the lease of the node scraping it.
+"""
+import csv
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# Addresses that hit a CAPTCHA wait under this status for a later run or the --solve-parked operator step
+PARKED_STATUS = "Parked (CAPTCHA)"
+# Statuses that mean an address still needs (another) attempt on the next run
+RETRYABLE_STATUSES = ("Not Scraped", "Error", "Failed After Retry", PARKED_STATUS)
+
+# USPS (Publication 28) standard abbreviations for street suffixes and directionals
+STREET_SUFFIXES = {
+    "ALLEY": "ALY", "ALLY": "ALY", "AVENUE": "AVE", "AV": "AVE", "AVEN": "AVE", "AVN": "AVE", "AVNUE": "AVE",
+    "BOULEVARD": "BLVD", "BOUL": "BLVD", "BOULV": "BLVD", "CIRCLE": "CIR", "CIRC": "CIR", "CRCL": "CIR",
+    "COURT": "CT", "CRT": "CT", "COVE": "CV", "CROSSING": "XING", "DRIVE": "DR", "DRIV": "DR", "DRV": "DR",
+    "EXPRESSWAY": "EXPY", "HIGHWAY": "HWY", "HIWAY": "HWY", "LANE": "LN", "LOOP": "LOOP", "PARKWAY": "PKWY",
+    "PKY": "PKWY", "PARKWY": "PKWY", "PASS": "PASS", "PIKE": "PIKE", "PLACE": "PL", "PLAZA": "PLZ", "POINT": "PT",
+    "ROAD": "RD", "ROUTE": "RTE", "RUN": "RUN", "SQUARE": "SQ", "SQR": "SQ", "STREET": "ST", "STR": "ST", "STRT": "ST",
+    "TERRACE": "TER", "TERR": "TER", "TRAIL": "TRL", "TRAILS": "TRL", "TRL": "TRL", "TURNPIKE": "TPKE",
+    "WAY": "WAY", "WY": "WAY",
+}
+DIRECTIONALS = {
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "NORTHEAST": "NE", "NORTHWEST": "NW", "SOUTHEAST": "SE", "SOUTHWEST": "SW",
+}
+# Secondary unit designators all collapse to "#" so "Apt 4", "Unit 4" and "#4" match
+UNIT_DESIGNATORS = {"APARTMENT", "APT", "UNIT", "SUITE", "STE", "NO", "NUMBER", "#"}
+
+
+def canonical_address(address):
+    """
+    Canonical form of a street address: upper case, punctuation and extra whitespace removed, USPS suffix and
+    directional abbreviations, and any unit designator written as "#".
+    "123 North Main Street, Apt. 4" and "123 n main st #4" both become "123 N MAIN ST # 4".
+    A designator word before the street has a name is the street name itself ("12 Apt Rd" stays "12 APT RD").
+    """
+    text = re.sub(r"#", " # ", str(address).upper())
+    tokens = re.sub(r"[^\w#/-]+", " ", text).split()
+    canonical = []
+    for position, token in enumerate(tokens):
+        named = any(word not in DIRECTIONALS.values() and "/" not in word for word in canonical[1:])
+        if token in UNIT_DESIGNATORS and position > 0 and (token == "#" or named):
+            # "#" followed by another designator ("APT #4") only needs one marker
+            if not canonical or canonical[-1] != "#":
+                canonical.append("#")
+        elif token in DIRECTIONALS:
+            canonical.append(DIRECTIONALS[token])
+        elif token in STREET_SUFFIXES:
+            canonical.append(STREET_SUFFIXES[token])
+        else:
+            canonical.append(token)
+    return " ".join(canonical)
+
+
+def normalize_address_key(address):
+    """Key used to look an address up in the status store and page cache."""
+    return canonical_address(address)
+
+
+class StatusStore:
+    """
+    Persistent scrape status per address, kept in SQLite (WAL mode) so updates are O(1) and a run can resume after a crash.
+    Addresses are keyed by their canonical form, so spellings of the same address ("123 N Main St" / "123 North Main
+    Street ") collapse into the first one registered.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS address_status (
+                address_key TEXT PRIMARY KEY,
+                address TEXT NOT NULL,
+                status TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS address_status_status ON address_status (status)")
+        # Lease of an address handed out by the work queue: held until `lease_expires`, done for this run once it is NULL
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(address_status)")}
+        for column, column_type in (("lease_owner", "TEXT"), ("lease_token", "TEXT"), ("lease_expires", "REAL")):
+            if column not in columns:
+                self.connection.execute(f"ALTER TABLE address_status ADD COLUMN {column} {column_type}")
+        self.connection.commit()
+
+    def add_addresses(self, addresses):
+        """Register input addresses as "Not Scraped". Addresses already in the store keep their status."""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.lock:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO address_status (address_key, address, status, updated_at) VALUES (?, ?, 'Not Scraped', ?)",
+                ((normalize_address_key(address), address, now) for address in addresses),
+            )
+            self.connection.commit()
+            return self.connection.total_changes - before
+
+    def set_status(self, address, status):
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.lock:
+            self.connection.execute(
+                """INSERT INTO address_status (address_key, address, status, updated_at) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (address_key) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at""",
+                (normalize_address_key(address), address, status, now),
+            )
+            self.connection.commit()
+
+    def reset(self):
+        """Mark every address "Not Scraped" again, for a full re-scrape."""
+        with self.lock:
+            self.connection.execute("UPDATE address_status SET status = 'Not Scraped'")
+            self.connection.commit()
+
+    def pending_addresses(self, statuses=RETRYABLE_STATUSES):
+        """Addresses that have not been scraped yet or are worth retrying (or, with `statuses`, the ones in those statuses)."""
+        placeholders = ", ".join("?" for _ in statuses)
+        with self.lock:
+            rows = self.connection.execute(
+                f"SELECT address FROM address_status WHERE status IN ({placeholders}) ORDER BY rowid",
+                tuple(statuses),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def pending_after(self, rowid, limit=1000, statuses=RETRYABLE_STATUSES):
+        """The next `limit` (rowid, address) pairs after `rowid` that are left to scrape, in registration order."""
+        placeholders = ", ".join("?" for _ in statuses)
+        with self.lock:
+            return self.connection.execute(
+                f"SELECT rowid, address FROM address_status WHERE rowid > ? AND status IN ({placeholders}) ORDER BY rowid LIMIT ?",
+                (rowid, *statuses, limit),
+            ).fetchall()
+
+    def claim(self, owner, count, lease_seconds, statuses=RETRYABLE_STATUSES):
+        """
+        Lease up to `count` addresses left to scrape to `owner` for `lease_seconds`: ones nobody has claimed in this
+        run, and ones whose lease ran out before their result came back. Returns [{"address", "token"}, ...].
+        """
+        now = time.time()
+        placeholders = ", ".join("?" for _ in statuses)
+        with self.lock:
+            rows = self.connection.execute(
+                f"""SELECT rowid, address FROM address_status WHERE status IN ({placeholders})
+                    AND (lease_token IS NULL OR (lease_expires IS NOT NULL AND lease_expires < ?)) ORDER BY rowid LIMIT ?""",
+                (*statuses, now, count),
+            ).fetchall()
+            leases = [{"address": address, "token": secrets.token_hex(8)} for _, address in rows]
+            self.connection.executemany(
+                "UPDATE address_status SET lease_owner = ?, lease_token = ?, lease_expires = ? WHERE rowid = ?",
+                [(owner, lease["token"], now + lease_seconds, rowid) for (rowid, _), lease in zip(rows, leases)],
+            )
+            self.connection.commit()
+        return leases
+
+    def renew_leases(self, owner, tokens, lease_seconds):
+        """Extend `owner`'s unexpired leases among `tokens`. Returns the tokens it still holds."""
+        now = time.time()
+        held = []
+        with self.lock:
+            for token in tokens:
+                cursor = self.connection.execute(
+                    "UPDATE address_status SET lease_expires = ? WHERE lease_token = ? AND lease_owner = ? AND lease_expires >= ?",
+                    (now + lease_seconds, token, owner, now),
+                )
+                if cursor.rowcount:
+                    held.append(token)
+            self.connection.commit()
+        return held
+
+    def finish_lease(self, token):
+        """
+        Close the lease `token` so its address is not handed out again in this run. Returns "finished", or
+        "duplicate" if it was already closed, or None when the lease is no longer this token's.
+        """
+        with self.lock:
+            row = self.connection.execute("SELECT lease_expires FROM address_status WHERE lease_token = ?", (token,)).fetchone()
+            if row is None:
+                return None
+            if row[0] is None:
+                return "duplicate"
+            self.connection.execute("UPDATE address_status SET lease_expires = NULL WHERE lease_token = ?", (token,))
+            self.connection.commit()
+        return "finished"
+
+    def claim_count(self, statuses=RETRYABLE_STATUSES):
+        """Addresses left to scrape that are free to claim: never leased in this run, or whose lease ran out."""
+        placeholders = ", ".join("?" for _ in statuses)
+        with self.lock:
+            return self.connection.execute(
+                f"""SELECT COUNT(*) FROM address_status WHERE status IN ({placeholders})
+                    AND (lease_token IS NULL OR (lease_expires IS NOT NULL AND lease_expires < ?))""",
+                (*statuses, time.time()),
+            ).fetchone()[0]
+
+    def active_leases(self):
+        """Leases handed out and not yet finished or run out."""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM address_status WHERE lease_token IS NOT NULL AND lease_expires >= ?", (time.time(),)
+            ).fetchone()[0]
+
+    def clear_leases(self):
+        """Forget the leases of an earlier run, so every address left to scrape can be claimed again."""
+        with self.lock:
+            self.connection.execute("UPDATE address_status SET lease_owner = NULL, lease_token = NULL, lease_expires = NULL WHERE lease_token IS NOT NULL")
+            self.connection.commit()
+
+    def status_counts(self):
+        with self.lock:
+            return dict(self.connection.execute("SELECT status, COUNT(*) FROM address_status GROUP BY status").fetchall())
+
+    def export_csv(self, path):
+        """Write the Address/Status log CSV the dashboard reads."""
+        with self.lock:
+            rows = self.connection.execute("SELECT address, status FROM address_status ORDER BY rowid").fetchall()
+        with open(path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["Address", "Status"])
+            writer.writerows(rows)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
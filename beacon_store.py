@@ -0,0 +1,214 @@
+"""
+Normalized, typed storage for scraped parcels.
+
+The flat output repeats every property field on each sale row, keeps dates and prices as page text and grows
+duplicates on every re-run. `ParcelDatabase` keeps one row per parcel in `properties` (keyed by Parcel ID) and one
+row per sale in `sales` (keyed by Parcel ID, date and instrument), with ISO dates, prices in integer cents, acres as
+floats and years and counts as integers. Every write is an upsert, so scraping a parcel again updates it in place.
+`export_parquet` writes both tables as Parquet files for the dashboard.
+"""
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+# Output column -> properties column, and how the page text is converted
+PROPERTY_COLUMNS = {
+    "Address": "address",
+    "Property Classification": "property_classification",
+    "Acres": "acres",
+    "Zoning Class": "zoning_class",
+    "Year Built": "year_built",
+    "Year Improved/Renovated": "year_improved",
+    "Beds": "beds",
+    "SQFT": "sqft",
+    "Grade": "grade",
+    "Property Link": "property_link",
+}
+
+
+def _clean(value):
+    """Page text with surrounding whitespace removed; None for missing values (including pandas' NaN)."""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def parse_price_cents(value):
+    """Price text such as "$245,000" or "245000.50" in integer cents. None if there is no number in it."""
+    text = _clean(value)
+    if text is None:
+        return None
+    number = re.sub(r"[^\d.\-]", "", text)
+    try:
+        return int(round(float(number) * 100))
+    except ValueError:
+        return None
+
+
+def parse_float(value):
+    text = _clean(value)
+    try:
+        return float(text.replace(",", "")) if text is not None else None
+    except ValueError:
+        return None
+
+
+def parse_int(value):
+    """Whole numbers such as "1,234" (years and counts), rounded if the page shows a fraction."""
+    number = parse_float(value)
+    return int(round(number)) if number is not None else None
+
+
+def parse_date(value):
+    """A Beacon sale date ("01/02/2005") as an ISO date string. None if it is not a date."""
+    text = _clean(value)
+    if text is None:
+        return None
+    for date_format in ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%Y %H:%M:%S"):
+        try:
+            return datetime.strptime(text, date_format).date().isoformat()
+        except ValueError:
+            pass
+    return None
+
+
+PROPERTY_CONVERTERS = {
+    "acres": parse_float,
+    "year_built": parse_int,
+    "year_improved": parse_int,
+    "beds": parse_int,
+    "sqft": parse_int,
+}
+
+
+class ParcelDatabase:
+    """
+    SQLite store of properties and their sales. `rental_id` and `sale_id` are assigned once per parcel and per
+    sale and stay the same across re-runs, unlike the per-run counters of the flat output.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS properties (
+                rental_id INTEGER PRIMARY KEY,
+                parcel_id TEXT NOT NULL UNIQUE,
+                address TEXT,
+                property_classification TEXT,
+                acres REAL,
+                zoning_class TEXT,
+                year_built INTEGER,
+                year_improved INTEGER,
+                beds INTEGER,
+                sqft INTEGER,
+                grade TEXT,
+                property_link TEXT,
+                first_seen TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sales (
+                sale_id INTEGER PRIMARY KEY,
+                parcel_id TEXT NOT NULL REFERENCES properties (parcel_id),
+                sale_date TEXT NOT NULL,
+                instrument TEXT NOT NULL DEFAULT '',
+                transfer_type TEXT,
+                transfer_to TEXT,
+                price_cents INTEGER,
+                updated_at TEXT NOT NULL,
+                UNIQUE (parcel_id, sale_date, instrument)
+            );
+        """)
+        self.connection.commit()
+
+    def upsert_rows(self, rows):
+        """
+        Store a batch of flat output rows. Rows without a Parcel ID (no results, wrong address) are skipped; the
+        status store already records those. Returns the number of property and sale rows written.
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        properties, sales = {}, {}
+        for row in rows:
+            parcel_id = _clean(row.get("Parcel ID"))
+            if parcel_id is None:
+                continue
+            record = {column: _clean(row.get(field)) for field, column in PROPERTY_COLUMNS.items()}
+            for column, convert in PROPERTY_CONVERTERS.items():
+                record[column] = convert(record[column])
+            properties[parcel_id] = record
+            sale_date = parse_date(row.get("Date"))
+            if sale_date is not None:
+                instrument = _clean(row.get("Instrument")) or ""
+                sales[(parcel_id, sale_date, instrument)] = {
+                    "transfer_type": _clean(row.get("Transfer Type")),
+                    "transfer_to": _clean(row.get("Transfer To")),
+                    "price_cents": parse_price_cents(row.get("Price")),
+                }
+
+        property_columns = list(PROPERTY_COLUMNS.values())
+        with self.lock, self.connection:
+            self.connection.executemany(
+                f"""INSERT INTO properties (parcel_id, {", ".join(property_columns)}, first_seen, updated_at)
+                    VALUES (?, {", ".join("?" for _ in property_columns)}, ?, ?)
+                    ON CONFLICT (parcel_id) DO UPDATE SET {", ".join(f"{column} = excluded.{column}" for column in property_columns)},
+                        updated_at = excluded.updated_at""",
+                [(parcel_id, *(record[column] for column in property_columns), now, now) for parcel_id, record in properties.items()],
+            )
+            self.connection.executemany(
+                """INSERT INTO sales (parcel_id, sale_date, instrument, transfer_type, transfer_to, price_cents, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (parcel_id, sale_date, instrument) DO UPDATE SET transfer_type = excluded.transfer_type,
+                       transfer_to = excluded.transfer_to, price_cents = excluded.price_cents, updated_at = excluded.updated_at""",
+                [(*key, sale["transfer_type"], sale["transfer_to"], sale["price_cents"], now) for key, sale in sales.items()],
+            )
+        return len(properties), len(sales)
+
+    def import_csv(self, path, chunksize=50000):
+        """Load a flat output CSV from earlier runs; its duplicate rows collapse into one property and one row per sale."""
+        properties = sales = 0
+        for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize):
+            written = self.upsert_rows(chunk.to_dict("records"))
+            properties, sales = properties + written[0], sales + written[1]
+        return properties, sales
+
+    def counts(self):
+        with self.lock:
+            return {
+                table: self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("properties", "sales")
+            }
+
+    def export_parquet(self, directory):
+        """Write properties.parquet and sales.parquet to `directory` (needs pyarrow). Returns the file paths."""
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            properties = pd.read_sql_query("SELECT * FROM properties ORDER BY rental_id", self.connection)
+            sales = pd.read_sql_query("SELECT * FROM sales ORDER BY parcel_id, sale_date", self.connection)
+        for frame in (properties, sales):
+            for column in ("first_seen", "updated_at"):
+                if column in frame:
+                    frame[column] = pd.to_datetime(frame[column])
+        sales["sale_date"] = pd.to_datetime(sales["sale_date"]).dt.date
+        for column in ("year_built", "year_improved", "beds", "sqft"):
+            properties[column] = properties[column].astype("Int64")
+        sales["price_cents"] = sales["price_cents"].astype("Int64")
+
+        paths = []
+        for name, frame in (("properties", properties), ("sales", sales)):
+            path = os.path.join(directory, f"{name}.parquet")
+            # Write under a temporary name so the dashboard never reads a half-written file
+            frame.to_parquet(f"{path}.tmp", index=False, engine="pyarrow")
+            os.replace(f"{path}.tmp", path)
+            paths.append(path)
+        return paths
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,170 @@
+"""
+End-to-end throughput benchmark for the scraper, run against the local Beacon stand-in.
+
+Each address-set size runs in its own process: a stand-in server with that many synthetic addresses is
+started, the full pipeline (workers, output sink, status store) scrapes every address, and the run reports
+addresses per minute, per-stage p50/p95 latency and peak RSS. Results are saved as JSON so runs can be
+compared over time.
+
+    python benchmark_scraper.py --sizes 100 1000 10000 --engine http --workers 4 --latency-ms 100
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from beacon_sinks import CsvSink
+from beacon_standin_server import StandinSite, TERMS_COOKIE, start_in_thread
+from beacon_status import StatusStore
+
+SCRAPER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Beacon Parcel WebScraper.py")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_results")
+
+ENGINES = ("http", "selenium")
+
+
+def load_scraper():
+    """Import the scraper script (its file name has spaces, so it cannot be imported by name)."""
+    spec = importlib.util.spec_from_file_location("beacon_scraper", SCRAPER_PATH)
+    scraper = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(scraper)
+    return scraper
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if the platform does not report it."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes on Linux
+        return round(peak / (1024 ** 2 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+        memory = psutil.Process().memory_info()
+        return round(getattr(memory, "peak_wset", memory.rss) / 1024 ** 2, 1)
+    except ImportError:
+        return None
+
+
+def benchmark_addresses(site, size, seed):
+    """`size` addresses to scrape: mostly ones the stand-in knows, plus its unknown ones for "no results" pages."""
+    known = site.addresses[:max(0, size - len(site.missing_addresses))]
+    addresses = known + site.missing_addresses[:size - len(known)]
+    random.Random(seed).shuffle(addresses)
+    return addresses
+
+
+def run_benchmark(size, engine, workers, latency_ms, jitter_ms, captcha_rate, seed, verbose, rate, captcha_cooldown):
+    """Scrape `size` synthetic addresses end to end and return the measurements."""
+    scraper = load_scraper()
+    site = StandinSite(size, seed, latency_ms, jitter_ms, captcha_rate)
+    server, start_url = start_in_thread(site)
+    addresses = benchmark_addresses(site, size, seed)
+
+    scraper.captcha_cooldown = captcha_cooldown
+    # Start at --rate and let the pacing adapt from there, up to ten times faster
+    scraper.rate_limiter = scraper.AdaptiveRateLimiter(rate, min_rate=min(rate, 0.2), max_rate=rate * 10, metrics=scraper.metrics)
+    # Stage timings come from the scraper's own spans; its log is only shown with --verbose
+    if verbose:
+        scraper.configure_logging("INFO")
+    else:
+        scraper.log.setLevel("ERROR")
+    if engine == "http":
+        # The stand-in only needs the terms cookie, so skip the Chrome handshake
+        scraper.browser_handshake = {"cookies": [{"name": TERMS_COOKIE, "value": "accepted", "path": "/"}], "user_agent": "beacon-benchmark"}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        scraper.status_store = StatusStore(os.path.join(workdir, "status.sqlite3"))
+        scraper.status_store.add_addresses(addresses)
+        sink = CsvSink(os.path.join(workdir, "output.csv"), metrics=scraper.metrics)
+        output = sys.stdout if verbose else open(os.devnull, "w")
+        started = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                scraper.run_workers(addresses, workers, sink, engine, start_url)
+                sink.close()
+        finally:
+            elapsed = time.perf_counter() - started
+            if output is not sys.stdout:
+                output.close()
+            server.shutdown()
+        with open(os.path.join(workdir, "output.csv"), newline="") as csvfile:
+            rows_written = max(0, sum(1 for _ in csvfile) - 1)
+        statuses = scraper.status_store.status_counts()
+        scraper.status_store.close()
+
+    return {
+        "addresses": len(addresses),
+        "elapsed_s": round(elapsed, 3),
+        "addresses_per_minute": round(len(addresses) / elapsed * 60, 1) if elapsed else None,
+        "rows_written": rows_written,
+        "statuses": statuses,
+        "site_requests": site.request_count,
+        "stages": scraper.metrics.histogram_summary("beacon_stage_seconds", "stage"),
+        "waits": scraper.wait_summary(),
+        "page_bytes": scraper.page_bytes_summary(),
+        "counters": scraper.metrics.summary()["counters"],
+        "pacing": scraper.rate_limiter.state(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper end to end against the local Beacon stand-in.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Address-set sizes to run")
+    parser.add_argument("--engine", choices=ENGINES, default="http")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=50, help="Fixed delay the stand-in adds to every page")
+    parser.add_argument("--jitter-ms", type=float, default=25, help="Random extra delay per page")
+    parser.add_argument("--captcha-rate", type=float, default=0.0, help="Fraction of pages replaced by a CAPTCHA")
+    parser.add_argument("--captcha-cooldown", type=float, default=1, help="Seconds a worker pauses after parking an address on a CAPTCHA")
+    parser.add_argument("--seed", type=int, default=578)
+    parser.add_argument("--rate", type=float, default=1000, help="Starting page loads per second for the scraper's pacing (high enough not to throttle by default)")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="Where the JSON results are saved")
+    parser.add_argument("--verbose", action="store_true", help="Show the scraper's own output")
+    args = parser.parse_args()
+
+    report = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "engine": args.engine,
+        "workers": args.workers,
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "captcha_rate": args.captcha_rate,
+        "seed": args.seed,
+        "rate": args.rate,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": [],
+    }
+    # A fresh process per size keeps peak RSS and module state from leaking between runs
+    context = multiprocessing.get_context("spawn")
+    for size in args.sizes:
+        print(f"Running {size} addresses with {args.workers} {args.engine} workers...")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(run_benchmark, size, args.engine, args.workers, args.latency_ms, args.jitter_ms, args.captcha_rate, args.seed, args.verbose, args.rate, args.captcha_cooldown).result()
+        report["runs"].append(result)
+        print(f"  {result['addresses_per_minute']} addresses/min, {result['rows_written']} rows, peak RSS {result['peak_rss_mb']} MB")
+        for stage, stats in result["stages"].items():
+            print(f"  {stage:<30} p50 {stats['p50_ms']:>8} ms   p95 {stats['p95_ms']:>8} ms   n={stats['count']}")
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(args.results_dir, f"benchmark-{args.engine}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w") as results_file:
+        json.dump(report, results_file, indent=2)
+    print(f"Saved results to {path}")
+
+
+if __name__ == "__main__":
+    main()
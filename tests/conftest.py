@@ -0,0 +1,27 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def scraper():
+    """The scraper script as a module (its file name has spaces, so it cannot be imported by name)."""
+    spec = importlib.util.spec_from_file_location("beacon_scraper", os.path.join(ROOT, "Beacon Parcel WebScraper.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def fixture_page():
+    """Contents of a saved page under tests/fixtures."""
+    def read(name):
+        with open(os.path.join(FIXTURES, name), encoding="utf-8") as page:
+            return page.read()
+    return read
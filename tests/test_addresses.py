@@ -0,0 +1,35 @@
+import pytest
+
+from beacon_status import canonical_address
+
+
+@pytest.mark.parametrize("address, canonical", [
+    ("123 North Main Street, Apt. 4", "123 N MAIN ST # 4"),
+    ("123 n main st #4", "123 N MAIN ST # 4"),
+    ("123 N Main St Unit 4", "123 N MAIN ST # 4"),
+    ("123 N Main St Apt #4", "123 N MAIN ST # 4"),
+    ("  123   n.  MAIN   st  ", "123 N MAIN ST"),
+    ("4500 Southwest Old Boulevard", "4500 SW OLD BLVD"),
+    ("123 1/2 Main St", "123 1/2 MAIN ST"),
+    # A designator word is the street name until the street has one
+    ("12 Apt Rd", "12 APT RD"),
+    ("12 N Suite Ln Suite 3", "12 N SUITE LN # 3"),
+    ("7 No Name Rd", "7 NO NAME RD"),
+    ("123 Main Apt 4", "123 MAIN # 4"),
+])
+def test_canonical_address(address, canonical):
+    assert canonical_address(address) == canonical
+
+
+@pytest.mark.parametrize("address, street", [
+    ("123 N Main St #4", "N MAIN ST"),
+    ("123 North Main Street, Apt. 4", "N MAIN ST"),
+    ("123 1/2 Main St", "MAIN ST"),
+    ("12 Apt Rd", "APT RD"),
+    ("12 Apt Rd Apt 2", "APT RD"),
+    ("Main St", None),
+    ("123", None),
+    ("123 # 4", None),
+])
+def test_street_of(scraper, address, street):
+    assert scraper.street_of(address) == street
@@ -0,0 +1,46 @@
+import requests
+
+from beacon_parser import to_tree
+from beacon_standin_server import TERMS_COOKIE, StandinSite, start_in_thread
+
+SEARCH_URL = "http://beacon.test/Application.aspx?AppID=578&LayerID=8505&PageTypeID=2&PageID=4151"
+
+
+def test_parse_search_form(scraper, fixture_page):
+    form = scraper.parse_search_form(to_tree(fixture_page("search_page.html")), SEARCH_URL)
+    assert form["action"] == SEARCH_URL
+    assert form["address_field"] == "ctlBodyPane$ctl02$ctl01$txtAddress"
+    assert form["event_target"] == "ctlBodyPane$ctl02$ctl01$btnSearch"
+    assert form["fields"]["__VIEWSTATE"] and form["fields"]["__EVENTVALIDATION"]
+
+
+def test_handshake_keeps_session_cookie_per_worker(scraper):
+    session = requests.Session()
+    scraper.apply_browser_handshake(session, {
+        "user_agent": "test-agent",
+        "cookies": [{"name": "ASP.NET_SessionId", "value": "shared"}, {"name": TERMS_COOKIE, "value": "accepted"}],
+    })
+    assert session.headers["User-Agent"] == "test-agent"
+    assert list(session.cookies.keys()) == [TERMS_COOKIE]
+
+
+def test_process_address_http_against_standin(scraper, monkeypatch):
+    site = StandinSite(30, seed=578)
+    server, start_url = start_in_thread(site)
+    monkeypatch.setattr(scraper, "browser_handshake", {"cookies": [{"name": TERMS_COOKIE, "value": "accepted", "path": "/"}], "user_agent": "test"})
+    monkeypatch.setattr(scraper, "rate_limiter", scraper.AdaptiveRateLimiter(1000, max_rate=10000))
+    monkeypatch.setattr(scraper, "resolution_index", None)
+    session = scraper.start_http_session(start_url)
+    try:
+        # Several parcels: the results page, filtered by class code
+        rows, status = scraper.process_address_http(session, "1360 Russell Dr")
+        assert status == "Scraped"
+        assert {row["Parcel ID"] for row in rows} == {
+            parcel["parcel_id"] for parcel in site.by_address["1360 RUSSELL DR"]
+            if parcel["class_code"] in scraper.site_profile.class_codes
+        }
+        rows, status = scraper.process_address_http(session, site.missing_addresses[0])
+        assert status == "Scraped" and rows[0]["Status"] == "Address Not Correct"
+    finally:
+        session.close()
+        server.shutdown()
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from beacon_parser import (
+    PageSelectors, is_captcha_page, is_no_results_page, is_results_page, parse_property_page, parse_results_page,
+    to_tree,
+)
+
+BASE_URL = "http://beacon.test/Application.aspx?AppID=578&LayerID=8505&PageTypeID=2&PageID=4151"
+PROPERTY_LINK = "http://beacon.test/Application.aspx?AppID=578&LayerID=8505&PageTypeID=4&PageID=4153&KeyValue=79-07-70-309-000015.000-026"
+
+
+def test_results_page_rows(fixture_page):
+    html = fixture_page("results_page.html")
+    assert is_results_page(html) and not is_no_results_page(html)
+    results = parse_results_page(html, BASE_URL)
+    assert [(result["index"], result["address"], result["class_code"]) for result in results] == [
+        (1, "1360 Russell Dr", "500"), (2, "1360 Russell Dr", "429"), (3, "1360 Russell Dr", "530"),
+    ]
+    # Relative links resolve against the page
+    assert results[2]["property_link"] == (
+        "http://beacon.test/Application.aspx?AppID=578&LayerID=8505&PageTypeID=4&PageID=4153&KeyValue=79-07-50-402-000008.000-002"
+    )
+
+
+def test_results_page_pager(fixture_page):
+    links = PageSelectors()["results_pager_links"](to_tree(fixture_page("results_page.html")))
+    assert [link.text_content() for link in links] == ["1", "2"]
+
+
+def test_no_results_page(fixture_page):
+    html = fixture_page("no_results_page.html")
+    assert is_no_results_page(html)
+    assert parse_results_page(html, BASE_URL) == []
+
+
+def test_property_page_rows(fixture_page):
+    rows = parse_property_page(fixture_page("property_page.html"), "7295 Pierce Dr", PROPERTY_LINK, rental_id=400123)
+    assert not is_captcha_page(fixture_page("property_page.html"))
+    # Sales before the 2000 cutoff (1997 and 1986) are dropped
+    assert [(row["Date"], row["Price"], row["Transfer Type"], row["Instrument"], row["Transfer To"]) for row in rows] == [
+        ("11/23/2019", "$765,000", "QC", "201431329", "PURDUE RESEARCH FOUNDATION"),
+        ("02/21/2011", "$89,000", "WD", "199086404", "TIPPECANOE HOLDINGS"),
+    ]
+    first = rows[0]
+    assert first["Parcel ID"] == "79-07-70-309-000015.000-026"
+    assert first["Property Classification"] == "520 Two Family Dwelling Platted"
+    assert (first["Acres"], first["Zoning Class"], first["Year Built"], first["Year Improved/Renovated"]) == ("1.093", "R2", "1943", "2018")
+    assert (first["Beds"], first["SQFT"], first["Grade"]) == ("3", "729", "C")
+    assert {row["RentalID"] for row in rows} == {400123}
+    assert {row["Property Link"] for row in rows} == {PROPERTY_LINK}
+
+
+def test_property_page_cutoff(fixture_page):
+    rows = parse_property_page(fixture_page("property_page.html"), "7295 Pierce Dr", PROPERTY_LINK, cutoff_date=datetime(1990, 1, 1))
+    assert [row["Date"] for row in rows] == ["11/23/2019", "02/21/2011", "12/06/1997"]
+
+
+def test_property_page_without_details_or_sales(fixture_page):
+    html = fixture_page("property_page.html")
+    assert parse_property_page(html.replace('id="ctlBodyPane_ctl20_mSection"', 'id="other"'), "7295 Pierce Dr", PROPERTY_LINK) == []
+    assert parse_property_page(html.replace("tabular-data-two-column", "other"), "7295 Pierce Dr", PROPERTY_LINK) is None
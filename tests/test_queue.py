@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from beacon_queue import QueueServer, RemoteWorkQueue
+from beacon_status import StatusStore
+
+ADDRESSES = ["100 N Main St", "200 N Main St", "300 S Grant St"]
+
+
+class RecordingSink:
+    """Output sink stand-in that writes nothing and acknowledges at once."""
+    def __init__(self):
+        self.rows = []
+
+    def write(self, rows, callback=None):
+        self.rows.extend(rows)
+        if callback is not None:
+            callback()
+
+
+@pytest.fixture
+def queue_setup(scraper, tmp_path):
+    store = StatusStore(str(tmp_path / "status.sqlite3"))
+    store.add_addresses(ADDRESSES)
+    sink = RecordingSink()
+    work_queue = scraper.LocalWorkQueue(store, sink, lease_seconds=0.5)
+    work_queue.ingested.set()
+    server = QueueServer(work_queue, "127.0.0.1", 0, secret="s3cret")
+    yield store, sink, work_queue, RemoteWorkQueue(server.url, "s3cret", attempts=1)
+    server.shutdown()
+    store.close()
+
+
+def row(address):
+    return {"Address": address, "Parcel ID": "79-07-01", "Date": "01/02/2020", "Instrument": "1"}
+
+
+def test_claim_complete_and_drain(queue_setup):
+    store, sink, work_queue, remote = queue_setup
+    leases = remote.claim("node-a", 10)["leases"]
+    assert [lease["address"] for lease in leases] == ADDRESSES
+    assert remote.claim("node-b", 10) == {"leases": [], "done": False}
+
+    for lease in leases:
+        assert remote.complete(lease["token"], lease["address"], "Scraped", [row(lease["address"])]) == {"accepted": True}
+    assert len(sink.rows) == 3
+    assert store.status_counts() == {"Scraped": 3}
+    assert remote.claim("node-b", 10) == {"leases": [], "done": True}
+
+
+def test_duplicate_complete_is_accepted_once(queue_setup):
+    store, sink, work_queue, remote = queue_setup
+    lease = remote.claim("node-a", 1)["leases"][0]
+    assert remote.complete(lease["token"], lease["address"], "Scraped", [row(lease["address"])])["accepted"]
+    # A retried call whose first attempt got through
+    assert remote.complete(lease["token"], lease["address"], "Scraped", [row(lease["address"])])["accepted"]
+    assert len(sink.rows) == 1
+
+
+def test_expired_lease_is_reissued_and_late_result_rejected(queue_setup):
+    store, sink, work_queue, remote = queue_setup
+    stale = remote.claim("node-a", 1)["leases"][0]
+    time.sleep(0.6)
+    assert remote.heartbeat("node-a", [stale["token"]]) == {"held": []}
+
+    fresh = remote.claim("node-b", 1)["leases"][0]
+    assert fresh["address"] == stale["address"] and fresh["token"] != stale["token"]
+    assert remote.complete(stale["token"], stale["address"], "Scraped", [row(stale["address"])]) == {"accepted": False}
+    assert remote.complete(fresh["token"], fresh["address"], "Scraped", [row(fresh["address"])]) == {"accepted": True}
+    assert len(sink.rows) == 1
+
+
+def test_rental_ids_are_renumbered_on_the_coordinator(queue_setup):
+    store, sink, work_queue, remote = queue_setup
+    leases = remote.claim("node-a", 2)["leases"]
+    # Two nodes each numbered their properties from 400000
+    node_rows = [[("79-07-01", 400000), ("79-07-01", 400000), ("79-07-02", 400001)], [("80-01-01", 400000)]]
+    for lease, parcels in zip(leases, node_rows):
+        rows = [dict(row(lease["address"]), **{"Parcel ID": parcel_id, "RentalID": rental_id}) for parcel_id, rental_id in parcels]
+        assert remote.complete(lease["token"], lease["address"], "Scraped", rows)["accepted"]
+    rental_ids = [(written["Parcel ID"], written["RentalID"]) for written in sink.rows]
+    assert len({rental_id for _, rental_id in rental_ids}) == 3
+    assert rental_ids[0][1] == rental_ids[1][1]
+
+
+def test_heartbeat_keeps_lease(queue_setup):
+    store, sink, work_queue, remote = queue_setup
+    lease = remote.claim("node-a", 1)["leases"][0]
+    for _ in range(3):
+        time.sleep(0.3)
+        assert remote.heartbeat("node-a", [lease["token"]]) == {"held": [lease["token"]]}
+    # Another node cannot renew it
+    assert remote.heartbeat("node-b", [lease["token"]]) == {"held": []}
+    assert lease["address"] not in [other["address"] for other in remote.claim("node-b", 10)["leases"]]
+
+
+def test_wrong_secret_is_refused(queue_setup):
+    store, sink, work_queue, remote = queue_setup
+    with pytest.raises(Exception, match="403"):
+        RemoteWorkQueue(remote.url, "wrong", attempts=1).claim("node-a", 1)
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from beacon_metrics import Metrics
+from beacon_retry import RetryScheduler
+
+
+@pytest.fixture
+def scheduler():
+    delays = {"timeout": 10.0, "stale_element": 2.0, "site_error": 30.0, "captcha": None, "no_results": None}
+    return RetryScheduler(max_attempts=4, delays=delays, max_delay=60.0, metrics=Metrics(), rng=random.Random(7))
+
+
+@pytest.mark.parametrize("kind, failures, backoff", [
+    ("timeout", 1, 10.0),
+    ("timeout", 2, 20.0),
+    ("timeout", 3, 40.0),
+    ("timeout", 4, 60.0),  # capped at max_delay
+    ("stale_element", 1, 2.0),
+    ("stale_element", 3, 8.0),
+])
+def test_backoff_doubles_with_equal_jitter(scheduler, kind, failures, backoff):
+    delays = [scheduler.delay_for(kind, failures) for _ in range(200)]
+    assert all(backoff / 2 <= delay <= backoff for delay in delays)
+    # The jitter actually spreads the retries out
+    assert max(delays) - min(delays) > backoff / 4
+
+
+def test_max_attempts_caps_retries(scheduler):
+    assert [scheduler.schedule("1 Main St", "timeout") is not None for _ in range(4)] == [True, True, True, False]
+    assert scheduler.pending() == 3
+    assert scheduler.finish("1 Main St") == 4
+    assert scheduler.metrics.counter_values("beacon_retries_total", "result") == {"scheduled": 3, "exhausted": 1}
+
+
+@pytest.mark.parametrize("kind", ["captcha", "no_results"])
+def test_final_kinds_are_not_retried(scheduler, kind):
+    assert scheduler.schedule("1 Main St", kind) is None
+    assert scheduler.pending() == 0
+    assert scheduler.finish("1 Main St") == 1
+    assert scheduler.metrics.counter_values("beacon_retries_total", "result") == {"final": 1}
+
+
+def test_unknown_kind_backs_off_like_a_site_error(scheduler):
+    assert 15.0 <= scheduler.schedule("1 Main St", "mystery") <= 30.0
+
+
+def test_pop_due_returns_due_addresses_in_order(scheduler, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("beacon_retry.time.monotonic", lambda: now[0])
+    scheduler.schedule("slow", "site_error")      # due in 15-30s
+    scheduler.schedule("fast", "stale_element")   # due in 1-2s
+    scheduler.schedule("middle", "timeout")       # due in 5-10s
+    assert scheduler.pop_due() is None
+    now[0] += 10.0
+    assert [scheduler.pop_due(), scheduler.pop_due(), scheduler.pop_due()] == ["fast", "middle", None]
+    now[0] += 30.0
+    assert scheduler.pop_due() == "slow"
+    assert scheduler.pending() == 0
+
+
+@pytest.mark.parametrize("failures, status, expected", [
+    (0, "Scraped", "Scraped"),
+    (1, "Scraped", "Scraped After Retry"),
+    (3, "Scraped", "Scraped After Retry"),
+    (2, "Address Not Correct", "Address Not Correct"),
+    (1, None, "Error"),
+    (2, None, "Failed After Retry"),
+])
+def test_finish_count_decides_final_status(scraper, scheduler, failures, status, expected):
+    for _ in range(failures):
+        scheduler.schedule("1 Main St", "timeout")
+    assert scraper.status_after_retries(status, scheduler.finish("1 Main St")) == expected
+    # finish forgets the address
+    assert scheduler.finish("1 Main St") == 0
@@ -0,0 +1,101 @@
+import csv
+
+import pytest
+
+from beacon_store import ParcelDatabase, parse_date, parse_int, parse_price_cents
+
+FIELDS = ["RentalID", "SalesID", "Address", "Date", "Price", "Transfer Type", "Instrument", "Transfer To",
+          "Property Classification", "Parcel ID", "Acres", "Year Built", "SQFT", "Property Link", "Status"]
+
+
+@pytest.mark.parametrize("text, cents", [
+    ("$245,000", 24500000),
+    ("245000.50", 24500050),
+    ("$0", 0),
+    ("-", None),
+    ("", None),
+    (None, None),
+    (float("nan"), None),
+])
+def test_parse_price_cents(text, cents):
+    assert parse_price_cents(text) == cents
+
+
+@pytest.mark.parametrize("text, date", [
+    ("01/02/2005", "2005-01-02"),
+    ("2005-01-02", "2005-01-02"),
+    ("01/02/2005 00:00:00", "2005-01-02"),
+    ("not a date", None),
+    (None, None),
+])
+def test_parse_date(text, date):
+    assert parse_date(text) == date
+
+
+@pytest.mark.parametrize("text, number", [
+    ("1,234", 1234),
+    ("1999", 1999),
+    ("2.6", 3),
+    ("-", None),
+    (None, None),
+])
+def test_parse_int(text, number):
+    assert parse_int(text) == number
+
+
+def sale_row(parcel_id, date, instrument, price="$245,000"):
+    return {
+        "RentalID": "400000", "SalesID": "4000000", "Address": "100 N Main St", "Date": date, "Price": price,
+        "Transfer Type": "Warranty Deed", "Instrument": instrument, "Transfer To": "SMITH JOHN",
+        "Property Classification": "510", "Parcel ID": parcel_id, "Acres": "0.25", "Year Built": "1999",
+        "SQFT": "1,450", "Property Link": "https://beacon.example/?KeyValue=" + parcel_id, "Status": "Scraped",
+    }
+
+
+ROWS = [
+    sale_row("79-07-01", "01/02/2005", "2005001"),
+    sale_row("79-07-01", "03/04/2015", "2015002"),
+    sale_row("79-07-02", "05/06/2020", "2020003"),
+    # A row with no Parcel ID (no results) is left to the status store
+    dict(dict.fromkeys(FIELDS), Address="1 Nowhere Rd", Status="No Results"),
+]
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = ParcelDatabase(str(tmp_path / "parcels.sqlite3"))
+    yield database
+    database.close()
+
+
+def test_upsert_is_idempotent(database):
+    assert database.upsert_rows(ROWS) == (2, 3)
+    assert database.counts() == {"properties": 2, "sales": 3}
+    assert database.upsert_rows(ROWS) == (2, 3)
+    assert database.counts() == {"properties": 2, "sales": 3}
+
+    # A re-scrape with a corrected price updates the sale in place
+    database.upsert_rows([sale_row("79-07-02", "05/06/2020", "2020003", price="$250,000")])
+    assert database.counts() == {"properties": 2, "sales": 3}
+    price, = database.connection.execute("SELECT price_cents FROM sales WHERE parcel_id = '79-07-02'").fetchone()
+    assert price == 25000000
+
+
+def test_stored_values_are_typed(database):
+    database.upsert_rows(ROWS[:1])
+    acres, year_built, sqft = database.connection.execute("SELECT acres, year_built, sqft FROM properties").fetchone()
+    assert (acres, year_built, sqft) == (0.25, 1999, 1450)
+    sale_date, price = database.connection.execute("SELECT sale_date, price_cents FROM sales").fetchone()
+    assert (sale_date, price) == ("2005-01-02", 24500000)
+
+
+def test_import_csv_collapses_duplicate_rows(database, tmp_path):
+    path = tmp_path / "output.csv"
+    with open(path, "w", newline="") as output:
+        writer = csv.DictWriter(output, fieldnames=FIELDS)
+        writer.writeheader()
+        # Three runs of the same addresses appended to one flat output
+        for _ in range(3):
+            writer.writerows(ROWS)
+    database.import_csv(str(path), chunksize=5)
+    assert database.counts() == {"properties": 2, "sales": 3}